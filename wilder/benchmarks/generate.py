@@ -0,0 +1,47 @@
+import os
+
+from wilder.sdk import get_wilder_sdk
+
+# This module builds synthetic catalogs for benchmarking.
+
+
+def get_artist_name(artist_number):
+    return f"Artist {artist_number}"
+
+
+def get_album_name(artist_number, album_number):
+    return f"Album {artist_number}-{album_number}"
+
+
+def get_track_name(track_number):
+    return f"Track {track_number}"
+
+
+def generate_catalog(home, artists, albums, tracks, use_manifest=False):
+    """Build a catalog in the given home directory with `artists` artists, each with `albums`
+    albums of `tracks` tracks. The ~/.wilder directory is created in `home`, so set the HOME
+    environment variable to `home` before using the returned Wilder object."""
+    music_path = os.path.join(home, "music")
+    wilder = get_wilder_sdk()
+    with wilder.batch():
+        for artist_number in range(artists):
+            artist_name = get_artist_name(artist_number)
+            wilder.create_artist(artist_name, bio=f"The bio of {artist_name}.")
+            for album_number in range(albums):
+                album_name = get_album_name(artist_number, album_number)
+                wilder.create_album(
+                    os.path.join(music_path, artist_name),
+                    album_name=album_name,
+                    artist_name=artist_name,
+                    description=f"The story of {album_name}.",
+                    use_manifest=use_manifest,
+                )
+                for track_number in range(tracks):
+                    wilder.create_track(
+                        get_track_name(track_number),
+                        album_name,
+                        artist_name=artist_name,
+                        description=f"Track {track_number} of {album_name}.",
+                        collaborators=[get_artist_name(artists)],
+                    )
+    return wilder
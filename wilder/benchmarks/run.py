@@ -0,0 +1,211 @@
+"""Time the Wilder SDK against synthetic catalogs of different sizes.
+
+Usage:
+
+    python -m benchmarks.run --size 1x5x10 --size 5x10x20 --output results.json
+
+Each size is ARTISTSxALBUMSxTRACKS, where ALBUMS is per artist and TRACKS is per album.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from benchmarks.generate import generate_catalog
+from benchmarks.generate import get_album_name
+from benchmarks.generate import get_artist_name
+from benchmarks.generate import get_track_name
+from wilder.sdk import get_wilder_sdk
+
+DEFAULT_SIZES = ["1x5x10", "5x10x10", "10x10x20"]
+DEFAULT_REPEAT = 5
+
+
+@contextmanager
+def wild_home(size, use_manifest=False):
+    """Generate a catalog of the given size in a temporary home directory and use it."""
+    home = tempfile.mkdtemp(prefix="wilder-benchmark-")
+    original_home = os.environ.get("HOME")
+    os.environ["HOME"] = home
+    try:
+        generate_catalog(home, *size, use_manifest=use_manifest)
+        yield home
+    finally:
+        if original_home is None:
+            del os.environ["HOME"]
+        else:
+            os.environ["HOME"] = original_home
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def bench_load(size):
+    get_wilder_sdk()
+
+
+def bench_load_all(size):
+    get_wilder_sdk().preload()
+
+
+def bench_save(size):
+    wilder = get_wilder_sdk()
+    wilder.get_artist(get_artist_name(0)).bio = f"Changed at {time.time()}."
+    return _timed(wilder._save)
+
+
+def bench_lookup(size):
+    artists, albums, tracks = size
+    wilder = get_wilder_sdk()
+
+    def look_up_every_track():
+        for artist_number in range(artists):
+            artist_name = get_artist_name(artist_number)
+            for album_number in range(albums):
+                album_name = get_album_name(artist_number, album_number)
+                for track_number in range(tracks):
+                    track_name = get_track_name(track_number)
+                    wilder.get_track(track_name, album_name, artist_name=artist_name)
+
+    return _timed(look_up_every_track)
+
+
+def bench_create_track(size):
+    wilder = get_wilder_sdk()
+    album_name = get_album_name(0, 0)
+    track_name = f"New Track {time.time()}"
+    return _timed(
+        lambda: wilder.create_track(
+            track_name, album_name, artist_name=get_artist_name(0)
+        )
+    )
+
+
+def bench_auto_set_track_numbers(size):
+    wilder = get_wilder_sdk()
+    album_name = get_album_name(0, 0)
+    artist_name = get_artist_name(0)
+    track = wilder.get_album(album_name, artist_name=artist_name).get_tracks()[0]
+    track.track_number = size[2] + 1
+    return _timed(
+        lambda: wilder.auto_set_track_numbers(album_name, artist_name=artist_name)
+    )
+
+
+def bench_rename_artist(size):
+    wilder = get_wilder_sdk()
+    artist = wilder.get_artist(get_artist_name(0))
+    new_name = f"{artist.name} {time.time()}"
+    return _timed(lambda: wilder.rename_artist(new_name, artist_name=artist.name))
+
+
+BENCHMARKS = {
+    "load": bench_load,
+    "load_all": bench_load_all,
+    "save": bench_save,
+    "lookup": bench_lookup,
+    "create_track": bench_create_track,
+    "auto_set_track_numbers": bench_auto_set_track_numbers,
+    "rename_artist": bench_rename_artist,
+}
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_benchmark(benchmark, size, repeat):
+    """Run a benchmark `repeat` times. Benchmarks that return a number report that as the
+    time taken, so that their setup is not timed."""
+    func = BENCHMARKS[benchmark]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        elapsed = func(size)
+        times.append(elapsed if elapsed is not None else time.perf_counter() - start)
+    return {
+        "benchmark": benchmark,
+        "artists": size[0],
+        "albums": size[1],
+        "tracks": size[2],
+        "totalTracks": size[0] * size[1] * size[2],
+        "repeat": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "max": max(times),
+    }
+
+
+def run(sizes, benchmarks=None, repeat=DEFAULT_REPEAT, use_manifest=False):
+    benchmarks = benchmarks or list(BENCHMARKS)
+    results = []
+    for size in sizes:
+        with wild_home(size, use_manifest=use_manifest):
+            for benchmark in benchmarks:
+                results.append(run_benchmark(benchmark, size, repeat))
+    return {
+        "createdAt": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "useManifest": use_manifest,
+        "results": results,
+    }
+
+
+def parse_size(size):
+    try:
+        artists, albums, tracks = (int(n) for n in size.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Size '{size}' is not in the form ARTISTSxALBUMSxTRACKS."
+        )
+    return artists, albums, tracks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Wilder SDK.")
+    parser.add_argument(
+        "--size",
+        action="append",
+        type=parse_size,
+        help="A catalog size as ARTISTSxALBUMSxTRACKS. May be given more than once.",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="append",
+        choices=list(BENCHMARKS),
+        help="A benchmark to run. Defaults to all of them.",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--manifest",
+        action="store_true",
+        help="Store track metadata in album manifests.",
+    )
+    parser.add_argument("--output", help="A file to write the JSON results to.")
+    args = parser.parse_args(argv)
+    sizes = args.size or [parse_size(s) for s in DEFAULT_SIZES]
+    report = run(
+        sizes,
+        benchmarks=args.benchmark,
+        repeat=args.repeat,
+        use_manifest=args.manifest,
+    )
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report_json)
+    else:
+        sys.stdout.write(f"{report_json}\n")
+
+
+if __name__ == "__main__":
+    main()
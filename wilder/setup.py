@@ -43,7 +43,9 @@ setup(
             "pytest-cov==2.10.0",
             "pytest-mock==2.0.0",
             "tox>=3.17.1",
-        ]
+        ],
+        "server": ["gunicorn>=20.0.4"],
+        "waveform": ["soundfile>=0.10.3"],
     },
     classifiers=[
         "Intended Audience :: Developers",
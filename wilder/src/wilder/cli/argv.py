@@ -2,6 +2,7 @@ import click
 from wilder.cli.clickext.options import incompatible_with
 from wilder.cli.clickext.types import FileOrString
 from wilder.cli.output_formats import OutputFormat
+from wilder.cli.profiler import CommandProfiler
 from wilder.cli.select import get_user_selected_resource
 from wilder.cli.wild_factory import get_wilder
 from wilder.lib.config import create_config_object
@@ -33,7 +34,7 @@ bio_option = click.option("--bio", "--biography", help="The artist biography.")
 artist_option = click.option(
     "--artist",
     help="The name of an artist.",
-    callback=lambda ctx, param, arg: _get_artist(ctx.obj.wilder, arg),
+    callback=lambda ctx, param, arg: _get_artist(ctx, arg),
 )
 track_num_option = click.option(
     "--track-number", "--track-num", help="The number the track is on the album."
@@ -44,14 +45,46 @@ collaborator_option = click.option(
 hard_option = click.option(
     "--hard", help="To permanently delete associated files.", is_flag=True
 )
+profile_option = click.option(
+    "--profile",
+    is_flag=True,
+    expose_value=False,
+    callback=lambda ctx, param, value: _start_profiling(ctx, value),
+    help="Profile the command and show where its time went. "
+    "The profile is saved to the CLI log directory.",
+)
+profile_top_option = click.option(
+    "--profile-top",
+    type=int,
+    expose_value=False,
+    callback=lambda ctx, param, value: _set_profile_top(ctx, value),
+    help="The number of hotspots to show when profiling. Defaults to 20.",
+)
+profile_memory_option = click.option(
+    "--profile-memory",
+    is_flag=True,
+    expose_value=False,
+    callback=lambda ctx, param, value: _start_tracing_memory(ctx, value),
+    help="Trace memory allocations and show the peak memory used by the command.",
+)
 audio_type_option = click.option(
     "--audio-type",
     help="The audio file extension of the track to play.",
     type=click.Choice(AudioType.choices(), case_sensitive=False),
 )
+background_option = click.option(
+    "--background",
+    "-b",
+    is_flag=True,
+    help="Play using the background player, which `wild player` commands control.",
+)
 
 
-def _get_artist(wilder, artist):
+def _get_artist(ctx, artist):
+    if not artist and ctx.params.get("all"):
+        # Commands given --all are not about one artist, so there is no need to ask for one.
+        return None
+    wilder = ctx.obj.wilder
     _artist = wilder.get_artist(artist)
     if _artist:
         return _artist
@@ -60,11 +93,36 @@ def _get_artist(wilder, artist):
     return wilder.get_artist(artist_name_chosen)
 
 
+def _start_profiling(ctx, profile):
+    if profile:
+        _get_profiler(ctx).start()
+
+
+def _set_profile_top(ctx, top_n):
+    if top_n is not None:
+        _get_profiler(ctx).top_n = top_n
+
+
+def _start_tracing_memory(ctx, trace_memory):
+    if trace_memory:
+        _get_profiler(ctx).start_tracing_memory()
+
+
+def _get_profiler(ctx):
+    # The root command's options are parsed before its state is created.
+    state = ctx.ensure_object(CLIState)
+    if not state.profiler.is_profiling:
+        # Report once the whole command finishes, even if the option was given to a subcommand.
+        ctx.find_root().call_on_close(state.profiler.stop)
+    return state.profiler
+
+
 class CLIState:
     def __init__(self):
         self._sdk = None
         self._config = None
         self.assume_yes = False
+        self.profiler = CommandProfiler()
 
     @property
     def wilder(self):
@@ -98,6 +156,8 @@ def all_option(item_type):
         "--all",
         help=f"To get all {item_type}s across all artists.",
         is_flag=True,
+        # Processed first, so that other options know not to prompt for an artist.
+        is_eager=True,
         cls=incompatible_with([item_type]),
     )
 
@@ -116,6 +176,9 @@ def description_option(_help):
 
 def wild_options():
     def decorator(f):
+        f = profile_memory_option(f)
+        f = profile_top_option(f)
+        f = profile_option(f)
         f = pass_state(f)
         return f
 
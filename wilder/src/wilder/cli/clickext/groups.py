@@ -1,4 +1,5 @@
 import difflib
+import importlib
 import re
 from collections import OrderedDict
 
@@ -23,7 +24,31 @@ from wilder.lib.errors import TrackNotFoundError
 _DIFFLIB_CUT_OFF = 0.6
 
 
-class ExceptionHandlingGroup(click.Group):
+class LazyGroup(click.Group):
+    """A `click.Group` subclass that imports subcommands only when they are used, so starting
+    the CLI does not import the dependencies of every command. `lazy_subcommands` maps command
+    names to import paths like "wilder.cli.cmds.album:album".
+    """
+
+    def __init__(self, name=None, commands=None, lazy_subcommands=None, **attrs):
+        super().__init__(name, commands, **attrs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._load_command(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name):
+        module_name, attribute_name = self.lazy_subcommands[cmd_name].split(":")
+        module = importlib.import_module(module_name)
+        return getattr(module, attribute_name)
+
+
+class ExceptionHandlingGroup(LazyGroup):
     """A `click.Group` subclass to add custom exception handling."""
 
     logger = get_main_cli_logger()
@@ -87,7 +112,8 @@ class ExceptionHandlingGroup(click.Group):
             match = re.match("No such command '(.*)'.", usage_err.message)
             if match:
                 bad_arg = match.groups()[0]
-                available_commands = list(usage_err.ctx.command.commands.keys())
+                ctx = usage_err.ctx
+                available_commands = ctx.command.list_commands(ctx)
                 suggested_commands = difflib.get_close_matches(
                     bad_arg, available_commands, cutoff=_DIFFLIB_CUT_OFF
                 )
@@ -7,8 +7,13 @@ from wilder.lib.mgmt.album_dir import get_album_directory_obj
 class AlbumDirCommand(click.Command):
     def invoke(self, ctx):
         wilder = ctx.obj.wilder  # This line must stay to load context
+        if ctx.params.get("all"):
+            # Commands given --all do not need an album.
+            return super().invoke(ctx)
         album_arg = ctx.params.get(Constants.ALBUM)
         artist_arg = ctx.params.get(Constants.ARTIST)
+        # The `artist_option` callback already converts the name to an artist.
+        artist_arg = getattr(artist_arg, "name", artist_arg)
         artist = wilder.get_artist(artist_arg)
         album_dir_obj = get_album_directory_obj(
             wilder, get_default_handler=lambda: _select_album_from_list(artist)
@@ -1,9 +1,12 @@
+import os
+
 import click
 from wilder.cli.argv import album_name_arg
 from wilder.cli.argv import album_option
 from wilder.cli.argv import all_option
 from wilder.cli.argv import artist_option
 from wilder.cli.argv import audio_type_option
+from wilder.cli.argv import background_option
 from wilder.cli.argv import format_option
 from wilder.cli.argv import hard_option
 from wilder.cli.argv import new_name_arg
@@ -14,12 +17,15 @@ from wilder.cli.clickext.options import incompatible_with
 from wilder.cli.cmds import AlbumDirCommand
 from wilder.cli.cmds.util import echo_formatted_list
 from wilder.cli.output_formats import OutputFormat
+from wilder.cli.player import format_duration
 from wilder.cli.player import play_album
+from wilder.cli.player import play_in_background
 from wilder.cli.util import abridge
 from wilder.cli.util import does_user_agree
 from wilder.lib.constants import _WDirective
 from wilder.lib.constants import Constants
 from wilder.lib.mgmt.album_dir import echo_tracks
+from wilder.lib.mgmt.track import identify_audio_files
 
 
 @click.group()
@@ -32,7 +38,12 @@ def album():
 @update_album_options()
 @click.option("--path", "-p", help=f"The path where to start an album.", required=True)
 @click.option("--name", "-n", help="The name to give the album.", required=True)
-def new(state, artist, path, name, description, album_type, status):
+@click.option(
+    "--manifest",
+    help="Store the metadata of all the tracks in the album.json file.",
+    is_flag=True,
+)
+def new(state, artist, path, name, description, album_type, status, manifest):
     """Start a new album at the given path."""
     state.wilder.create_album(
         path,
@@ -41,6 +52,7 @@ def new(state, artist, path, name, description, album_type, status):
         description=description,
         album_type=album_type,
         status=status,
+        use_manifest=manifest,
     )
 
 
@@ -67,6 +79,44 @@ def _list(state, artist, format, all):
     echo_formatted_list(format, albums_json_list, header=ALBUM_HEADER)
 
 
+AUDIO_FILE_HEADER = {
+    Constants.ALBUM: "Album",
+    Constants.TRACK: "Track",
+    "file": "File",
+    "extension": "Format",
+    "mime": "MIME",
+}
+
+
+@album.command(cls=click.Command)
+@wild_options()
+@artist_option
+@album_option()
+@format_option
+@all_option(Constants.ALBUM)
+def scan(state, artist, album, format, all):
+    """Identify the format of the audio files on an artist's albums."""
+    if all:
+        tracks = state.wilder.iter_tracks()
+    elif album:
+        tracks = artist.get_album(album).tracks
+    else:
+        tracks = [t for a in artist.get_discography() for t in a.tracks]
+    audio_files = identify_audio_files(tracks)
+    rows = [_get_audio_file_row(*audio_file) for audio_file in audio_files]
+    echo_formatted_list(format, rows, header=AUDIO_FILE_HEADER)
+
+
+def _get_audio_file_row(track, path, info):
+    return {
+        Constants.ALBUM: track.album,
+        Constants.TRACK: track.name,
+        "file": os.path.basename(path),
+        "extension": info.extension[0] if info else None,
+        "mime": info.mime[0] if info else None,
+    }
+
+
 def _abridge_discography_data(albums_json_list):
     for alb in albums_json_list:
         full_desc = alb.get(Constants.DESCRIPTION)
@@ -98,6 +148,20 @@ def rename(state, new_name, artist, album):
     state.wilder.rename_album(new_name, album, artist_name=artist)
 
 
+@album.command("migrate-manifest", cls=AlbumDirCommand)
+@wild_options()
+@artist_option
+@album_option()
+@click.option(
+    "--undo",
+    help="Move the track metadata back to a track.json file per track.",
+    is_flag=True,
+)
+def migrate_manifest(state, artist, album, undo):
+    """Store the metadata of all the tracks on an album in its album.json file."""
+    state.wilder.use_album_manifest(album, artist_name=artist, enabled=not undo)
+
+
 @album.command(cls=click.Command)
 @wild_options()
 @artist_option
@@ -122,6 +186,7 @@ def show(state, artist, album):
     click.echo(f"{Constants.DESCRIPTION}: {_album.description}")
     click.echo(f"{Constants.ALBUM_TYPE}: {_album.album_type}")
     click.echo(f"{Constants.STATUS}: {_album.status}")
+    click.echo(f"runtime: {format_duration(_album.get_runtime())}")
     tracks = _album.tracks
     if tracks:
         click.echo("\nTracks:\n")
@@ -142,7 +207,8 @@ def show(state, artist, album):
     help="The number the track is on the album.",
     cls=incompatible_with("track"),
 )
-def play(state, artist, album, audio_type, track, track_number):
+@background_option
+def play(state, artist, album, audio_type, track, track_number, background):
     """Play an album."""
     _album = state.wilder.get_album(album, artist_name=artist)
     tracks = _album.get_tracks()
@@ -152,4 +218,14 @@ def play(state, artist, album, audio_type, track, track_number):
         start_track = _album.get_track(track)
     else:
         start_track = tracks[0]
-    play_album(state.wilder, _album, start_track, audio_type)
+    if background:
+        play_queue = state.wilder.get_album_queue(
+            _album.name,
+            artist_name=_album.artist,
+            start_track_name=start_track.name,
+            audio_type=audio_type,
+            loop=True,
+        )
+        play_in_background(play_queue)
+    else:
+        play_album(state.wilder, _album, start_track, audio_type)
@@ -1,14 +1,20 @@
 import json
 
 import click
+from wilder.cli.argv import format_option
 from wilder.cli.argv import wild_options
 from wilder.cli.argv import yes_option
+from wilder.cli.cmds.util import echo_formatted_list
 from wilder.cli.util import does_user_agree
 from wilder.cli.util import get_user_project_path
 from wilder.lib.config import get_config_json
+from wilder.lib.config import set_storage
 from wilder.lib.constants import Constants
+from wilder.lib.storage import get_storage
+from wilder.lib.storage import STORAGE_NAMES
+from wilder.lib.storage.bridge import copy_catalog
+from wilder.lib.util.iostats import record_io
 from wilder.lib.util.sh import remove_directory
-from wilder.server.main import run
 
 
 @click.group()
@@ -36,3 +42,46 @@ def mgmt(state):
     _json = state.wilder.get_mgmt()
     _json = json.dumps(_json, indent=2)
     click.echo(_json)
+
+
+@dev.command("migrate-storage")
+@click.argument("storage_name", type=click.Choice(STORAGE_NAMES))
+def migrate_storage(storage_name):
+    """Copy the catalog to another storage and start using it. Migrating to `json` exports the
+    catalog back to album.json and track.json files in the album directories."""
+    source = get_storage(read_only=True)
+    if source.name == storage_name:
+        click.echo(f"Already using {storage_name} storage.")
+        return
+    destination = get_storage(name=storage_name)
+    copy_catalog(source, destination)
+    set_storage(storage_name)
+    click.echo(f"Now using {storage_name} storage.")
+
+
+IO_STATS_HEADER = {
+    "caller": "Caller",
+    "operation": "Operation",
+    "calls": "Calls",
+    "bytes": "Bytes",
+    "seconds": "Seconds",
+}
+
+
+@dev.command(
+    "io-stats",
+    context_settings={"ignore_unknown_options": True, "allow_interspersed_args": False},
+)
+@format_option
+@click.argument("command", nargs=-1, type=click.UNPROCESSED, required=True)
+def io_stats(format, command):
+    """Run a wild command and show the file operations it made, per calling SDK method. For
+    example, `wild dev io-stats album list`."""
+    from wilder.cli.main import cli
+
+    with record_io() as stats:
+        cli.main(list(command), prog_name="wild", standalone_mode=False)
+    records = stats.to_records()
+    for record in records:
+        record["seconds"] = round(record["seconds"], 6)
+    echo_formatted_list(format, records, header=IO_STATS_HEADER)
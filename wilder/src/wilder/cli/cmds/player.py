@@ -0,0 +1,33 @@
+import click
+from wilder.cli.player import format_player_status
+from wilder.lib.daemon import PlayerClient
+
+
+@click.group()
+def player():
+    """Control the background player, which plays tracks started with `--background`."""
+    pass
+
+
+@player.command()
+def status():
+    """Show what the background player is playing."""
+    click.echo(format_player_status(PlayerClient().get_status()))
+
+
+@player.command()
+def pause():
+    """Pause the background player, or resume it if it is paused."""
+    PlayerClient().pause()
+
+
+@player.command("next")
+def _next():
+    """Skip to the next track."""
+    PlayerClient().next()
+
+
+@player.command()
+def stop():
+    """Stop the background player."""
+    PlayerClient().shutdown()
@@ -3,6 +3,7 @@ from wilder.cli.argv import album_option
 from wilder.cli.argv import all_option
 from wilder.cli.argv import artist_option
 from wilder.cli.argv import audio_type_option
+from wilder.cli.argv import background_option
 from wilder.cli.argv import collaborator_option
 from wilder.cli.argv import description_option
 from wilder.cli.argv import hard_option
@@ -14,9 +15,11 @@ from wilder.cli.argv import wild_options
 from wilder.cli.argv import yes_option
 from wilder.cli.cmds import AlbumDirCommand
 from wilder.cli.select import get_user_selected_item
+from wilder.cli.player import play_in_background
 from wilder.cli.player import play_track
 from wilder.cli.util import does_user_agree
 from wilder.lib.constants import Constants
+from wilder.lib.mgmt.album_dir import echo_all_tracks
 from wilder.lib.mgmt.album_dir import echo_tracks
 
 
@@ -62,12 +65,11 @@ def metadata_options():
 def _list(state, artist, album, all):
     """List the tracks on an album."""
     if all:
-        tracks = []
-        artists = state.wilder.get_artists()
-    else:
-        _album = state.wilder.get_album(album, artist_name=artist)
-        tracks = _album.get_tracks()
-        click.echo(f"'{_album.name}' by {_album.artist}: \n")
+        echo_all_tracks(state.wilder.iter_tracks())
+        return
+    _album = state.wilder.get_album(album, artist_name=artist)
+    tracks = _album.get_tracks()
+    click.echo(f"'{_album.name}' by {_album.artist}: \n")
     echo_tracks(tracks)
 
 
@@ -166,7 +168,28 @@ def _get_track_num_choices(track_names, choices, answer_dict=None):
 @track.command(cls=AlbumDirCommand)
 @single_track_options()
 @audio_type_option
-def play(state, track_name, artist, album, audio_type):
+@background_option
+def play(state, track_name, artist, album, audio_type, background):
     """Play a track."""
     _track = state.wilder.get_track(track_name, album, artist_name=artist)
-    play_track(state.wilder, _track, audio_type=audio_type)
+    if background:
+        play_queue = state.wilder.get_track_queue(
+            _track.name, _track.album, audio_type=audio_type, artist_name=_track.artist
+        )
+        play_in_background(play_queue)
+    else:
+        play_track(state.wilder, _track, audio_type=audio_type)
+
+
+@track.command(cls=AlbumDirCommand)
+@single_track_options()
+@audio_type_option
+def waveform(state, track_name, artist, album, audio_type):
+    """Compute a track's waveform peaks, which the server sends for drawing it."""
+    _waveform = state.wilder.get_track_waveform(
+        track_name, album, audio_type=audio_type, artist_name=artist
+    )
+    zoom_levels = ", ".join(str(level) for level in _waveform.zoom_levels)
+    click.echo(
+        f"Saved the waveform of '{track_name}' at {zoom_levels} frames per peak."
+    )
@@ -4,16 +4,14 @@ import sys
 import click
 from wilder.cli.argv import wild_options
 from wilder.cli.clickext.groups import ExceptionHandlingGroup
-from wilder.cli.cmds.album import album
-from wilder.cli.cmds.artist import artist
-from wilder.cli.cmds.config import config
-from wilder.cli.cmds.dev import dev
-from wilder.cli.cmds.track import track
 from wilder.cli.logger import get_cli_error_log_path
 from wilder.lib.config import get_config_json
 from wilder.lib.constants import Constants
 from wilder.lib.util.sh import wopen
-from wilder.server.main import run
+from wilder.server.wsgi import DEFAULT_THREADS
+from wilder.server.wsgi import DEFAULT_TIMEOUT
+from wilder.server.wsgi import DEFAULT_WORKERS
+from wilder.server.wsgi import is_gunicorn_available
 
 BANNER = """\b
  |#  ^^  |#  ^#  ^#      |#~~~~#   |#~~~~  ^#~~~~~#
@@ -36,8 +34,23 @@ CONTEXT_SETTINGS = {
     "max_content_width": 200,
 }
 
+# Subcommand groups are imported when invoked, along with their dependencies.
+LAZY_SUBCOMMANDS = {
+    "album": "wilder.cli.cmds.album:album",
+    "artist": "wilder.cli.cmds.artist:artist",
+    "config": "wilder.cli.cmds.config:config",
+    "dev": "wilder.cli.cmds.dev:dev",
+    "player": "wilder.cli.cmds.player:player",
+    "track": "wilder.cli.cmds.track:track",
+}
+
 
-@click.group(cls=ExceptionHandlingGroup, context_settings=CONTEXT_SETTINGS, help=BANNER)
+@click.group(
+    cls=ExceptionHandlingGroup,
+    context_settings=CONTEXT_SETTINGS,
+    help=BANNER,
+    lazy_subcommands=LAZY_SUBCOMMANDS,
+)
 @wild_options()
 def cli(state):
     """The Wild CLI."""
@@ -64,20 +77,52 @@ def logs(last_n_lines):
 
 
 @cli.command()
-def start_server():
-    """Start the wilder server."""
-    _start_server()
-
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=DEFAULT_WORKERS,
+    help="The number of worker processes. More than one requires gunicorn.",
+)
+@click.option(
+    "--threads",
+    "-t",
+    type=click.IntRange(min=1),
+    default=DEFAULT_THREADS,
+    help="The number of threads handling requests in each worker process. Without "
+    "gunicorn, any number above 1 handles each request on a thread of its own.",
+)
+@click.option(
+    "--timeout",
+    type=click.IntRange(min=1),
+    help="The seconds a request may take before gunicorn restarts its worker. Without "
+    "gunicorn, the seconds a client may wait between sending data. Defaults to "
+    f"{DEFAULT_TIMEOUT}.",
+)
+def start_server(workers, threads, timeout):
+    """Start the wilder server. With gunicorn installed, send the server a SIGHUP to reload
+    its workers gracefully."""
+    if not is_gunicorn_available():
+        if workers > 1:
+            raise click.BadParameter(
+                "Install gunicorn to use more than one worker, "
+                "such as using `pip install wilder[server]`.",
+                param_hint="--workers",
+            )
+        if timeout is not None:
+            click.echo(
+                "Without gunicorn, --timeout only limits how long a client may wait "
+                "between sending data, and requests that take longer are not stopped.",
+                err=True,
+            )
+    _start_server(workers, threads, timeout or DEFAULT_TIMEOUT)
+
+
+def _start_server(workers, threads, timeout):
+    from wilder.server.main import run
 
-def _start_server():
     _config = get_config_json().get(Constants.CLIENT)
-    host = _config.get(Constants.HOST, Constants.DEFAULT_HOST)
-    port = _config.get(Constants.PORT, Constants.DEFAULT_PORT)
-    run(host, port)
-
-
-cli.add_command(album)
-cli.add_command(artist)
-cli.add_command(track)
-cli.add_command(config)
-cli.add_command(dev)
+    # The config file has these keys set to null until they are configured.
+    host = _config.get(Constants.HOST) or Constants.DEFAULT_HOST
+    port = int(_config.get(Constants.PORT) or Constants.DEFAULT_PORT)
+    run(host, port, workers=workers, threads=threads, timeout=timeout)
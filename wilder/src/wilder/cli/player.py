@@ -1,53 +1,84 @@
+import sys
 from datetime import timedelta
 
 import click
-from wilder.lib.util.sh import BEGIN_OF_PREVIOUS_LINE
-from wilder.lib.util.sh import count_lines
+from wilder.lib.daemon import PlayerClient
+from wilder.lib.playqueue import PlayQueue
+from wilder.lib.playqueue import QueueEntry
 
+CURSOR_UP = "\033[{}A"
+CURSOR_DOWN = "\033[{}B"
+CLEAR_LINE = "\033[K"
 
-def play_album(wilder, album, start_track, audio_type=None):
-    tracks = album.get_tracks()
-    start_index = _get_index_of_track(start_track, tracks)
 
-    def play_track_at_index(index):
-        track = tracks[index]
-        for time_remaining in wilder.play_track(
-            track.name, track.album, audio_type=audio_type, artist_name=track.artist
-        ):
-            text = _get_album_player_text(album, index, time_remaining)
-            number_of_lines = count_lines(text)
-            print(f" {text}", end=f"{number_of_lines * BEGIN_OF_PREVIOUS_LINE}")
-        next_index = (index + 1) % len(tracks)
+class AlbumPlayerDisplay:
+    """Shows an album's track list with a countdown next to the track that is playing. The
+    layout is computed and drawn once, after which each update rewrites only the lines
+    that changed, using cursor movement."""
+
+    def __init__(self, album, tracks, stream=None):
+        self._stream = stream
+        self._lines = [f"'{album.name}' by '{album.artist}'", ""]
+        self._first_track_line = len(self._lines)
+        self._lines.extend(f"{t.track_number}. {t.name}" for t in tracks)
+        self._now_playing_index = None
+        self._is_drawn = False
+
+    def draw(self):
+        """Write the whole layout. The cursor is left on the line after it."""
+        lines = [self._get_track_line_text(i) for i in range(len(self._lines))]
+        self._write("".join(f"{line}\n" for line in lines))
+        self._is_drawn = True
 
-        play_track_at_index(next_index)
+    def update(self, now_playing_index, time_remaining):
+        """Show the countdown next to the given track, drawing the layout first if needed."""
+        if not self._is_drawn:
+            self._now_playing_index = now_playing_index
+            self.draw()
+        previous_index = self._now_playing_index
+        self._now_playing_index = now_playing_index
+        if previous_index != now_playing_index:
+            self._redraw_line(self._first_track_line + previous_index)
+        line_index = self._first_track_line + now_playing_index
+        self._redraw_line(line_index, time_remaining)
 
-    play_track_at_index(start_index)
+    def _get_track_line_text(self, line_index, time_remaining=None):
+        text = self._lines[line_index]
+        if line_index < self._first_track_line:
+            return text
+        if line_index - self._first_track_line != self._now_playing_index:
+            return f" {text}"
+        time_remaining_text = _format_time_remaining(time_remaining or 0)
+        return f">{text}{' ' * 9}{time_remaining_text}"
 
+    def _redraw_line(self, line_index, time_remaining=None):
+        lines_up = len(self._lines) - line_index
+        text = self._get_track_line_text(line_index, time_remaining)
+        self._write(
+            f"{CURSOR_UP.format(lines_up)}\r{CLEAR_LINE}{text}"
+            f"{CURSOR_DOWN.format(lines_up)}\r"
+        )
 
-def _get_index_of_track(track, tracks):
-    for index in range(0, len(tracks)):
-        track_to_check = tracks[index]
-        if track_to_check.name == track.name:
-            return index
+    def _write(self, text):
+        # Not `click.echo()`, which removes the cursor movement when not in a terminal.
+        stream = self._stream or sys.stdout
+        stream.write(text)
+        stream.flush()
 
 
-def _get_album_player_text(album, now_playing_index, time_remaining):
+def play_album(wilder, album, start_track, audio_type=None):
     tracks = album.get_tracks()
-    album_text = f"'{album.name}' by '{album.artist}'\n\n"
-    for index in range(0, len(tracks)):
-        track = tracks[index]
-        track_text = f"{track.track_number}. {track.name}"
-        if index == now_playing_index:
-            prefix = ">"
-            spaces = " " * 9
-            time_remaining_text = _format_time_remaining(time_remaining)
-            track_text += f"{spaces}{time_remaining_text}"
-        else:
-            prefix = " "
-            trailing_spaces = " " * 16  # Clears previous 'time remaining' text
-            track_text += f"{trailing_spaces}"
-        album_text += f"{prefix}{track_text}\n"
-    return album_text
+    track_indexes = {t.name: i for i, t in enumerate(tracks)}
+    display = AlbumPlayerDisplay(album, tracks)
+    player = wilder.play_album(
+        album.name,
+        artist_name=album.artist,
+        start_track_name=start_track.name,
+        audio_type=audio_type,
+        loop=True,
+    )
+    for entry, time_remaining in player.play():
+        display.update(track_indexes[entry.item.name], time_remaining)
 
 
 def play_track(wilder, track, audio_type=None):
@@ -57,9 +88,44 @@ def play_track(wilder, track, audio_type=None):
         track.name, track.album, audio_type=audio_type, artist_name=track.artist
     ):
         time_remaining_text = _format_time_remaining(time_remaining)
-        print(f" {time_remaining_text}", end="\r")
+        click.echo(f"\r{CLEAR_LINE} {time_remaining_text}", nl=False)
+    click.echo()
+
+
+def play_in_background(play_queue):
+    """Send the queue of tracks to the background player, starting it if needed."""
+    entries = [
+        QueueEntry(e.path, duration=e.duration, item=_get_track_json(e.item))
+        for e in play_queue.entries
+    ]
+    play_queue = PlayQueue(entries, start_index=play_queue.index, loop=play_queue.loop)
+    status = PlayerClient().play(play_queue)
+    click.echo(format_player_status(status))
+
+
+def format_player_status(status):
+    if status.get("state") == "stopped":
+        return "Nothing is playing."
+    state = status["state"].capitalize()
+    position = f"{status['index'] + 1} of {status['count']}"
+    item = status.get("item")
+    if not item:
+        return f"{state} {position}."
+    text = f"{state} '{item['name']}' by '{item['artist']}' ({position})"
+    remaining = status.get("remaining")
+    if remaining is not None:
+        text += f", {_format_time_remaining(remaining)} remaining"
+    return f"{text}."
+
+
+def _get_track_json(track):
+    return {"name": track.name, "album": track.album, "artist": track.artist}
 
 
 def _format_time_remaining(time_remaining):
-    time_delta = timedelta(seconds=round(time_remaining))
+    return format_duration(time_remaining)
+
+
+def format_duration(seconds):
+    time_delta = timedelta(seconds=round(seconds))
     return f"{str(time_delta)}"
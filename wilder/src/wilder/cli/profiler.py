@@ -0,0 +1,86 @@
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from datetime import datetime
+
+import click
+from wilder.cli.util import get_user_project_path
+
+DEFAULT_TOP_N = 20
+
+
+def get_profile_path():
+    """The path to save a new profile to, in the CLI log directory."""
+    log_path = get_user_project_path("log")
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(log_path, f"wilder-cli-{timestamp}.pstats")
+
+
+class CommandProfiler:
+    """Profiles a command with cProfile and, optionally, traces its memory with tracemalloc.
+    When stopped, it saves the profile and prints the hotspots to stderr, so the command's
+    own output is not affected."""
+
+    def __init__(self):
+        self.top_n = DEFAULT_TOP_N
+        self._profile = None
+        self._is_tracing_memory = False
+
+    @property
+    def is_profiling(self):
+        return self._profile is not None or self._is_tracing_memory
+
+    def start(self):
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def start_tracing_memory(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._is_tracing_memory = True
+
+    def stop(self):
+        """Stop profiling and report the results. Stopping more than once has no effect."""
+        if self._profile is not None:
+            self._profile.disable()
+            self._report_profile(self._profile)
+            self._profile = None
+        if self._is_tracing_memory:
+            self._report_memory()
+            tracemalloc.stop()
+            self._is_tracing_memory = False
+
+    def _report_profile(self, profile):
+        profile_path = get_profile_path()
+        profile.dump_stats(profile_path)
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(self.top_n)
+        click.echo(stream.getvalue().rstrip(), err=True)
+        click.echo(
+            f"Profile saved to {profile_path}. View it using "
+            f"`python -m pstats {profile_path}`.",
+            err=True,
+        )
+
+    def _report_memory(self):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        click.echo(
+            f"Memory: {_format_bytes(current)} when done, {_format_bytes(peak)} at peak.",
+            err=True,
+        )
+        click.echo(f"Top {self.top_n} lines by memory allocated:", err=True)
+        for stat in snapshot.statistics("lineno")[: self.top_n]:
+            click.echo(f"  {stat}", err=True)
+
+
+def _format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
@@ -1,6 +1,3 @@
-from PyInquirer import prompt
-
-
 def get_user_selected_resource(item_type, choices):
     """Prompts the user for which item they would like to pick from a list."""
     message = f"Please select a {item_type}."
@@ -9,6 +6,9 @@ def get_user_selected_resource(item_type, choices):
 
 def get_user_selected_item(message, choices):
     """Prompts the user for which item they would like to pick from a list."""
+    # PyInquirer is slow to import and only needed when prompting.
+    from PyInquirer import prompt
+
     question = {
         "type": "list",
         "name": "choice",
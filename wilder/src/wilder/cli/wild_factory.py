@@ -1,5 +1,6 @@
+import atexit
+
 from wilder.cli.errors import WildServerConnectionError
-from wilder.client.main import create_client
 from wilder.lib.config import create_config_object
 from wilder.sdk import get_wilder_sdk
 
@@ -7,13 +8,26 @@ from wilder.sdk import get_wilder_sdk
 def get_wilder():
     config = create_config_object()
     wild_girl = (
-        create_client(config)
+        _create_client(config)
         if config.is_using_config() and config.is_enabled
-        else get_wilder_sdk()
+        else _get_wilder_sdk()
     )
     return _test_connection(wild_girl)
 
 
+def _create_client(config):
+    # The client's HTTP dependencies are only imported when using a server.
+    from wilder.client.main import create_client
+
+    return create_client(config)
+
+
+def _get_wilder_sdk():
+    wilder = get_wilder_sdk(use_snapshot=True)
+    atexit.register(wilder.storage.save_snapshot)
+    return wilder
+
+
 def _test_connection(sdk):
     try:
         if not sdk:
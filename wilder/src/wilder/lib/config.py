@@ -5,6 +5,7 @@ from wilder.lib.constants import Constants
 from wilder.lib.user import get_config_path
 from wilder.lib.util.conversion import to_bool
 from wilder.lib.util.conversion import to_int
+from wilder.lib.util.sh import file_exists_with_data
 from wilder.lib.util.sh import load_json_from_file
 from wilder.lib.util.sh import wopen
 
@@ -32,6 +33,22 @@ def set_client_settings(client_config_json):
     return _config
 
 
+def set_storage(storage_name):
+    config_path = get_config_path()
+    _config = create_config_object()
+    _config.storage = storage_name
+    _save_config_change(config_path, _config.json)
+    return _config
+
+
+def get_storage_name():
+    """The name of the configured storage, if set. Does not create the config file."""
+    config_path = get_config_path(create_if_not_exists=False)
+    if not file_exists_with_data(config_path):
+        return None
+    return create_config_object(load_json_from_file(config_path)).storage
+
+
 def _save_config_change(config_path, config_json):
     if os.path.exists(config_path):
         os.remove(config_path)
@@ -71,6 +88,14 @@ class WildConfig:
     def is_using_config(self):
         return self.host is not None and self.host != "" and isinstance(self.host, str)
 
+    @property
+    def storage(self):
+        return self.json.get(Constants.STORAGE)
+
+    @storage.setter
+    def storage(self, storage):
+        self.json[Constants.STORAGE] = storage
+
     @property
     def client_settings(self):
         return self.json.get(Constants.CLIENT)
@@ -11,7 +11,9 @@ class Constants:
     ARTIST = "artist"
     ARTISTS = "artists"
     ARTWORK = "artwork"
+    AUDIO_TYPE = "audioType"
     BIO = "bio"
+    CHANNELS = "channels"
     CLIENT = "client"
     CREATE_ALBUM = "create-album"
     CREATE_TRACK = "create-track"
@@ -24,21 +26,27 @@ class Constants:
     FOCUS = "focus"
     FOCUS_ARTIST = "focusArtist"
     FORGET_OLD_NAME = "forgetOldName"
+    FRAMES = "frames"
+    FRAMES_PER_PEAK = "framesPerPeak"
     HOST = "host"
     IS_ENABLED = "isEnabled"
     LAST_UPDATED = "lastUpdated"
     LIST = "list"
     LIST_TRACKS = "list-tracks"
+    MANIFEST = "manifest"
     MGMT = "mgmt"
     NAME = "name"
     NEW_NAME = "newName"
     PATH = "path"
+    PEAKS = "peaks"
     PORT = "port"
     RELEASE_DATE = "releaseDate"
     RELEASE_TYPE = "releaseType"
     RELEASES = "releases"
     RENAME = "rename"
+    SAMPLE_RATE = "sampleRate"
     STATUS = "status"
+    STORAGE = "storage"
     TRACK_NUMBER = "trackNumber"
     TRACK = "track"
     TRACKS = "tracks"
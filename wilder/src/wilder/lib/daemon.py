@@ -0,0 +1,317 @@
+import argparse
+import fcntl
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+from wilder.lib.errors import PlayerDaemonError
+from wilder.lib.errors import PlayerNotRunningError
+from wilder.lib.playqueue import PlayQueue
+from wilder.lib.playqueue import QueueEntry
+from wilder.lib.user import get_project_path
+from wilder.lib.util.sh import remove_socket_if_exists
+
+# This module runs the player in a background process that outlives the CLI commands that
+# use it. Commands are sent as one line of JSON over a Unix domain socket and are answered
+# the same way.
+
+DEFAULT_IDLE_TIMEOUT = 600
+_START_TIMEOUT = 5
+_START_POLL_INTERVAL = 0.02
+_STOPPED = "stopped"
+_PLAYING = "playing"
+_PAUSED = "paused"
+
+
+def get_player_socket_path():
+    return os.path.join(get_project_path(), "player.sock")
+
+
+class PlayerDaemon:
+    """Plays queues sent by CLI processes. The VLC instance and its parsed media are kept
+    between commands, so playing again starts right away. The daemon exits once it has
+    been idle, with nothing playing, for `idle_timeout` seconds."""
+
+    def __init__(self, socket_path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.socket_path = socket_path or get_player_socket_path()
+        self.idle_timeout = idle_timeout
+        self._server = None
+        self._lock = threading.Lock()
+        self._last_active = time.monotonic()
+        self._instance = None
+        self._media_cache = None
+        self._player = None
+        self._player_thread = None
+        self._now_playing = None
+        self._handlers = {
+            "play": self._play,
+            "pause": self._pause,
+            "next": self._next,
+            "stop": self._stop,
+            "status": self._get_status,
+            "shutdown": self._shutdown,
+        }
+
+    def serve(self):
+        """Answer commands until shut down or idle. Returns right away if another daemon is
+        already answering on the socket or starting to."""
+        lock_file = self._lock_socket()
+        if lock_file is None:
+            return
+        with lock_file:
+            # Only the daemon holding the lock touches the socket, so a socket left behind
+            # by one that crashed can be removed without removing another's.
+            remove_socket_if_exists(self.socket_path)
+            self._server = _PlayerServer(self.socket_path, self)
+            watcher = threading.Thread(target=self._shut_down_when_idle, daemon=True)
+            watcher.start()
+            try:
+                self._server.serve_forever()
+            finally:
+                self._server.server_close()
+                remove_socket_if_exists(self.socket_path)
+                self._stop()
+
+    def _lock_socket(self):
+        """Returns the open lock file of the socket, or None if another daemon holds it. The
+        lock is released when the file is closed, including when the process exits."""
+        lock_file = open(f"{self.socket_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def handle(self, request):
+        """Do the given command and return the response."""
+        self._last_active = time.monotonic()
+        command = request.get("command")
+        handler = self._handlers.get(command)
+        if handler is None:
+            return {"error": f"Unknown command '{command}'."}
+        try:
+            with self._lock:
+                return handler(**request.get("params", {}))
+        except Exception as err:
+            return {"error": str(err)}
+
+    @property
+    def is_playing(self):
+        return self._player_thread is not None and self._player_thread.is_alive()
+
+    def _play(self, entries, start_index=0, loop=False):
+        # VLC is slow to load, so it is loaded for the first play instead of at start.
+        import vlc
+        from wilder.lib.player import MediaCache
+        from wilder.lib.player import QueuePlayer
+
+        self._stop()
+        if self._instance is None:
+            self._instance = vlc.Instance()
+            self._media_cache = MediaCache(self._instance)
+        entries = [QueueEntry.from_json(e) for e in entries]
+        play_queue = PlayQueue(entries, start_index=start_index, loop=loop)
+        self._player = QueuePlayer(
+            play_queue, instance=self._instance, media_cache=self._media_cache
+        )
+        self._player_thread = threading.Thread(
+            target=self._run_player, args=(self._player,), daemon=True
+        )
+        self._player_thread.start()
+        return self._get_status()
+
+    def _run_player(self, player):
+        for entry, remaining in player.play():
+            self._now_playing = (entry, remaining)
+        self._now_playing = None
+        self._last_active = time.monotonic()
+
+    def _pause(self):
+        self._get_running_player().pause()
+        return {}
+
+    def _next(self):
+        self._get_running_player().skip()
+        return {}
+
+    def _stop(self):
+        if self.is_playing:
+            self._player.stop()
+            self._player_thread.join()
+        self._now_playing = None
+        return {}
+
+    def _get_running_player(self):
+        if not self.is_playing:
+            raise PlayerNotRunningError()
+        return self._player
+
+    def _get_status(self):
+        if not self.is_playing:
+            return {"state": _STOPPED}
+        play_queue = self._player.queue
+        status = {
+            "state": _PAUSED if self._player.is_paused else _PLAYING,
+            "index": play_queue.index,
+            "count": len(play_queue),
+        }
+        now_playing = self._now_playing
+        if now_playing is not None:
+            status["item"] = now_playing[0].item
+            status["remaining"] = now_playing[1]
+        return status
+
+    def _shutdown(self):
+        # Shutting down waits for the request to finish, so it is done on another thread.
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return {}
+
+    def _shut_down_when_idle(self):
+        while True:
+            time.sleep(min(self.idle_timeout, 5))
+            idle_time = time.monotonic() - self._last_active
+            if not self.is_playing and idle_time > self.idle_timeout:
+                self._server.shutdown()
+                return
+
+
+class _PlayerServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, player_daemon):
+        self.player_daemon = player_daemon
+        super().__init__(socket_path, _PlayerRequestHandler)
+
+
+class _PlayerRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # A client checking that the daemon is running.
+            return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {"error": "Invalid request."}
+        else:
+            response = self.server.player_daemon.handle(request)
+        self.wfile.write(f"{json.dumps(response)}\n".encode("utf-8"))
+
+
+class PlayerClient:
+    """Sends commands to the background player. The player is started when first asked to
+    play something."""
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or get_player_socket_path()
+
+    def play(self, play_queue):
+        """Play the queue in the background, replacing whatever is playing."""
+        params = {
+            "entries": [e.to_json() for e in play_queue.entries],
+            "start_index": play_queue.index or 0,
+            "loop": play_queue.loop,
+        }
+        if not self.is_running():
+            self._start()
+        return self.send("play", **params)
+
+    def pause(self):
+        """Pause what is playing, or resume it if it is paused."""
+        return self.send("pause")
+
+    def next(self):
+        """Skip to the next entry of the queue."""
+        return self.send("next")
+
+    def stop(self):
+        """Stop playing. The background player keeps running until it is idle."""
+        return self.send("stop")
+
+    def get_status(self):
+        """The state of the player and what it is playing."""
+        if not self.is_running():
+            return {"state": _STOPPED}
+        return self.send("status")
+
+    def shutdown(self):
+        """Stop playing and exit the background player."""
+        if self.is_running():
+            self.send("shutdown")
+
+    def wait_until_running(self, timeout=_START_TIMEOUT):
+        """Wait for the background player to answer. Returns False if it does not before the
+        timeout."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.is_running():
+                return True
+            time.sleep(_START_POLL_INTERVAL)
+        return False
+
+    def is_running(self):
+        try:
+            with self._connect():
+                return True
+        except OSError:
+            return False
+
+    def send(self, command, **params):
+        """Send a command and return the response."""
+        try:
+            connection = self._connect()
+        except OSError:
+            raise PlayerNotRunningError()
+        with connection:
+            request = {"command": command, "params": params}
+            connection.sendall(f"{json.dumps(request)}\n".encode("utf-8"))
+            with connection.makefile("rb") as reader:
+                response = json.loads(reader.readline() or "{}")
+        if "error" in response:
+            raise PlayerDaemonError(response["error"])
+        return response
+
+    def _connect(self):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.socket_path)
+        except OSError:
+            connection.close()
+            raise
+        return connection
+
+    def _start(self):
+        # A new session keeps the player running after the CLI process and its terminal
+        # are gone.
+        subprocess.Popen(
+            [sys.executable, "-m", __name__, "--socket", self.socket_path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        if not self.wait_until_running():
+            raise PlayerDaemonError("Timed out waiting for the player to start.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Wilder background player.")
+    parser.add_argument("--socket", help="The path of the socket to listen on.")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="The seconds to wait with nothing playing before exiting.",
+    )
+    args = parser.parse_args(argv)
+    PlayerDaemon(socket_path=args.socket, idle_timeout=args.idle_timeout).serve()
+
+
+if __name__ == "__main__":
+    main()
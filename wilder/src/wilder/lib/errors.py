@@ -107,6 +107,30 @@ class WildVLCPlayerLaunchError(WildError):
         super().__init__("VLC Media Player failed to launch.")
 
 
+class PlayerNotRunningError(WildError):
+    """An error raised when controlling the background player while it is not running."""
+
+    def __init__(self):
+        super().__init__("Nothing is playing in the background.")
+
+
+class PlayerDaemonError(WildError):
+    """An error raised when the background player fails to start or to do a command."""
+
+    def __init__(self, message):
+        super().__init__(f"Background player error: {message}")
+
+
+class MissingOptionalDependencyError(WildError):
+    """An error raised when using a feature that needs a package that is not installed."""
+
+    def __init__(self, package, feature):
+        super().__init__(
+            f"Package '{package}' is required for {feature}. "
+            f"Install it using `pip install {package}`."
+        )
+
+
 class UnsupportedAudioTypeError(WildError):
     """An error raised when receiving an unknown audio type."""
 
@@ -126,3 +150,21 @@ class NoAudioFoundError(WildError):
 
     def __init__(self, track_name):
         super().__init__(f"Track '{track_name}' has no audio.")
+
+
+class WaveformNotFoundError(WildNotFoundError):
+    """An error raised when a track's waveform has not been computed, or its audio changed
+    since."""
+
+    def __init__(self, track_name, audio_type):
+        super().__init__(
+            f"Track '{track_name}' has no waveform for its '{audio_type}' audio. "
+            "Compute it using `wild track waveform`."
+        )
+
+
+class ReadOnlyWilderError(WildError):
+    """An error raised when trying to make changes using a read-only Wilder SDK."""
+
+    def __init__(self):
+        super().__init__("Unable to make changes in read-only mode.")
@@ -1,7 +1,16 @@
+import json
+import mmap
 import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from stat import S_ISREG
 
-from wilder.errors import InvalidAudioFileError
-from wilder.errors import WildNotFoundError
+from wilder.lib.errors import InvalidAudioFileError
+from wilder.lib.errors import WildNotFoundError
+from wilder.lib.user import get_project_path
+from wilder.lib.util.sh import load_json_from_file
+from wilder.lib.util.sh import save_bytes_as
+from wilder.lib.util.sh import wopen
 
 """
 Forked from fleep library by Mykyta Paliienko (https://github.com/floyernick/fleep-py).
@@ -115,6 +124,25 @@ AUDIO_FILE_DATA = [
     },
 ]
 
+# The number of bytes at the start of a file that the signatures are matched against.
+HEADER_SIZE = 128
+AUDIO_INFO_CACHE_VERSION = 1
+
+
+def _compile_signatures(file_data):
+    """Convert the hex signatures to bytes, grouped by offset and then by their first byte, so
+    that only the signatures that can match a header are compared."""
+    signatures = {}
+    for element in file_data:
+        for signature in element["signature"]:
+            pattern = bytes.fromhex(signature)
+            by_first_byte = signatures.setdefault(element["offset"], {})
+            by_first_byte.setdefault(pattern[0], []).append((pattern, element))
+    return tuple(sorted(signatures.items()))
+
+
+_SIGNATURES = _compile_signatures(AUDIO_FILE_DATA)
+
 
 def get_audio_file_info(audio_file_path):
     """Determines file format and picks suitable file types, extensions and MIME types.
@@ -128,6 +156,139 @@ def get_audio_file_info(audio_file_path):
     return builder.build()
 
 
+def identify_many(audio_file_paths, max_workers=None, cache=None):
+    """Determines the file info of many files, reading up to `max_workers` of them at once.
+
+    The results are cached by each file's path, size and modified time, so files that did not
+    change since they were last identified only cost a stat.
+
+    Args:
+        audio_file_paths (iter): The paths to audio files.
+        max_workers (int): The most files to read at once. Defaults to the thread pool default.
+        cache (AudioInfoCache): The cache to use. Defaults to the one in ~/.wilder/cache, which
+            is saved when done.
+
+    Returns: A dict of each path that is a file to its wilder.fleep.Info, or to None if it is
+    not a supported audio file.
+    """
+    is_default_cache = cache is None
+    if is_default_cache:
+        cache = AudioInfoCache(get_audio_info_cache_path())
+
+    results = {}
+    unknown = []
+    for path in dict.fromkeys(audio_file_paths):
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            continue
+        if not S_ISREG(file_stat.st_mode):
+            continue
+        is_cached, info = cache.lookup(path, file_stat)
+        if is_cached:
+            results[path] = info
+        else:
+            unknown.append((path, file_stat))
+
+    for (path, file_stat), info in zip(unknown, _identify_all(unknown, max_workers)):
+        cache.remember(path, file_stat, info)
+        results[path] = info
+    if is_default_cache:
+        cache.save()
+    return results
+
+
+def _identify_all(paths_with_stats, max_workers):
+    paths = [path for path, _ in paths_with_stats]
+    if max_workers == 1 or len(paths) < 2:
+        return [_try_get_audio_file_info(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_try_get_audio_file_info, paths))
+
+
+def _try_get_audio_file_info(audio_file_path):
+    try:
+        return get_audio_file_info(audio_file_path)
+    except (InvalidAudioFileError, WildNotFoundError, OSError):
+        return None
+
+
+def get_audio_info_cache_path():
+    return os.path.join(get_project_path("cache"), "audio-info.json")
+
+
+class AudioInfoCache:
+    """Remembers the info of files by their path, size and modified time. Files that are not
+    audio are remembered too, so they are not read again either. Only the files looked up or
+    remembered since the cache was created are saved, so files no longer used are dropped.
+
+    Args:
+        cache_path (str): The JSON file to keep the cache in, if any.
+    """
+
+    def __init__(self, cache_path=None):
+        self._cache_path = cache_path
+        self._entries = None
+        self._seen_paths = set()
+        self._is_changed = False
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = _read_audio_info_cache(self._cache_path)
+        return self._entries
+
+    def lookup(self, path, file_stat):
+        """Returns whether the file is cached and its cached info, which may be None."""
+        self._seen_paths.add(path)
+        entry = self.entries.get(path)
+        if entry is None or entry[:2] != [file_stat.st_size, file_stat.st_mtime_ns]:
+            return False, None
+        info_json = entry[2]
+        return True, Info.from_json(info_json) if info_json else None
+
+    def remember(self, path, file_stat, info):
+        info_json = info.to_json() if info else None
+        self._seen_paths.add(path)
+        self.entries[path] = [file_stat.st_size, file_stat.st_mtime_ns, info_json]
+        self._is_changed = True
+
+    def save(self):
+        """Write the cache to its file if it changed. Returns True if it was written."""
+        self._forget_unseen()
+        if not self._is_changed or not self._cache_path:
+            return False
+        cache_json = {"version": AUDIO_INFO_CACHE_VERSION, "entries": self.entries}
+        try:
+            save_bytes_as(self._cache_path, json.dumps(cache_json).encode("utf-8"))
+        except OSError:
+            # The cache is rebuilt the next time.
+            return False
+        self._is_changed = False
+        return True
+
+    def _forget_unseen(self):
+        unseen_paths = [p for p in self.entries if p not in self._seen_paths]
+        for path in unseen_paths:
+            del self.entries[path]
+        if unseen_paths:
+            self._is_changed = True
+
+
+def _read_audio_info_cache(cache_path):
+    if not cache_path:
+        return {}
+    try:
+        cache_json = load_json_from_file(cache_path)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache_json, dict):
+        return {}
+    if cache_json.get("version") != AUDIO_INFO_CACHE_VERSION:
+        return {}
+    return cache_json.get("entries") or {}
+
+
 class Info:
     """Information about the file.
 
@@ -144,6 +305,13 @@ class Info:
         self.extension = extension
         self.mime = mime
 
+    @classmethod
+    def from_json(cls, info_json):
+        return cls(info_json["type"], info_json["extension"], info_json["mime"])
+
+    def to_json(self):
+        return {"type": self.type, "extension": self.extension, "mime": self.mime}
+
 
 class _InfoBuilder:
     _TYPE_KEY = "type"
@@ -154,17 +322,12 @@ class _InfoBuilder:
     def __init__(self, audio_file_path):
         self._path = audio_file_path
         self.info = {self._TYPE_KEY: {}, self._EXT_KEY: {}, self._MIME_KEY: {}}
-        audio_bytes = _get_bytes(audio_file_path)
-        self._stream = _get_stream(audio_bytes)
+        self._header = _get_header(audio_file_path)
 
     def build(self):
-        for element in AUDIO_FILE_DATA:
-            for signature in element["signature"]:
-                sig_len = len(signature)
-                offset = element["offset"] * 2 + element["offset"]
-                if signature == self._stream[offset : sig_len + offset]:
-                    for key in self.keys:
-                        self.info[key][element[key]] = sig_len
+        for pattern, element in _match_signatures(self._header):
+            for key in self.keys:
+                self.info[key][element[key]] = len(pattern)
         if not self._is_audio():
             raise InvalidAudioFileError(self._path)
         return self._to_info()
@@ -201,14 +364,268 @@ class _InfoBuilder:
         return sorted(self.info[key], key=self.info[key].get, reverse=True)
 
 
-def _get_bytes(audio_file):
+def _match_signatures(header):
+    """Yield the compiled signatures that match the given header bytes."""
+    header_size = len(header)
+    for offset, by_first_byte in _SIGNATURES:
+        if offset >= header_size:
+            break
+        for pattern, element in by_first_byte.get(header[offset], ()):
+            if header[offset : offset + len(pattern)] == pattern:
+                yield pattern, element
+
+
+def _get_header(audio_file):
     if isinstance(audio_file, str):
         if os.path.isfile(audio_file):
-            with open(audio_file, "rb") as aud_file:
-                return aud_file.read(128)
+            header = bytearray(HEADER_SIZE)
+            with wopen(audio_file, "rb") as aud_file:
+                size = aud_file.readinto(header)
+            return memoryview(header)[:size]
         raise WildNotFoundError(f"No audio file found at path '{audio_file}'.")
     raise TypeError("Path must be a str.")
 
 
-def _get_stream(audio_bytes):
-    return " ".join(["{:02X}".format(byte) for byte in audio_bytes])
+# Audio metadata, parsed from the container headers without decoding any audio.
+
+_MPEG_VERSION_1 = 3
+_MPEG_LAYER_3 = 1
+_MPEG_LAYER_1 = 3
+
+# Bitrates in kbps, by MPEG version 1 or 2/2.5, then by layer I, II or III.
+_MPEG_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by the MPEG version bits.
+_MPEG_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+# How far the start of an MP3 is searched for the first frame, after any ID3 tag.
+_MPEG_SYNC_SEARCH_SIZE = 65536
+
+
+class AudioMetadata:
+    """Information about the audio in a file.
+
+    Args:
+        extension (str): The file format, such as "wav".
+        duration (float): The length of the audio in seconds, if known.
+        sample_rate (int): The number of samples per second.
+        channels (int): The number of channels.
+        bits_per_sample (int): The sample size, for formats that have one.
+        bitrate (int): The average number of bits per second.
+
+    Returns: Instance of wilder.fleep.AudioMetadata.
+    """
+
+    def __init__(
+        self,
+        extension,
+        duration=None,
+        sample_rate=None,
+        channels=None,
+        bits_per_sample=None,
+        bitrate=None,
+    ):
+        self.extension = extension
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bits_per_sample = bits_per_sample
+        self.bitrate = bitrate
+
+    def to_json(self):
+        return {
+            "extension": self.extension,
+            "duration": self.duration,
+            "sampleRate": self.sample_rate,
+            "channels": self.channels,
+            "bitsPerSample": self.bits_per_sample,
+            "bitrate": self.bitrate,
+        }
+
+
+def get_audio_metadata(audio_file_path):
+    """Parses the duration and format of a WAV, FLAC or MP3 file from its headers. The file is
+    memory-mapped, so only the pages holding the headers are read.
+
+    Args:
+        audio_file_path (str): The path to an audio file.
+
+    Returns: Instance of wilder.fleep.AudioMetadata.
+    """
+    _get_header(audio_file_path)  # Raises the same errors as get_audio_file_info().
+    with wopen(audio_file_path, "rb") as audio_file:
+        try:
+            data = mmap.mmap(audio_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            raise InvalidAudioFileError(audio_file_path)
+        with data:
+            try:
+                metadata = _parse_audio_metadata(data)
+            except struct.error:
+                # A header was cut short.
+                raise InvalidAudioFileError(audio_file_path)
+    if not metadata:
+        raise InvalidAudioFileError(audio_file_path)
+    return metadata
+
+
+def _parse_audio_metadata(data):
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return _parse_wav(data)
+    elif data[:4] == b"fLaC":
+        return _parse_flac(data)
+    elif data[:3] == b"ID3" or _starts_with_mpeg_frame(data):
+        return _parse_mp3(data)
+    return None
+
+
+def _parse_wav(data):
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset : offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", data, offset + 4)
+        chunk_start = offset + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            fmt = struct.unpack_from("<HHIIHH", data, chunk_start)
+        elif chunk_id == b"data" and fmt:
+            _, channels, sample_rate, byte_rate, _, bits_per_sample = fmt
+            # The size of a data chunk still being written may be unset or too big.
+            data_size = min(chunk_size, len(data) - chunk_start)
+            return AudioMetadata(
+                "wav",
+                duration=data_size / byte_rate if byte_rate else None,
+                sample_rate=sample_rate,
+                channels=channels,
+                bits_per_sample=bits_per_sample,
+                bitrate=byte_rate * 8,
+            )
+        # Chunks are padded to an even size.
+        offset = chunk_start + chunk_size + chunk_size % 2
+    return None
+
+
+def _parse_flac(data):
+    # STREAMINFO is always the first metadata block. It is 34 bytes after a 4 byte header.
+    if len(data) < 42 or data[4] & 0x7F != 0:
+        return None
+    (packed,) = struct.unpack_from(">Q", data, 18)
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits_per_sample = ((packed >> 36) & 0x1F) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    duration = total_samples / sample_rate if sample_rate and total_samples else None
+    return AudioMetadata(
+        "flac",
+        duration=duration,
+        sample_rate=sample_rate,
+        channels=channels,
+        bits_per_sample=bits_per_sample,
+        bitrate=int(len(data) * 8 / duration) if duration else None,
+    )
+
+
+def _parse_mp3(data):
+    start = _get_id3_tag_size(data)
+    frame_offset = _find_mpeg_frame(data, start)
+    if frame_offset is None:
+        return None
+    (header,) = struct.unpack_from(">I", data, frame_offset)
+    version = (header >> 19) & 0x3
+    layer = (header >> 17) & 0x3
+    bitrate_index = (header >> 12) & 0xF
+    sample_rate = _MPEG_SAMPLE_RATES[version][(header >> 10) & 0x3]
+    is_mono = (header >> 6) & 0x3 == 3
+    is_version_1 = version == _MPEG_VERSION_1
+    layer_number = 4 - layer
+    bitrate = _MPEG_BITRATES[(1 if is_version_1 else 2, layer_number)][bitrate_index]
+    samples_per_frame = _get_mpeg_samples_per_frame(is_version_1, layer)
+    frame_count = _get_vbr_frame_count(data, frame_offset, is_version_1, is_mono)
+    if frame_count:
+        duration = frame_count * samples_per_frame / sample_rate
+        bitrate = int((len(data) - frame_offset) * 8 / duration)
+    else:
+        bitrate *= 1000
+        duration = (len(data) - frame_offset) * 8 / bitrate
+    return AudioMetadata(
+        "mp3",
+        duration=duration,
+        sample_rate=sample_rate,
+        channels=1 if is_mono else 2,
+        bitrate=bitrate,
+    )
+
+
+def _get_id3_tag_size(data):
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    # The tag size is a "syncsafe" integer, using 7 bits per byte.
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    has_footer = data[5] & 0x10
+    return 10 + size + (10 if has_footer else 0)
+
+
+def _find_mpeg_frame(data, start):
+    end = min(len(data) - 4, start + _MPEG_SYNC_SEARCH_SIZE)
+    offset = data.find(b"\xff", start, end)
+    while offset != -1:
+        (header,) = struct.unpack_from(">I", data, offset)
+        if _is_mpeg_frame_header(header):
+            return offset
+        offset = data.find(b"\xff", offset + 1, end)
+    return None
+
+
+def _starts_with_mpeg_frame(data):
+    # MP3 files without an ID3 tag start with their first frame.
+    return len(data) >= 4 and _is_mpeg_frame_header(struct.unpack_from(">I", data)[0])
+
+
+def _is_mpeg_frame_header(header):
+    return (
+        header >> 21 == 0x7FF
+        and (header >> 19) & 0x3 != 1
+        and (header >> 17) & 0x3 != 0
+        and (header >> 12) & 0xF not in (0, 0xF)
+        and (header >> 10) & 0x3 != 3
+    )
+
+
+def _get_mpeg_samples_per_frame(is_version_1, layer):
+    if layer == _MPEG_LAYER_1:
+        return 384
+    elif layer == _MPEG_LAYER_3 and not is_version_1:
+        return 576
+    return 1152
+
+
+def _get_vbr_frame_count(data, frame_offset, is_version_1, is_mono):
+    """The number of frames from the Xing or VBRI header of a VBR file, if it has one."""
+    if is_version_1:
+        side_info_size = 17 if is_mono else 32
+    else:
+        side_info_size = 9 if is_mono else 17
+    xing_offset = frame_offset + 4 + side_info_size
+    if data[xing_offset : xing_offset + 4] in (b"Xing", b"Info"):
+        (flags,) = struct.unpack_from(">I", data, xing_offset + 4)
+        if flags & 0x1:
+            (frame_count,) = struct.unpack_from(">I", data, xing_offset + 8)
+            return frame_count
+        return None
+    vbri_offset = frame_offset + 36
+    if data[vbri_offset : vbri_offset + 4] == b"VBRI":
+        (frame_count,) = struct.unpack_from(">I", data, vbri_offset + 14)
+        return frame_count
+    return None
@@ -4,20 +4,37 @@ from wilder.lib.constants import Constants as Consts
 from wilder.lib.errors import NoTracksFoundErrorWildError
 from wilder.lib.errors import TrackAlreadyExistError
 from wilder.lib.errors import TrackNotFoundError
-from wilder.lib.mgmt.album_dir import get_album_dir_json
 from wilder.lib.mgmt.album_dir import get_album_json_path
 from wilder.lib.mgmt.album_dir import get_track_path
-from wilder.lib.mgmt.album_dir import init_album_dir
+from wilder.lib.mgmt.album_dir import init_artwork
+from wilder.lib.mgmt.persistence import create_model_dir
+from wilder.lib.mgmt.persistence import deferred_saves
+from wilder.lib.mgmt.persistence import Persistable
 from wilder.lib.mgmt.release import Release
+from wilder.lib.mgmt.track import identify_audio_files
 from wilder.lib.mgmt.track import Track
+from wilder.lib.storage.jsonfiles import JsonStorage
 from wilder.lib.util.conversion import to_int
+from wilder.lib.util.conversion import to_interned
 from wilder.lib.util.sh import remove_directory
-from wilder.lib.util.sh import remove_file_if_exists
 from wilder.lib.util.sh import rename_directory
-from wilder.lib.util.sh import save_json_as
 
 
-class Album:
+class Album(Persistable):
+    __slots__ = (
+        "path",
+        "name",
+        "artist",
+        "_description",
+        "_album_type",
+        "_status",
+        "_tracks",
+        "_releases",
+        "_storage",
+        "_uses_manifest",
+        "_tracks_by_name",
+    )
+
     def __init__(
         self,
         path,
@@ -28,42 +45,130 @@ class Album:
         status=None,
         tracks=None,
         releases=None,
+        storage=None,
+        use_manifest=False,
     ):
+        super().__init__()
         self.path = path
-        self.name = name
-        self.artist = artist
-        self.description = description
-        self.album_type = album_type
-        self.status = status
-        self._tracks = tracks
-        self.releases = releases
+        self.name = to_interned(name)
+        self.artist = to_interned(artist)
+        self._description = description
+        self._album_type = album_type
+        self._status = status
+        self._tracks = tracks or []
+        self._releases = releases or []
+        self._storage = storage or JsonStorage()
+        self._uses_manifest = use_manifest
+        self._index_tracks()
 
     def init_dir(self):
         """Create the album directory with default files."""
-        init_album_dir(self.path, self.name)
+        create_model_dir(self.path)
+        init_artwork(self.path)
+        self.save_album_metadata()
 
     @classmethod
-    def from_json(cls, album_json, artist_name):
-        """Create the Artist object from data from .wilder/mgmt.json."""
+    def from_json(cls, album_json, artist_name, storage=None):
+        """Create the Album object from data from the MGMT JSON. The album JSON is not read
+        from storage until one of its properties is accessed."""
         path = album_json[Consts.PATH]
         name = album_json[Consts.NAME]
-        album_json = get_album_dir_json(path, name)
-        album = cls(
-            path,
-            name,
-            artist=artist_name,
-            description=album_json.get(Consts.DESCRIPTION, ""),
-            album_type=album_json.get(Consts.ALBUM_TYPE),
-            status=album_json.get(Consts.STATUS),
-            tracks=_parse_tracks(album_json),
-            releases=_parse_releases(artist_name, name, album_json),
-        )
-        return album.save_album_metadata()
+        album = cls(path, name, artist=artist_name, storage=storage)
+        album._mark_unloaded()
+        return album
+
+    def _read(self):
+        """Read the album JSON from storage."""
+        self._remember_stored_signature()
+        album_json = self._storage.load_album(self.path, self.name)
+        self._description = album_json.get(Consts.DESCRIPTION, "")
+        self._album_type = album_json.get(Consts.ALBUM_TYPE)
+        self._status = album_json.get(Consts.STATUS)
+        self._uses_manifest = album_json.get(Consts.MANIFEST) is not None
+        self._tracks = self._parse_tracks(album_json)
+        self._index_tracks()
+        self._releases = _parse_releases(self.artist, self.name, album_json)
+        self.mark_clean(album_json)
+
+    def _after_load(self):
+        # Only writes back when the stored JSON is missing data, such as the album path.
+        if not self._storage.read_only:
+            self.save_album_metadata()
+
+    @property
+    def description(self):
+        self._load()
+        return self._description
+
+    @description.setter
+    def description(self, description):
+        self._load()
+        self._description = description
+
+    @property
+    def album_type(self):
+        self._load()
+        return self._album_type
+
+    @album_type.setter
+    def album_type(self, album_type):
+        self._load()
+        self._album_type = album_type
+
+    @property
+    def status(self):
+        self._load()
+        return self._status
+
+    @status.setter
+    def status(self, status):
+        self._load()
+        self._status = status
+
+    @property
+    def releases(self):
+        self._load()
+        return self._releases
+
+    @property
+    def tracks(self):
+        """The tracks on the album, in the order they were added."""
+        self._load()
+        return self._tracks
+
+    @property
+    def uses_manifest(self):
+        """True if the album stores its tracks' metadata in its own JSON, so that the whole
+        album is read and written at once."""
+        self._load()
+        return self._uses_manifest
+
+    def use_manifest(self, enabled=True):
+        """Move the tracks' metadata into the album JSON, or back out to the tracks' own JSON
+        when `enabled` is False."""
+        if self.uses_manifest == enabled:
+            return
+        tracks = self.tracks
+        with deferred_saves():
+            for track in tracks:
+                track._load()
+                track._manifest_album = self if enabled else None
+                if not enabled:
+                    # Force writing the track's own JSON again.
+                    track._persisted_json = None
+                    track.save_track_metadata()
+            self._uses_manifest = enabled
+            self.save_album_metadata()
+
+    def _index_tracks(self):
+        self._tracks_by_name = {t.name: t for t in self._tracks}
 
     def get_tracks(self):
-        if not self._tracks:
+        """The tracks on the album, sorted by track number."""
+        tracks = self.tracks
+        if not tracks:
             raise NoTracksFoundErrorWildError(self.name)
-        return sorted(self._tracks, key=lambda t: t.track_number)
+        return sorted(tracks, key=lambda t: t.track_number)
 
     @property
     def dir_json_path(self):
@@ -72,23 +177,68 @@ class Album:
 
     def to_json_for_album_dir(self):
         """The JSON blob representing the artifact in the album's directory."""
-        return {
+        album_json = {
             Consts.ARTIST: self.artist,
             Consts.NAME: self.name,
             Consts.PATH: self.path,
             Consts.DESCRIPTION: self.description,
             Consts.ALBUM_TYPE: self.album_type,
             Consts.STATUS: self.status,
-            Consts.TRACKS: [t.name for t in self._tracks],
+            Consts.TRACKS: [t.name for t in self.tracks],
             Consts.RELEASES: [r.to_json() for r in self.releases],
         }
+        if self.uses_manifest:
+            album_json[Consts.MANIFEST] = {
+                t.name: t.to_json_for_track_dir() for t in self.tracks
+            }
+        return album_json
+
+    def _get_stored_signature(self):
+        return self._storage.get_album_signature(self.path)
+
+    def to_persisted_json(self):
+        return self.to_json_for_album_dir()
+
+    def _write(self, _json):
+        self._storage.save_album(self.path, _json)
+
+    def mark_clean(self, persisted_json=None):
+        super().mark_clean(persisted_json=persisted_json)
+        # Not `self.releases`, since this is also called while the album is being read.
+        for release in self._releases:
+            release.mark_clean()
+
+    def refresh(self):
+        """Unload the album if its stored JSON changed, or else unload any of its tracks whose
+        stored JSON changed, so that they are read again when next accessed."""
+        if self.is_stale():
+            self.unload()
+            return
+        for track in self.loaded_tracks:
+            if track.is_stale():
+                track.unload()
+
+    def unload(self):
+        super().unload()
+        # The tracks are parsed again when the album is next read.
+        self._tracks = []
+        self._index_tracks()
+        self._releases = []
+
+    @property
+    def loaded_tracks(self):
+        """The tracks that have been read from storage or created in this session."""
+        if not self._is_loaded:
+            return []
+        return [t for t in self._tracks if t._is_loaded]
 
     def to_json_for_mgmt(self):
         """Convert this object to JSON for storing in the user's MGMT JSON."""
         # Figure out name if path is set but name for some reason isn't
         if not self.name and self.path:
             self.name = os.path.basename(os.path.normpath(self.path))
-            self.save_album_metadata()
+            if not self._storage.read_only:
+                self.save_album_metadata()
 
         return {Consts.NAME: self.name, Consts.PATH: self.path}
 
@@ -97,24 +247,29 @@ class Album:
         self.description = description or self.description
         self.album_type = album_type or self.album_type
         self.status = status or self.status
-        self.artist = artist or self.artist
+        self.artist = to_interned(artist) or self.artist
         self.save_album_metadata()
 
     def rename(self, new_name):
-        self.name = new_name
-        self.path = rename_directory(self.path, new_name)
+        tracks = self.tracks
+        old_path = self.path
+        self.name = to_interned(new_name)
+        self.path = rename_directory(old_path, new_name)
+        self._storage.move_album(old_path, self.path)
+        for track in tracks:
+            track.path = get_track_path(self.path, track.name)
+            track.album = self.name
         self.save_album_metadata()
 
     def create_track(
         self, track_name, track_number=None, description=None, collaborators=None
     ):
         """Add a track to an album."""
-        tracks = self.get_tracks()
-        current_tracks = [t.name for t in tracks]
-        if track_name in current_tracks:
+        tracks = self.tracks
+        if track_name in self._tracks_by_name:
             raise TrackAlreadyExistError(track_name, self.name)
         track_path = get_track_path(self.path, track_name)
-        track_number = track_number or len(current_tracks) + 1
+        track_number = track_number or len(tracks) + 1
         track = Track(
             track_path,
             track_name,
@@ -123,30 +278,32 @@ class Album:
             self.name,
             description=description,
             collaborators=collaborators or [],
+            storage=self._storage,
         )
+        if self.uses_manifest:
+            track._manifest_album = self
         track.init_dir()
-        track.save_track_metadata()
         self._add_track(track)
         self.save_album_metadata()
 
     def _add_track(self, track):
         self._tracks.append(track)
+        self._tracks_by_name[track.name] = track
         self.save_album_metadata()
 
     def save_album_metadata(self):
-        """Save the current album context to the album's JSON file."""
-        remove_file_if_exists(self.dir_json_path)
-        full_json = self.to_json_for_album_dir()
-        save_json_as(self.dir_json_path, full_json)
+        """Save the current album context to the album's JSON file, if it changed."""
+        self.save()
         return self
 
     def get_track(self, name):
         """Get a track on the album by name."""
-        tracks = self.get_tracks()
-        for track in tracks:
-            if track.name == name:
-                return track
-        raise TrackNotFoundError(self.name, name)
+        if not self.tracks:
+            raise NoTracksFoundErrorWildError(self.name)
+        track = self._tracks_by_name.get(name)
+        if not track:
+            raise TrackNotFoundError(self.name, name)
+        return track
 
     def get_first_track_by_number(self, track_number):
         """Returns the first track with the given number."""
@@ -161,41 +318,68 @@ class Album:
 
     def delete_track(self, track_name, hard=False):
         """Delete a track. Set hard to True to delete the directory."""
-        tracks = self.get_tracks()
-        for i in range(0, len(tracks)):
-            if self._tracks[i].name != track_name:
-                continue
-            elif hard:
-                remove_directory(self._tracks[i].path)
-            del self._tracks[i]
+        if not self.tracks:
+            raise NoTracksFoundErrorWildError(self.name)
+        track = self._tracks_by_name.pop(track_name, None)
+        if not track:
+            return
+        elif hard:
+            remove_directory(track.path)
+        self._tracks.remove(track)
+        if self._tracks:
             self.auto_set_track_numbers()
-            self.save_album_metadata()
-            break
+        self.save_album_metadata()
 
     def rename_track(self, new_name, track_name):
         """Change the name of a track."""
         track = self.get_track(track_name)
+        if new_name in self._tracks_by_name:
+            raise TrackAlreadyExistError(new_name, self.name)
         track.rename(new_name)
+        del self._tracks_by_name[track_name]
+        self._tracks_by_name[new_name] = track
         self.save_album_metadata()
 
     def bulk_set_track_numbers(self, track_number_dict):
-        for name, num in track_number_dict.items():
-            track = self.get_track(name)
-            track.track_number = num
-            track.save_track_metadata()
-        self.save_album_metadata()
+        with deferred_saves():
+            for name, num in track_number_dict.items():
+                track = self.get_track(name)
+                track.track_number = num
+                track.save_track_metadata()
+            self.save_album_metadata()
+
+    def identify_audio_files(self, max_workers=None, cache=None):
+        """Identify the audio files of every track on the album. See
+        `wilder.lib.mgmt.track.identify_audio_files()`."""
+        return identify_audio_files(self.tracks, max_workers=max_workers, cache=cache)
+
+    def get_runtime(self, audio_type=None):
+        """The total duration of the album's tracks in seconds, read from the headers of their
+        audio files. Tracks without readable audio are not counted."""
+        metadatas = [t.get_audio_metadata(audio_type) for t in self.tracks]
+        return sum(m.duration for m in metadatas if m and m.duration)
 
     def auto_set_track_numbers(self):
         tracks = self.get_tracks()
-        for i in range(0, len(tracks)):
-            track = tracks[i]
-            track.track_number = i + 1
-            track.save_track_metadata()
-
+        with deferred_saves():
+            for i in range(0, len(tracks)):
+                track = tracks[i]
+                track.track_number = i + 1
+                track.save_track_metadata()
 
-def _parse_tracks(album_dir_json):
-    tracks = album_dir_json.get(Consts.TRACKS, [])
-    return [Track.from_json(album_dir_json, t) for t in tracks]
+    def _parse_tracks(self, album_dir_json):
+        """Tracks missing from the manifest, such as in albums that do not use one, are read
+        from their own JSON when accessed."""
+        track_names = album_dir_json.get(Consts.TRACKS, [])
+        manifest = album_dir_json.get(Consts.MANIFEST) or {}
+        return [
+            (
+                Track.from_manifest(self, manifest[name])
+                if name in manifest
+                else Track.from_json(album_dir_json, name, storage=self._storage)
+            )
+            for name in track_names
+        ]
 
 
 def _parse_releases(artist_name, album_name, album_dir_json):
@@ -23,10 +23,17 @@ def get_album_json_path(album_path):
     return os.path.join(album_path, "album.json")
 
 
-def get_album_dir_json(album_path, album_name):
+def get_album_dir_json(album_path, album_name, read_only=False):
+    """Load the album.json file. Missing album directories and files get initialized unless
+    `read_only` is True, in which case the default album JSON is returned instead."""
+    album_json_file_path = get_album_json_path(album_path)
+    if read_only:
+        if not file_exists_with_data(album_json_file_path):
+            return create_default_album_json(album_name)
+        return load_json_from_file(album_json_file_path)
+
     if not os.path.exists(album_path):
         init_album_dir(album_path, album_name)
-    album_json_file_path = get_album_json_path(album_path)
 
     if not file_exists_with_data(album_json_file_path):
         _init_album_json(album_path, album_name)
@@ -36,11 +43,11 @@ def get_album_dir_json(album_path, album_name):
 
 def init_album_dir(album_path, album_name):
     create_dir_if_not_exists(album_path)
-    _init_artwork(album_path)
+    init_artwork(album_path)
     _init_album_json(album_path, album_name)
 
 
-def _init_artwork(album_path):
+def init_artwork(album_path):
     create_dir_if_not_exists(album_path)
     artwork_path = get_artwork_path()
     copy_files_to_dir(artwork_path, album_path)
@@ -48,27 +55,43 @@ def _init_artwork(album_path):
 
 def _init_album_json(album_path, album_name):
     create_dir_if_not_exists(album_path)
-    _json = get_default_album_json()
-    _json[Constants.NAME] = album_name
+    _json = create_default_album_json(album_name)
     album_json_path = get_album_json_path(album_path)
     save_json_as(album_json_path, _json)
 
 
+def create_default_album_json(album_name):
+    _json = get_default_album_json()
+    _json[Constants.NAME] = album_name
+    return _json
+
+
 def get_track_path(album_path, track_name):
-    track_path = os.path.join(album_path, track_name)
-    create_dir_if_not_exists(track_path)
-    return track_path
+    return os.path.join(album_path, track_name)
 
 
 def get_track_json_path(track_path):
     return os.path.join(track_path, "track.json")
 
 
-def get_track_dir_json(track_path, track_name, artist_name, album_name):
-    if not os.path.exists(track_path):
-        init_track_dir(track_path, track_name, artist_name, album_name)
+def get_track_peaks_path(track_path, audio_file_path):
+    """The path to the waveform sidecar of one of the track's audio files."""
+    return os.path.join(track_path, f"{os.path.basename(audio_file_path)}.peaks")
+
 
+def get_track_dir_json(
+    track_path, track_name, artist_name, album_name, read_only=False
+):
+    """Load the track.json file. Missing track directories and files get initialized unless
+    `read_only` is True, in which case the default track JSON is returned instead."""
     track_json_file_path = get_track_json_path(track_path)
+    if read_only:
+        if not file_exists_with_data(track_json_file_path):
+            return create_default_track_json(track_name, artist_name, album_name)
+        return load_json_from_file(track_json_file_path)
+
+    if not os.path.exists(track_path):
+        init_track_dir(track_path, track_name, artist_name, album_name)
 
     if not file_exists_with_data(track_json_file_path):
         _init_track_json(track_path, track_name, artist_name, album_name)
@@ -83,12 +106,17 @@ def init_track_dir(track_path, track_name, artist_name, album_name):
 
 def _init_track_json(track_path, track_name, artist_name, album_name):
     create_dir_if_not_exists(track_path)
+    _json = create_default_track_json(track_name, artist_name, album_name)
+    track_json_path = get_track_json_path(track_path)
+    save_json_as(track_json_path, _json)
+
+
+def create_default_track_json(track_name, artist_name, album_name):
     _json = get_default_track_json()
     _json[Constants.NAME] = track_name
     _json[Constants.ARTIST] = artist_name
     _json[Constants.ALBUM] = album_name
-    track_json_path = get_track_json_path(track_path)
-    save_json_as(track_json_path, _json)
+    return _json
 
 
 def echo_tracks(tracks):
@@ -96,6 +124,18 @@ def echo_tracks(tracks):
         click.echo(f"{track.track_number}. {track.name}")
 
 
+def echo_all_tracks(tracks):
+    """Echo tracks from many albums as they are iterated, with a heading for each album."""
+    album = None
+    for track in tracks:
+        if (track.artist, track.album) != album:
+            if album:
+                click.echo()
+            album = (track.artist, track.album)
+            click.echo(f"'{track.album}' by {track.artist}: \n")
+        click.echo(f"{track.track_number}. {track.name}")
+
+
 def get_album_directory_obj(wilder, get_default_handler=None):
     return AlbumDirectory(wilder, get_default_handler=get_default_handler)
 
@@ -131,7 +171,7 @@ class AlbumDirectory:
             )
         else:
             album = self.wilder.get_album(album_arg, artist_name=artist_arg)
-            return load_json_from_file(album.dir_json_path)
+            return album.to_json_for_album_dir()
 
     def _try_get_album_json_from_only_existing_album(self):
         """This method returns the album JSON if there is literally only 1 artist with a single album... because that
@@ -5,28 +5,52 @@ from wilder.lib.errors import AlbumAlreadyExistsError
 from wilder.lib.errors import AlbumNotFoundError
 from wilder.lib.errors import ArtistHasNoAlbumsError
 from wilder.lib.mgmt.album import Album
+from wilder.lib.mgmt.persistence import Persistable
+from wilder.lib.storage.jsonfiles import JsonStorage
+from wilder.lib.util.conversion import to_interned
 from wilder.lib.util.sh import expand_path
 from wilder.lib.util.sh import remove_directory
 
 
-class Artist:
-    def __init__(self, discography=None, name=None, bio=None, also_known_as=None):
+class Artist(Persistable):
+    __slots__ = (
+        "_discography",
+        "name",
+        "bio",
+        "also_known_as",
+        "_storage",
+        "_albums_by_name",
+    )
+
+    def __init__(
+        self, discography=None, name=None, bio=None, also_known_as=None, storage=None
+    ):
+        super().__init__()
         self._discography = discography or []
-        self.name = name
+        self.name = to_interned(name)
         self.bio = bio
         self.also_known_as = also_known_as or []
+        self._storage = storage or JsonStorage()
+        self._index_albums()
 
     @classmethod
-    def from_json(cls, artist_json):
+    def from_json(cls, artist_json, storage=None):
         """Create an artist from JSON stored in the MGMT JSON blob."""
+        storage = storage or JsonStorage()
         name = artist_json.get(Constants.NAME)
         bio = artist_json.get(Constants.BIO)
         also_known_as = artist_json.get(Constants.ALSO_KNOWN_AS)
         discography_json = artist_json.get(Constants.DISCOGRAPHY) or []
-        discography = cls._parse_discography(discography_json, name)
-        return cls(
-            discography=discography, name=name, bio=bio, also_known_as=also_known_as
+        discography = cls._parse_discography(discography_json, name, storage)
+        artist = cls(
+            discography=discography,
+            name=name,
+            bio=bio,
+            also_known_as=also_known_as,
+            storage=storage,
         )
+        artist.mark_clean(artist_json)
+        return artist
 
     def get_discography(self, err_on_none=True):
         """Get all the albums of an artist."""
@@ -44,8 +68,30 @@ class Artist:
             Constants.ALSO_KNOWN_AS: self.also_known_as,
         }
 
+    def to_persisted_json(self):
+        """Artists are stored in the MGMT JSON."""
+        return self.to_json()
+
+    @property
+    def loaded_albums(self):
+        """The albums that have been read from storage or created in this session."""
+        return [a for a in self._discography if a._is_loaded]
+
+    def reuse_albums(self, albums):
+        """Replace album proxies with the given already-loaded albums that have the same name
+        and path, so they do not need to be read again."""
+        loaded = {(a.name, a.path): a for a in albums if a.artist == self.name}
+        self._discography = [loaded.get((a.name, a.path), a) for a in self._discography]
+        self._index_albums()
+
     def create_album(
-        self, path_location, name=None, description=None, album_type=None, status=None
+        self,
+        path_location,
+        name=None,
+        description=None,
+        album_type=None,
+        status=None,
+        use_manifest=False,
     ):
         """Initialize a new album in a given directory."""
         self._assert_album_not_exists(name)
@@ -59,31 +105,46 @@ class Artist:
             description=description,
             album_type=album_type,
             status=status,
+            storage=self._storage,
+            use_manifest=use_manifest,
         )
         album.init_dir()
         self._discography.append(album)
+        self._albums_by_name[album.name] = album
 
     def _assert_album_not_exists(self, name):
-        for alb in self._discography:
-            if alb.name == name:
-                raise AlbumAlreadyExistsError(alb.name)
+        if name in self._albums_by_name:
+            raise AlbumAlreadyExistsError(name)
+
+    def _index_albums(self):
+        self._albums_by_name = {a.name: a for a in self._discography}
 
     def delete_album(self, album, hard=False):
-        """Remove an album from Wilder. This does not destroy the directory."""
+        """Remove an album from Wilder. This does not destroy the directory unless `hard` is
+        True."""
         albums = []
         for alb in self._discography:
             if alb.name != album.name:
-                albums.append(album)
+                albums.append(alb)
             elif hard:
                 remove_directory(alb.path)
         self._discography = albums
+        self._index_albums()
 
     def get_album(self, name):
         """Return an album by its name."""
-        for alb in self._discography:
-            if alb.name == name:
-                return alb
-        raise AlbumNotFoundError(name)
+        album = self._albums_by_name.get(name)
+        if not album:
+            raise AlbumNotFoundError(name)
+        return album
+
+    def rename_album(self, new_name, album_name):
+        """Change the name of one of this artist's albums."""
+        self._assert_album_not_exists(new_name)
+        album = self.get_album(album_name)
+        album.rename(new_name)
+        del self._albums_by_name[album_name]
+        self._albums_by_name[new_name] = album
 
     def _get_default_album_name(self):
         album_number = len(self._discography) + 1
@@ -92,7 +153,7 @@ class Artist:
     def rename(self, new_name, forget_old_name=False):
         """Change the name of this artist."""
         old_name = self.name
-        self.name = new_name
+        self.name = to_interned(new_name)
         self._try_append_aka(forget_old_name, old_name)
         for album in self._discography:
             album.update(artist=new_name)
@@ -108,8 +169,11 @@ class Artist:
 
     def remove_alias(self, alias):
         """Remove one of the previously-added alternative-names of this artist."""
-        self.also_known_as = filter(lambda x: x != alias, self.also_known_as)
+        self.also_known_as = [a for a in self.also_known_as if a != alias]
 
     @classmethod
-    def _parse_discography(cls, disco_json, artist_name):
-        return [Album.from_json(album_json, artist_name) for album_json in disco_json]
+    def _parse_discography(cls, disco_json, artist_name, storage):
+        return [
+            Album.from_json(album_json, artist_name, storage=storage)
+            for album_json in disco_json
+        ]
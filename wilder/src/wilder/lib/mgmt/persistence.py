@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from wilder.lib.util.sh import create_dir_if_not_exists
+from wilder.lib.util.sh import remove_directory
+
+# This module tracks changes to the JSON-backed models so that only changed data gets written.
+
+_state = threading.local()
+
+
+def get_current_unit_of_work():
+    """The unit of work that saves are currently deferred to, if any."""
+    return getattr(_state, "unit_of_work", None)
+
+
+@contextmanager
+def begin_unit_of_work(work):
+    """Defer all model saves on this thread to the given unit of work."""
+    previous = get_current_unit_of_work()
+    _state.unit_of_work = work
+    try:
+        yield work
+    finally:
+        _state.unit_of_work = previous
+
+
+@contextmanager
+def deferred_saves():
+    """Defer model saves until the block completes, writing each changed model once. Inside
+    a unit of work that is already in progress, the saves are left to it."""
+    if get_current_unit_of_work() is not None:
+        yield get_current_unit_of_work()
+        return
+
+    work = UnitOfWork()
+    with begin_unit_of_work(work):
+        yield work
+    work.flush()
+
+
+def create_model_dir(path):
+    """Create a model's directory tree. During a unit of work, the directories created are
+    removed if the unit of work is discarded."""
+    created_path = create_dir_if_not_exists(path)
+    work = get_current_unit_of_work()
+    if created_path and work is not None:
+        work.register_created_dir(created_path)
+
+
+def load_all(models, max_workers=None):
+    """Load the given lazily-loaded models, reading up to `max_workers` of them at once.
+    Errors are raised in the order of the models, the same as when loading one by one."""
+    models = [m for m in models if not m._is_loaded]
+    if not max_workers or max_workers < 2 or len(models) < 2:
+        for model in models:
+            model._load()
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(models))) as executor:
+        for _ in executor.map(lambda m: m._load(), models):
+            pass
+
+
+class Persistable:
+    """A model that is stored as JSON. It remembers the JSON it was last loaded from or saved
+    as, so it knows which of its fields changed and can skip writing when nothing did. The
+    JSON is remembered as compact text, which takes much less memory than a copy of it."""
+
+    __slots__ = ("_persisted_json", "_stored_signature", "_is_loaded", "_load_lock")
+
+    def __init__(self):
+        self._persisted_json = None
+        self._stored_signature = None
+        self._is_loaded = True
+        # Only models that are read from storage need a lock, so it is created when needed.
+        self._load_lock = None
+
+    def _get_stored_signature(self):
+        """Override for models that are stored on their own. Returns a value that changes
+        whenever the stored data changes, such as a file's modified time."""
+        return None
+
+    def _load(self):
+        """Read the model from storage, if it has not been read yet. Other threads that
+        access the model meanwhile wait until it is fully read."""
+        if self._is_loaded:
+            return
+        with self._load_lock:
+            if self._is_loaded:
+                return
+            self._read()
+            self._is_loaded = True
+            self._after_load()
+
+    def _read(self):
+        """Override for models that are read from storage when first accessed. The model is
+        not marked loaded until this returns, so it must not use its lazy properties."""
+        pass
+
+    def _after_load(self):
+        """Override to use the model once it is loaded, such as to save it."""
+        pass
+
+    def _mark_unloaded(self):
+        """Make the model read from storage when it is next accessed."""
+        if self._load_lock is None:
+            self._load_lock = threading.Lock()
+        self._is_loaded = False
+
+    def to_persisted_json(self):
+        """Override"""
+        raise NotImplementedError()
+
+    def _write(self, _json):
+        """Override for models that are stored on their own."""
+        raise NotImplementedError()
+
+    @property
+    def dirty_fields(self):
+        """The names of the JSON fields that changed since the last load or save."""
+        if not self._is_loaded:
+            return set()
+        current_json = self.to_persisted_json()
+        persisted_json = json.loads(self._persisted_json or "{}")
+        keys = set(current_json) | set(persisted_json)
+        return {k for k in keys if current_json.get(k) != persisted_json.get(k)}
+
+    @property
+    def is_dirty(self):
+        """True if the model has never been saved or has changes that are not saved."""
+        if not self._is_loaded:
+            return False
+        if self._persisted_json is None:
+            return True
+        return _to_persisted_text(self.to_persisted_json()) != self._persisted_json
+
+    def is_stale(self):
+        """True if the model's stored data changed since the model read or wrote it."""
+        if not self._is_loaded:
+            return False
+        return self._get_stored_signature() != self._stored_signature
+
+    def _remember_stored_signature(self):
+        self._stored_signature = self._get_stored_signature()
+
+    def unload(self):
+        """Forget the loaded data so it is read from storage again the next time it is needed.
+        Unsaved changes are lost."""
+        self._mark_unloaded()
+        self._persisted_json = None
+        self._stored_signature = None
+
+    def mark_clean(self, persisted_json=None):
+        """Remember the given JSON (or the current state) as what is stored."""
+        if persisted_json is None:
+            persisted_json = self.to_persisted_json()
+        self._persisted_json = _to_persisted_text(persisted_json)
+
+    def save(self):
+        """Write the model if it changed. When a unit of work is in progress, the write is
+        deferred until the unit of work is flushed."""
+        work = get_current_unit_of_work()
+        if work is not None:
+            work.register(self)
+            return False
+        return self.flush()
+
+    def flush(self):
+        """Write the model if it changed. Returns True if it was written."""
+        if not self.is_dirty:
+            return False
+        _json = self.to_persisted_json()
+        self._write(_json)
+        self._remember_stored_signature()
+        self.mark_clean(_json)
+        return True
+
+
+def _to_persisted_text(_json):
+    # Missing and null fields are the same, as they are when reading the fields.
+    _json = {k: v for k, v in _json.items() if v is not None}
+    return json.dumps(_json, sort_keys=True, separators=(",", ":"))
+
+
+class UnitOfWork:
+    """Collects models that may have changed and writes each changed one exactly once."""
+
+    def __init__(self):
+        self._models = {}
+        self._created_dirs = []
+
+    def __len__(self):
+        return len(self._models)
+
+    def register(self, model):
+        """Add a model to flush later. Registering the same model twice has no effect."""
+        self._models.setdefault(id(model), model)
+
+    def register_all(self, models):
+        for model in models:
+            self.register(model)
+
+    def flush(self):
+        """Write every registered model that changed. Returns the number of models written."""
+        models = list(self._models.values())
+        self._models = {}
+        self._created_dirs = []
+        return len([m for m in models if m.flush()])
+
+    def register_created_dir(self, path):
+        """Add a directory to remove if the unit of work is discarded."""
+        self._created_dirs.append(path)
+
+    def discard(self):
+        """Forget the registered models without writing them and remove the directories
+        created during the unit of work, newest first."""
+        self._models = {}
+        for path in reversed(self._created_dirs):
+            if os.path.isdir(path):
+                remove_directory(path)
+        self._created_dirs = []
@@ -1,26 +1,35 @@
 from wilder.lib.constants import Constants
+from wilder.lib.mgmt.persistence import Persistable
+from wilder.lib.util.conversion import to_interned
 
 
-class Release:
-    # The date of the release.
-    release_date = None
+class Release(Persistable):
+    __slots__ = ("release_date", "release_type", "artist", "album")
 
-    # The type of the release, such as EXTENDED.
-    release_type = None
+    def __init__(self, artist=None, album=None, release_date=None, release_type=None):
+        super().__init__()
 
-    # The artist name of the release.
-    artist = None
+        # The date of the release.
+        self.release_date = release_date
 
-    # the album name of the release.
-    album = None
+        # The type of the release, such as EXTENDED.
+        self.release_type = release_type
+
+        # The artist name of the release.
+        self.artist = to_interned(artist)
+
+        # the album name of the release.
+        self.album = to_interned(album)
 
     @classmethod
     def from_json(cls, artist_name, album_name, release_json):
-        release = Release()
-        release.artist = artist_name
-        release.album = album_name
-        release.release_date = release_json.get(Constants.RELEASE_DATE)
-        release.release_type = release_json.get(Constants.RELEASE_TYPE)
+        release = cls(
+            artist=artist_name,
+            album=album_name,
+            release_date=release_json.get(Constants.RELEASE_DATE),
+            release_type=release_json.get(Constants.RELEASE_TYPE),
+        )
+        release.mark_clean(release_json)
         return release
 
     def to_json(self):
@@ -28,3 +37,7 @@ class Release:
             Constants.RELEASE_DATE: self.release_date,
             Constants.RELEASE_TYPE: self.release_type,
         }
+
+    def to_persisted_json(self):
+        """Releases are stored in their album's JSON file."""
+        return self.to_json()
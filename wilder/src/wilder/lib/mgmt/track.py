@@ -3,19 +3,43 @@ import os
 from wilder.lib.constants import Constants
 from wilder.lib.enum import AudioType
 from wilder.lib.errors import AudioTypeNotFoundError
+from wilder.lib.errors import InvalidAudioFileError
 from wilder.lib.errors import NoAudioFoundError
 from wilder.lib.errors import UnsupportedAudioTypeError
-from wilder.lib.mgmt.album_dir import get_track_dir_json
+from wilder.lib.errors import WaveformNotFoundError
+from wilder.lib.fleep import get_audio_metadata
+from wilder.lib.fleep import identify_many
 from wilder.lib.mgmt.album_dir import get_track_json_path
 from wilder.lib.mgmt.album_dir import get_track_path
-from wilder.lib.mgmt.album_dir import init_track_dir
+from wilder.lib.mgmt.album_dir import get_track_peaks_path
+from wilder.lib.mgmt.persistence import create_model_dir
+from wilder.lib.mgmt.persistence import Persistable
+from wilder.lib.storage.jsonfiles import JsonStorage
 from wilder.lib.util.conversion import to_int
-from wilder.lib.util.sh import remove_file_if_exists
+from wilder.lib.util.conversion import to_interned
+from wilder.lib.util.sh import is_recently_modified
 from wilder.lib.util.sh import rename_directory
-from wilder.lib.util.sh import save_json_as
+from wilder.lib.waveform import get_waveform
+from wilder.lib.waveform import load_current_waveform
+from wilder.lib.waveform import WAVEFORM_AUDIO_TYPES
 
+AUDIO_TYPES = tuple(AudioType.choices())
+
+
+class Track(Persistable):
+    __slots__ = (
+        "path",
+        "name",
+        "_track_number",
+        "artist",
+        "album",
+        "_description",
+        "_collaborators",
+        "_storage",
+        "_manifest_album",
+        "_audio_files",
+    )
 
-class Track:
     def __init__(
         self,
         path,
@@ -25,23 +49,61 @@ class Track:
         album,
         description=None,
         collaborators=None,
+        storage=None,
     ):
+        super().__init__()
         self.path = path
         self.name = name
         self._track_number = track_number
-        self.artist = artist
-        self.album = album
-        self.description = description
-        self.collaborators = collaborators
+        self.artist = to_interned(artist)
+        self.album = to_interned(album)
+        self._description = description
+        self._collaborators = collaborators
+        self._storage = storage or JsonStorage()
+        self._manifest_album = None
+        self._audio_files = None
+
+    def _read(self):
+        """Read the track JSON from storage."""
+        self._remember_stored_signature()
+        track_json = self._storage.load_track(
+            self.path, self.name, self.artist, self.album
+        )
+        self._track_number = track_json.get(Constants.TRACK_NUMBER) or 1
+        self._description = track_json.get(Constants.DESCRIPTION)
+        self._collaborators = track_json.get(Constants.COLLABORATORS)
+        self.mark_clean(track_json)
 
     @property
     def track_number(self):
+        self._load()
         return to_int(self._track_number)
 
     @track_number.setter
     def track_number(self, track_number):
+        self._load()
         self._track_number = to_int(track_number)
 
+    @property
+    def description(self):
+        self._load()
+        return self._description
+
+    @description.setter
+    def description(self, description):
+        self._load()
+        self._description = description
+
+    @property
+    def collaborators(self):
+        self._load()
+        return self._collaborators
+
+    @collaborators.setter
+    def collaborators(self, collaborators):
+        self._load()
+        self._collaborators = collaborators
+
     @property
     def dir_json_path(self):
         """The path to the track JSON file."""
@@ -62,62 +124,117 @@ class Track:
         """The path to the FLAC file for this track, if it exists."""
         return self._get_audio_file_path("flac")
 
+    @property
+    def audio_file_paths(self):
+        """The paths the track's audio files would have, whether or not they exist."""
+        return [self._get_audio_file_path(ext) for ext in AUDIO_TYPES]
+
+    def available_audio(self):
+        """Returns a dict of the audio types the track has files for to the paths of the
+        files. The track directory is scanned once and the result is reused until the
+        directory changes."""
+        try:
+            dir_modified_time = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return {}
+        key = (self.path, self.name, dir_modified_time)
+        if self._audio_files is not None and self._audio_files[0] == key:
+            return dict(self._audio_files[1])
+        audio_files = _scan_audio_files(self.path, self.name)
+        # Files added within the filesystem's timestamp resolution of the scan would not
+        # change the modified time, so recently modified directories are scanned each time.
+        if not is_recently_modified(dir_modified_time):
+            self._audio_files = (key, audio_files)
+        return dict(audio_files)
+
     def get_file(self, audio_type=None):
         """Returns the path to the file for the given audio type extension."""
+        if audio_type:
+            audio_type = audio_type.lower()
+            if audio_type not in AUDIO_TYPES:
+                raise UnsupportedAudioTypeError(audio_type)
+        available_audio = self.available_audio()
         if not audio_type:
-            return self._try_get_first_audio_file_found()
-        else:
-            return self._get_file(audio_type)
-
-    def _try_get_first_audio_file_found(self):
-        audio_types = AudioType.choices()
-        for ext in audio_types:
-            try:
-                return self._get_file(ext)
-            except AudioTypeNotFoundError:
-                pass
-        raise NoAudioFoundError(self.name)
-
-    def _get_file(self, audio_type):
-        audio_type = audio_type.lower()
+            if not available_audio:
+                raise NoAudioFoundError(self.name)
+            return next(iter(available_audio.values()))
+        elif audio_type not in available_audio:
+            raise AudioTypeNotFoundError(self.name, audio_type)
+        return available_audio[audio_type]
+
+    def get_audio_metadata(self, audio_type=None):
+        """Returns the duration and format of the track's audio file, read from its headers,
+        or None if the track has no audio file with headers that can be read."""
         try:
-            if audio_type == AudioType.MP3:
-                return _get_path_if_exists(self.mp3_path)
-            elif audio_type == AudioType.WAV:
-                return _get_path_if_exists(self.wav_path)
-            elif audio_type == AudioType.FLAC:
-                return _get_path_if_exists(self.flac_path)
+            return get_audio_metadata(self.get_file(audio_type=audio_type))
+        except (InvalidAudioFileError, NoAudioFoundError):
+            return None
+
+    def get_waveform(self, audio_type=None, compute=True):
+        """Returns the waveform of the track's WAV or FLAC file. It is computed the first time
+        and then read from a sidecar file in the track directory. Set `compute` to False to
+        only read the sidecar, raising `WaveformNotFoundError` if it is missing or old."""
+        if audio_type is None:
+            available_audio = self.available_audio()
+            if not available_audio:
+                raise NoAudioFoundError(self.name)
+            supported = [t for t in WAVEFORM_AUDIO_TYPES if t in available_audio]
+            audio_type = supported[0] if supported else next(iter(available_audio))
+        if audio_type.lower() not in WAVEFORM_AUDIO_TYPES:
             raise UnsupportedAudioTypeError(audio_type)
-        except FileNotFoundError:
-            raise AudioTypeNotFoundError(self.name, audio_type)
+        audio_file_path = self.get_file(audio_type=audio_type)
+        peaks_path = get_track_peaks_path(self.path, audio_file_path)
+        if compute:
+            return get_waveform(audio_file_path, peaks_path)
+        waveform = load_current_waveform(audio_file_path, peaks_path)
+        if waveform is None:
+            raise WaveformNotFoundError(self.name, audio_type)
+        return waveform
 
     def _get_audio_file_path(self, ext):
         return os.path.join(self.path, f"{self.name}.{ext}")
 
     @classmethod
-    def from_json(cls, album_json, track_name):
-        """Creates a Track from JSON stored in the album dir."""
+    def from_json(cls, album_json, track_name, storage=None):
+        """Creates a Track from the album JSON. The track JSON is not read from storage until
+        the track's metadata is accessed."""
         album_path = album_json.get(Constants.PATH)
         album_name = album_json.get(Constants.NAME)
         artist_name = album_json.get(Constants.ARTIST)
         track_path = get_track_path(album_path, track_name)
-        track_json = get_track_dir_json(track_path, track_name, artist_name, album_name)
-        track_number = track_json.get(Constants.TRACK_NUMBER) or 1
-        description = track_json.get(Constants.DESCRIPTION)
-        collaborators = track_json.get(Constants.COLLABORATORS)
-        return cls(
-            track_path,
+        track = cls(
+            track_path, track_name, None, artist_name, album_name, storage=storage
+        )
+        track._mark_unloaded()
+        return track
+
+    @classmethod
+    def from_manifest(cls, album, track_json):
+        """Creates a Track from its entry in the album's manifest. The track is stored in the
+        album JSON and is saved whenever the album is."""
+        track_name = track_json.get(Constants.NAME)
+        track = cls(
+            get_track_path(album.path, track_name),
             track_name,
-            track_number,
-            artist_name,
-            album_name,
-            description=description,
-            collaborators=collaborators,
+            track_json.get(Constants.TRACK_NUMBER) or 1,
+            album.artist,
+            album.name,
+            description=track_json.get(Constants.DESCRIPTION),
+            collaborators=track_json.get(Constants.COLLABORATORS),
+            storage=album._storage,
         )
+        track._manifest_album = album
+        return track
+
+    @property
+    def is_in_manifest(self):
+        """True if the track is stored in its album's manifest instead of on its own."""
+        return self._manifest_album is not None
 
     def init_dir(self):
         """Initialize the track directory with the default files."""
-        init_track_dir(self.path, self.name, self.artist, self.album)
+        create_model_dir(self.path)
+        self.save_track_metadata()
 
     def to_json_for_track_dir(self):
         """Convert this object to JSON for the file in the track directory."""
@@ -129,6 +246,23 @@ class Track:
             Constants.COLLABORATORS: self.collaborators,
         }
 
+    def _get_stored_signature(self):
+        if self.is_in_manifest:
+            # The album tracks the changes to its manifest.
+            return None
+        return self._storage.get_track_signature(self.path)
+
+    def to_persisted_json(self):
+        return self.to_json_for_track_dir()
+
+    def _write(self, _json):
+        self._storage.save_track(self.path, _json)
+
+    def flush(self):
+        if self.is_in_manifest:
+            return self._manifest_album.flush()
+        return super().flush()
+
     def update(self, track_number=None, description=None, collaborators=None):
         """Update track metadata."""
         self.track_number = track_number or self.track_number
@@ -138,19 +272,40 @@ class Track:
 
     def rename(self, new_name):
         """Renames the track. Warning: use album.rename_track() to update album metadata."""
+        old_path = self.path
         self.name = new_name
-        self.path = rename_directory(self.path, new_name)
+        self.path = rename_directory(old_path, new_name)
+        self._storage.move_track(old_path, self.path)
         self.save_track_metadata()
 
     def save_track_metadata(self):
-        """Save this instance's data to the file in the track directory."""
-        remove_file_if_exists(self.dir_json_path)
-        full_json = self.to_json_for_track_dir()
-        save_json_as(self.dir_json_path, full_json)
+        """Save this instance's data to the file in the track directory, if it changed."""
+        self.save()
         return self
 
 
-def _get_path_if_exists(path):
-    if os.path.isfile(path):
-        return path
-    raise FileNotFoundError(path)
+def identify_audio_files(tracks, max_workers=None, cache=None):
+    """Identify the audio files of the given tracks at once, using `fleep.identify_many()`.
+    Returns a list of (track, path, info) for each file that exists, where `info` is None if
+    the file is not a supported audio file."""
+    track_files = [(t, p) for t in tracks for p in t.available_audio().values()]
+    infos = identify_many(
+        [p for _, p in track_files], max_workers=max_workers, cache=cache
+    )
+    return [(t, p, infos[p]) for t, p in track_files if p in infos]
+
+
+def _scan_audio_files(track_path, track_name):
+    """Find the track's audio files with one scan of its directory, in the order of
+    `AUDIO_TYPES`."""
+    file_names = {f"{track_name}.{ext}": ext for ext in AUDIO_TYPES}
+    found = {}
+    try:
+        with os.scandir(track_path) as entries:
+            for entry in entries:
+                ext = file_names.get(entry.name)
+                if ext and entry.is_file():
+                    found[ext] = entry.path
+    except OSError:
+        return {}
+    return {ext: found[ext] for ext in AUDIO_TYPES if ext in found}
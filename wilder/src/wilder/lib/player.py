@@ -1,25 +1,189 @@
-import time
+import os
+import queue
+from collections import OrderedDict
 
 import vlc
 from wilder.lib.errors import WildVLCPlayerLaunchError
+from wilder.lib.playqueue import PlayQueue
+from wilder.lib.playqueue import QueueEntry
 
+_TIME_CHANGED = vlc.EventType.MediaPlayerTimeChanged
+_END_REACHED = vlc.EventType.MediaPlayerEndReached
+_ERROR = vlc.EventType.MediaPlayerEncounteredError
 
-def play_track(track_path):
-    player = vlc.MediaPlayer()
-    media = vlc.Media(track_path)
-    player.set_media(media)
+# The messages handled by the player loop, sent from VLC's event thread or by callers.
+_POSITION = "position"
+_END = "end"
+_SKIP = "skip"
+_SEEK = "seek"
+_PAUSE = "pause"
+_STOP = "stop"
+_PLAYER_EVENTS = (_POSITION, _END)
+# How often the player's state is checked when no message comes, in case VLC's events are
+# missed, such as when its event thread is busy.
+_STATE_POLL_INTERVAL = 0.5
 
-    cmd_res = player.play()
-    if cmd_res == -1:
-        raise WildVLCPlayerLaunchError()
+DEFAULT_MEDIA_CACHE_SIZE = 16
 
-    start = 1
-    time.sleep(start)
-    track_length = player.get_length() * 0.001
 
-    remaining = track_length - start
-    while remaining > 0:
-        wait_time = 0.1
+class MediaCache:
+    """Keeps the most recently used media of a VLC instance, already parsed, so playing
+    them again starts right away. Media are parsed again when their files change."""
+
+    def __init__(self, instance, max_size=DEFAULT_MEDIA_CACHE_SIZE):
+        self._instance = instance
+        self._max_size = max_size
+        self._media = OrderedDict()
+
+    def get(self, path):
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            # VLC reports the missing file when it tries to play it.
+            return self._instance.media_new(path)
+        media = self._media.pop(key, None)
+        if media is None:
+            media = self._instance.media_new(path)
+            # Parsing happens in the background and is done by the time the media plays.
+            media.parse_with_options(vlc.MediaParseFlag.local, -1)
+        self._media[key] = media
+        while len(self._media) > self._max_size:
+            self._media.popitem(last=False)
+        return media
+
+
+class QueuePlayer:
+    """Plays the entries of a `PlayQueue` one after another using one VLC player. Playback
+    is not gapless: each entry starts once VLC reports that the previous one ended. The next
+    entry's media is parsed while the current one plays, so the gap is short. VLC's events
+    and the calls to `skip()`, `seek()`, `pause()` and `stop()`, which may come from other
+    threads, are handled one at a time by the loop in `play()`."""
+
+    def __init__(self, play_queue, instance=None, media_cache=None):
+        self.queue = play_queue
+        self.is_paused = False
+        self._instance = instance or vlc.Instance()
+        self._media_cache = media_cache or MediaCache(self._instance)
+        self._player = self._instance.media_player_new()
+        self._messages = queue.Queue()
+
+    def play(self):
+        """Play the queue and yield the playing entry and its seconds remaining each time
+        the whole seconds change."""
+        events = self._player.event_manager()
+        self._attach(events)
+        try:
+            entry = self.queue.current
+            while entry is not None:
+                message = yield from self._play_entry(entry)
+                if message == _STOP:
+                    return
+                elif message == _END:
+                    self.queue.advance()
+                self._drop_player_events()
+                entry = self.queue.current
+        finally:
+            self._detach(events)
+            self._player.stop()
+
+    def skip(self, count=1):
+        """Play the entry the given number of entries away, back when it is negative."""
+        self._messages.put((_SKIP, count))
+
+    def seek(self, seconds):
+        """Move to the given position in the playing entry."""
+        self._messages.put((_SEEK, seconds))
+
+    def pause(self):
+        """Pause the playing entry, or resume it if it is paused."""
+        self._messages.put((_PAUSE, None))
+
+    def stop(self):
+        """Stop playing, ending the loop in `play()`."""
+        self._messages.put((_STOP, None))
+
+    def _play_entry(self, entry):
+        self._player.set_media(self._media_cache.get(entry.path))
+        self.is_paused = False
+        if self._player.play() == -1:
+            raise WildVLCPlayerLaunchError()
+
+        next_entry = self.queue.peek_next()
+        if next_entry is not None:
+            self._media_cache.get(next_entry.path)
+        last_shown = None
+        while True:
+            kind, value = self._get_message()
+            if kind == _POSITION:
+                remaining = self._get_seconds_remaining(entry, value)
+                if round(remaining) != last_shown:
+                    last_shown = round(remaining)
+                    yield entry, remaining
+            elif kind == _SEEK:
+                self._player.set_time(int(value * 1000))
+            elif kind == _PAUSE:
+                self.is_paused = not self.is_paused
+                self._player.set_pause(int(self.is_paused))
+            elif kind == _SKIP:
+                self.queue.skip(value)
+                self._player.stop()
+                return kind
+            elif kind == _END and self._player.get_state() != vlc.State.Ended:
+                # An end event of the previous entry that came after it was dropped.
+                continue
+            else:
+                return kind
+
+    def _get_message(self):
+        while True:
+            try:
+                return self._messages.get(timeout=_STATE_POLL_INTERVAL)
+            except queue.Empty:
+                state = self._player.get_state()
+                if state == vlc.State.Ended:
+                    return _END, None
+                elif state == vlc.State.Error:
+                    return _STOP, None
+
+    def _get_seconds_remaining(self, entry, position):
+        # VLC only knows the length once the entry has started.
+        length = entry.duration
+        if length is None:
+            length = self._player.get_length() * 0.001
+        return max(length - position, 0)
+
+    def _drop_player_events(self):
+        # Events from the entry that ended or was stopped must not count toward the next one.
+        messages = []
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                break
+        for message in messages:
+            if message[0] not in _PLAYER_EVENTS:
+                self._messages.put(message)
+
+    def _attach(self, events):
+        events.event_attach(_TIME_CHANGED, self._on_time_changed)
+        events.event_attach(_END_REACHED, self._on_end)
+        # Stop rather than move on, which would never end when looping over bad files.
+        events.event_attach(_ERROR, lambda _event: self.stop())
+
+    def _detach(self, events):
+        for event_type in (_TIME_CHANGED, _END_REACHED, _ERROR):
+            events.event_detach(event_type)
+
+    def _on_time_changed(self, event):
+        self._messages.put((_POSITION, event.u.new_time * 0.001))
+
+    def _on_end(self, _event):
+        self._messages.put((_END, None))
+
+
+def play_track(track_path, duration=None):
+    """Play the track and yield the seconds remaining each time the whole seconds change.
+    When the duration is not given, it is asked of VLC once the track has started."""
+    player = QueuePlayer(PlayQueue([QueueEntry(track_path, duration=duration)]))
+    for _, remaining in player.play():
         yield remaining
-        time.sleep(wait_time)
-        remaining -= wait_time
@@ -0,0 +1,73 @@
+class QueueEntry:
+    """A file in a play queue.
+
+    Args:
+        path (str): The path to the audio file.
+        duration (float): The length of the audio in seconds, if known.
+        item: What the file is for, such as a track.
+
+    Returns: Instance of wilder.lib.playqueue.QueueEntry.
+    """
+
+    __slots__ = ("path", "duration", "item")
+
+    def __init__(self, path, duration=None, item=None):
+        self.path = path
+        self.duration = duration
+        self.item = item
+
+    @classmethod
+    def from_json(cls, entry_json):
+        return cls(
+            entry_json["path"],
+            duration=entry_json.get("duration"),
+            item=entry_json.get("item"),
+        )
+
+    def to_json(self):
+        """The entry as JSON. The item must be JSON too."""
+        return {"path": self.path, "duration": self.duration, "item": self.item}
+
+
+class PlayQueue:
+    """The entries to play in order and the index of the one that is playing. When `loop`
+    is True, the queue starts over after its last entry instead of ending."""
+
+    def __init__(self, entries, start_index=0, loop=False):
+        self.entries = list(entries)
+        self.loop = loop
+        self.index = start_index if self.entries else None
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def current(self):
+        """The entry that is playing, or None once the queue has ended."""
+        return self.entries[self.index] if self.index is not None else None
+
+    def peek_next(self):
+        """The entry that plays after the current one, or None if the queue ends first."""
+        index = self._get_index_after(1)
+        return self.entries[index] if index is not None else None
+
+    def advance(self):
+        """Move to the next entry. Returns False if the queue ended instead."""
+        return self.skip(1)
+
+    def skip(self, count=1):
+        """Move forward by the given number of entries, or back when it is negative. When
+        not looping, skipping back past the first entry goes to the first entry. Returns
+        False if the queue ended instead."""
+        self.index = self._get_index_after(count)
+        return self.index is not None
+
+    def _get_index_after(self, count):
+        if self.index is None:
+            return None
+        index = self.index + count
+        if self.loop:
+            return index % len(self.entries)
+        if index >= len(self.entries):
+            return None
+        return max(index, 0)
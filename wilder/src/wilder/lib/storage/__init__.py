@@ -0,0 +1,18 @@
+from wilder.lib.config import get_storage_name
+from wilder.lib.storage.jsonfiles import JsonStorage
+
+SQLITE_STORAGE_NAME = "sqlite"
+STORAGE_NAMES = (JsonStorage.name, SQLITE_STORAGE_NAME)
+
+
+def get_storage(name=None, read_only=False):
+    """Create the storage with the given name, defaulting to the one set in the config."""
+    name = name or get_storage_name() or JsonStorage.name
+    if name == SQLITE_STORAGE_NAME:
+        # Imported here so that sqlite3 is only loaded when the catalog is stored in SQLite.
+        from wilder.lib.storage.sqlite import SqliteStorage
+
+        return SqliteStorage(read_only=read_only)
+    if name != JsonStorage.name:
+        raise KeyError(name)
+    return JsonStorage(read_only=read_only)
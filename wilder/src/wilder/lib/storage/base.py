@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+
+from wilder.lib.errors import ReadOnlyWilderError
+
+
+class BaseStorage:
+    """Where the MGMT, album and track JSON blobs are stored. Albums and tracks are keyed by
+    the path of their directory."""
+
+    name = None
+
+    def __init__(self, read_only=False):
+        self.read_only = read_only
+
+    def _assert_writable(self):
+        if self.read_only:
+            raise ReadOnlyWilderError()
+
+    @contextmanager
+    def transaction(self):
+        """Group writes so they are committed together, when supported."""
+        yield self
+
+    def load_mgmt(self):
+        """Override"""
+        raise NotImplementedError()
+
+    def save_mgmt(self, mgmt_json):
+        """Override"""
+        raise NotImplementedError()
+
+    def get_mgmt_signature(self):
+        """Override. Returns a value that changes whenever the MGMT JSON changes."""
+        raise NotImplementedError()
+
+    def load_album(self, album_path, album_name):
+        """Override"""
+        raise NotImplementedError()
+
+    def save_album(self, album_path, album_json):
+        """Override"""
+        raise NotImplementedError()
+
+    def get_album_signature(self, album_path):
+        """Override. Returns a value that changes whenever the album JSON changes."""
+        raise NotImplementedError()
+
+    def move_album(self, old_album_path, new_album_path):
+        """Override. Called after an album directory is renamed."""
+        raise NotImplementedError()
+
+    def load_track(self, track_path, track_name, artist_name, album_name):
+        """Override"""
+        raise NotImplementedError()
+
+    def save_track(self, track_path, track_json):
+        """Override"""
+        raise NotImplementedError()
+
+    def get_track_signature(self, track_path):
+        """Override. Returns a value that changes whenever the track JSON changes."""
+        raise NotImplementedError()
+
+    def move_track(self, old_track_path, new_track_path):
+        """Override. Called after a track directory is renamed."""
+        raise NotImplementedError()
@@ -0,0 +1,27 @@
+from wilder.lib.constants import Constants
+from wilder.lib.mgmt.album_dir import get_track_path
+
+# This module copies catalogs between storage backends, such as to export the SQLite catalog
+# back to album.json and track.json files so that album directories stay portable.
+
+
+def copy_catalog(source, destination):
+    """Copy the MGMT JSON and every managed album and track from one storage to another."""
+    mgmt_json = source.load_mgmt()
+    with destination.transaction():
+        for artist_json in mgmt_json.get(Constants.ARTISTS) or []:
+            artist_name = artist_json.get(Constants.NAME)
+            for album_ref in artist_json.get(Constants.DISCOGRAPHY) or []:
+                _copy_album(source, destination, artist_name, album_ref)
+        destination.save_mgmt(mgmt_json)
+
+
+def _copy_album(source, destination, artist_name, album_ref):
+    album_path = album_ref[Constants.PATH]
+    album_name = album_ref[Constants.NAME]
+    album_json = source.load_album(album_path, album_name)
+    destination.save_album(album_path, album_json)
+    for track_name in album_json.get(Constants.TRACKS) or []:
+        track_path = get_track_path(album_path, track_name)
+        track_json = source.load_track(track_path, track_name, artist_name, album_name)
+        destination.save_track(track_path, track_json)
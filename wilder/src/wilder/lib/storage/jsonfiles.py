@@ -0,0 +1,59 @@
+from wilder.lib.mgmt.album_dir import get_album_dir_json
+from wilder.lib.mgmt.album_dir import get_album_json_path
+from wilder.lib.mgmt.album_dir import get_track_dir_json
+from wilder.lib.mgmt.album_dir import get_track_json_path
+from wilder.lib.storage.base import BaseStorage
+from wilder.lib.user import get_mgmt_json_path
+from wilder.lib.util.sh import create_dir_if_not_exists
+from wilder.lib.util.sh import get_file_signature
+from wilder.lib.util.sh import load_json_from_file
+from wilder.lib.util.sh import save_json_as
+
+
+class JsonStorage(BaseStorage):
+    """Stores the MGMT JSON at ~/.wilder/mgmt.json, an album.json in each album directory and
+    a track.json in each track directory."""
+
+    name = "json"
+
+    def load_mgmt(self):
+        return load_json_from_file(get_mgmt_json_path())
+
+    def save_mgmt(self, mgmt_json):
+        self._assert_writable()
+        save_json_as(get_mgmt_json_path(), mgmt_json)
+
+    def get_mgmt_signature(self):
+        return get_file_signature(get_mgmt_json_path())
+
+    def load_album(self, album_path, album_name):
+        return get_album_dir_json(album_path, album_name, read_only=self.read_only)
+
+    def save_album(self, album_path, album_json):
+        self._assert_writable()
+        create_dir_if_not_exists(album_path)
+        save_json_as(get_album_json_path(album_path), album_json)
+
+    def get_album_signature(self, album_path):
+        return get_file_signature(get_album_json_path(album_path))
+
+    def move_album(self, old_album_path, new_album_path):
+        # The album.json file moves with its directory.
+        pass
+
+    def load_track(self, track_path, track_name, artist_name, album_name):
+        return get_track_dir_json(
+            track_path, track_name, artist_name, album_name, read_only=self.read_only
+        )
+
+    def save_track(self, track_path, track_json):
+        self._assert_writable()
+        create_dir_if_not_exists(track_path)
+        save_json_as(get_track_json_path(track_path), track_json)
+
+    def get_track_signature(self, track_path):
+        return get_file_signature(get_track_json_path(track_path))
+
+    def move_track(self, old_track_path, new_track_path):
+        # The track.json file moves with its directory.
+        pass
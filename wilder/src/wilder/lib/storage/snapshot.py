@@ -0,0 +1,178 @@
+import marshal
+import os
+from contextlib import contextmanager
+from threading import Lock
+
+from wilder.lib.storage.base import BaseStorage
+from wilder.lib.user import get_project_path
+from wilder.lib.util.sh import wopen
+
+SNAPSHOT_VERSION = 1
+
+_MGMT = "mgmt"
+_ALBUM = "album"
+_TRACK = "track"
+
+
+def get_snapshot_path(storage_name):
+    return os.path.join(get_project_path("cache"), f"{storage_name}.snapshot")
+
+
+class SnapshotStorage(BaseStorage):
+    """Wraps another storage and keeps the JSON it reads in a binary snapshot file under
+    ~/.wilder/cache, so that the next process can load the catalog in one read. Each entry is
+    checked against the wrapped storage's signature before it is used, so only the entries
+    that changed are read from the wrapped storage again. Call `save_snapshot()` after."""
+
+    def __init__(self, storage, snapshot_path=None):
+        super().__init__(read_only=storage.read_only)
+        self.storage = storage
+        self.name = storage.name
+        self._snapshot_path = snapshot_path or get_snapshot_path(storage.name)
+        self._entries = None
+        self._is_changed = False
+        self._lock = Lock()
+
+    @property
+    def entries(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = _read_snapshot(self._snapshot_path)
+            return self._entries
+
+    def save_snapshot(self):
+        """Write the snapshot file, if any of its entries changed."""
+        if not self._is_changed:
+            return False
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "marshalVersion": marshal.version,
+            "entries": self.entries,
+        }
+        temp_path = f"{self._snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with wopen(temp_path, "wb") as snapshot_file:
+                marshal.dump(snapshot, snapshot_file)
+            os.replace(temp_path, self._snapshot_path)
+        except OSError:
+            # The snapshot is only a cache; the next process rebuilds it.
+            return False
+        self._is_changed = False
+        return True
+
+    def _get(self, key, get_signature, load):
+        signature = get_signature()
+        entry = self.entries.get(key)
+        if entry is not None and signature is not None and entry[0] == signature:
+            return marshal.loads(entry[1])
+
+        _json = load()
+        if signature is None or signature == get_signature():
+            # A missing entry may have just been created by loading it.
+            self._put(key, get_signature, _json)
+        else:
+            self._forget(key)
+        return _json
+
+    def _put(self, key, get_signature, _json):
+        signature = get_signature()
+        # Files changed within their timestamp resolution get a new signature on each check,
+        # so they are only kept once they settle.
+        if signature is None or signature != get_signature():
+            self._forget(key)
+            return
+        self.entries[key] = (signature, marshal.dumps(_json))
+        self._is_changed = True
+
+    def _forget(self, key):
+        if self.entries.pop(key, None) is not None:
+            self._is_changed = True
+
+    @contextmanager
+    def transaction(self):
+        try:
+            with self.storage.transaction():
+                yield self
+        except BaseException:
+            # Entries saved during the transaction may have been rolled back.
+            self._entries = {}
+            self._is_changed = True
+            raise
+
+    """MGMT"""
+
+    def load_mgmt(self):
+        return self._get(
+            (_MGMT, None), self.storage.get_mgmt_signature, self.storage.load_mgmt
+        )
+
+    def save_mgmt(self, mgmt_json):
+        self.storage.save_mgmt(mgmt_json)
+        self._put((_MGMT, None), self.storage.get_mgmt_signature, mgmt_json)
+
+    def get_mgmt_signature(self):
+        return self.storage.get_mgmt_signature()
+
+    """Albums"""
+
+    def load_album(self, album_path, album_name):
+        return self._get(
+            (_ALBUM, album_path),
+            lambda: self.storage.get_album_signature(album_path),
+            lambda: self.storage.load_album(album_path, album_name),
+        )
+
+    def save_album(self, album_path, album_json):
+        self.storage.save_album(album_path, album_json)
+        self._put(
+            (_ALBUM, album_path),
+            lambda: self.storage.get_album_signature(album_path),
+            album_json,
+        )
+
+    def get_album_signature(self, album_path):
+        return self.storage.get_album_signature(album_path)
+
+    def move_album(self, old_album_path, new_album_path):
+        self.storage.move_album(old_album_path, new_album_path)
+        self._forget((_ALBUM, old_album_path))
+
+    """Tracks"""
+
+    def load_track(self, track_path, track_name, artist_name, album_name):
+        return self._get(
+            (_TRACK, track_path),
+            lambda: self.storage.get_track_signature(track_path),
+            lambda: self.storage.load_track(
+                track_path, track_name, artist_name, album_name
+            ),
+        )
+
+    def save_track(self, track_path, track_json):
+        self.storage.save_track(track_path, track_json)
+        self._put(
+            (_TRACK, track_path),
+            lambda: self.storage.get_track_signature(track_path),
+            track_json,
+        )
+
+    def get_track_signature(self, track_path):
+        return self.storage.get_track_signature(track_path)
+
+    def move_track(self, old_track_path, new_track_path):
+        self.storage.move_track(old_track_path, new_track_path)
+        self._forget((_TRACK, old_track_path))
+
+
+def _read_snapshot(snapshot_path):
+    try:
+        with wopen(snapshot_path, "rb") as snapshot_file:
+            snapshot = marshal.load(snapshot_file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    is_current = (
+        isinstance(snapshot, dict)
+        and snapshot.get("version") == SNAPSHOT_VERSION
+        and snapshot.get("marshalVersion") == marshal.version
+    )
+    return snapshot.get("entries") or {} if is_current else {}
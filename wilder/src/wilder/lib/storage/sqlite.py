@@ -0,0 +1,258 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from threading import RLock
+
+from wilder.lib.constants import Constants
+from wilder.lib.mgmt.album_dir import create_default_album_json
+from wilder.lib.mgmt.album_dir import create_default_track_json
+from wilder.lib.storage import SQLITE_STORAGE_NAME
+from wilder.lib.storage.base import BaseStorage
+from wilder.lib.user import get_project_path
+
+DATABASE_FILE_NAME = "wilder.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS artists (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS albums (
+    path TEXT PRIMARY KEY,
+    name TEXT,
+    artist TEXT,
+    data TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS albums_by_artist ON albums (artist, name);
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    album_path TEXT,
+    name TEXT,
+    data TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_by_album ON tracks (album_path, name);
+"""
+
+_MGMT_VERSION = "mgmtVersion"
+
+
+def get_database_path():
+    return os.path.join(get_project_path(), DATABASE_FILE_NAME)
+
+
+class SqliteStorage(BaseStorage):
+    """Stores the whole catalog in a single SQLite database at ~/.wilder/wilder.db. Album and
+    track directories are still used for audio files and artwork."""
+
+    name = SQLITE_STORAGE_NAME
+
+    def __init__(self, read_only=False, database_path=None):
+        super().__init__(read_only=read_only)
+        self._database_path = database_path
+        self._connection = None
+        self._lock = RLock()
+        self._transaction_depth = 0
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            path = self._database_path or get_database_path()
+            if self.read_only:
+                self._connection = _connect_read_only(path)
+            else:
+                connection = _connect(path)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(_SCHEMA)
+                self._connection = connection
+        return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._transaction_depth:
+                self._transaction_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._transaction_depth -= 1
+                return
+
+            self.connection.execute("BEGIN IMMEDIATE")
+            self._transaction_depth = 1
+            try:
+                yield self
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            else:
+                self.connection.execute("COMMIT")
+            finally:
+                self._transaction_depth = 0
+
+    def _query_one(self, sql, params=()):
+        with self._lock:
+            return self.connection.execute(sql, params).fetchone()
+
+    def _query_all(self, sql, params=()):
+        with self._lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def _get_meta(self, key):
+        row = self._query_one("SELECT value FROM meta WHERE key = ?", (key,))
+        return json.loads(row[0]) if row else None
+
+    def _set_meta(self, key, value):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, json.dumps(value)),
+        )
+
+    """MGMT"""
+
+    def load_mgmt(self):
+        rows = self._query_all("SELECT data FROM artists ORDER BY position")
+        return {
+            Constants.LAST_UPDATED: self._get_meta(Constants.LAST_UPDATED),
+            Constants.ARTISTS: [json.loads(row[0]) for row in rows],
+            Constants.FOCUS_ARTIST: self._get_meta(Constants.FOCUS_ARTIST),
+        }
+
+    def save_mgmt(self, mgmt_json):
+        self._assert_writable()
+        artists = mgmt_json.get(Constants.ARTISTS) or []
+        with self.transaction():
+            self.connection.execute("DELETE FROM artists")
+            self.connection.executemany(
+                "INSERT INTO artists (name, position, data) VALUES (?, ?, ?)",
+                [
+                    (artist.get(Constants.NAME), position, json.dumps(artist))
+                    for position, artist in enumerate(artists)
+                ],
+            )
+            self._set_meta(
+                Constants.LAST_UPDATED, mgmt_json.get(Constants.LAST_UPDATED)
+            )
+            self._set_meta(
+                Constants.FOCUS_ARTIST, mgmt_json.get(Constants.FOCUS_ARTIST)
+            )
+            self._set_meta(_MGMT_VERSION, (self._get_meta(_MGMT_VERSION) or 0) + 1)
+
+    def get_mgmt_signature(self):
+        return self._get_meta(_MGMT_VERSION)
+
+    """Albums"""
+
+    def load_album(self, album_path, album_name):
+        row = self._query_one("SELECT data FROM albums WHERE path = ?", (album_path,))
+        if not row:
+            return create_default_album_json(album_name)
+        return json.loads(row[0])
+
+    def save_album(self, album_path, album_json):
+        self._assert_writable()
+        with self.transaction():
+            self.connection.execute(
+                "INSERT INTO albums (path, name, artist, data, version) "
+                "VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT (path) DO UPDATE SET "
+                "name = excluded.name, artist = excluded.artist, data = excluded.data, "
+                "version = albums.version + 1",
+                (
+                    album_path,
+                    album_json.get(Constants.NAME),
+                    album_json.get(Constants.ARTIST),
+                    json.dumps(album_json),
+                ),
+            )
+
+    def get_album_signature(self, album_path):
+        row = self._query_one(
+            "SELECT version FROM albums WHERE path = ?", (album_path,)
+        )
+        return row[0] if row else None
+
+    def move_album(self, old_album_path, new_album_path):
+        self._assert_writable()
+        with self.transaction():
+            self.connection.execute(
+                "UPDATE albums SET path = ? WHERE path = ?",
+                (new_album_path, old_album_path),
+            )
+            self.connection.execute(
+                "UPDATE tracks SET album_path = ?, path = ? || substr(path, ?) "
+                "WHERE album_path = ?",
+                (
+                    new_album_path,
+                    new_album_path,
+                    len(old_album_path) + 1,
+                    old_album_path,
+                ),
+            )
+
+    """Tracks"""
+
+    def load_track(self, track_path, track_name, artist_name, album_name):
+        row = self._query_one("SELECT data FROM tracks WHERE path = ?", (track_path,))
+        if not row:
+            return create_default_track_json(track_name, artist_name, album_name)
+        return json.loads(row[0])
+
+    def save_track(self, track_path, track_json):
+        self._assert_writable()
+        with self.transaction():
+            self.connection.execute(
+                "INSERT INTO tracks (path, album_path, name, data, version) "
+                "VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT (path) DO UPDATE SET "
+                "album_path = excluded.album_path, name = excluded.name, "
+                "data = excluded.data, version = tracks.version + 1",
+                (
+                    track_path,
+                    os.path.dirname(track_path),
+                    track_json.get(Constants.NAME),
+                    json.dumps(track_json),
+                ),
+            )
+
+    def get_track_signature(self, track_path):
+        row = self._query_one(
+            "SELECT version FROM tracks WHERE path = ?", (track_path,)
+        )
+        return row[0] if row else None
+
+    def move_track(self, old_track_path, new_track_path):
+        self._assert_writable()
+        with self.transaction():
+            self.connection.execute(
+                "UPDATE tracks SET path = ? WHERE path = ?",
+                (new_track_path, old_track_path),
+            )
+
+
+def _connect(path, uri=False):
+    # Autocommit mode; transactions are started explicitly in `transaction()`.
+    return sqlite3.connect(path, isolation_level=None, check_same_thread=False, uri=uri)
+
+
+def _connect_read_only(path):
+    if not os.path.exists(path):
+        # Nothing is stored yet, so read from an empty in-memory catalog instead.
+        connection = _connect(":memory:")
+        connection.executescript(_SCHEMA)
+        return connection
+    return _connect(f"{Path(path).absolute().as_uri()}?mode=ro", uri=True)
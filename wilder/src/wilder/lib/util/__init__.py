@@ -14,8 +14,6 @@ def get_attribute_keys_from_class(cls):
     Returns:
         (list): A list containing the attribute names of the given class.
     """
-    return [
-        cls().__getattribute__(attr)
-        for attr in dir(cls)
-        if not callable(cls().__getattribute__(attr)) and not attr.startswith("_")
-    ]
+    instance = cls()
+    values = [getattr(instance, attr) for attr in dir(cls) if not attr.startswith("_")]
+    return [v for v in values if not callable(v)]
@@ -1,3 +1,6 @@
+import sys
+
+
 def to_bool(val):
     """Converts some values to booleans.
 
@@ -46,3 +49,11 @@ def to_int(val):
         if val.isnumeric():
             return int(val)
     return None
+
+
+def to_interned(val):
+    """Returns the interned copy of a string, so equal strings such as the artist and album
+    names repeated on every track share one object. Other values are returned as is."""
+    if isinstance(val, str):
+        return sys.intern(val)
+    return val
@@ -0,0 +1,174 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# This module counts the file operations made through `wilder.lib.util.sh`, when asked to.
+
+OUTSIDE_SDK = "(outside the SDK)"
+_SDK_MODULE = "wilder.sdk"
+# The code flag of functions defined in other functions, the same as `inspect.CO_NESTED`.
+_CO_NESTED = 0x10
+
+_recorders = []
+_recorders_lock = threading.Lock()
+_state = threading.local()
+
+
+class OperationStats:
+    """The number of calls to an operation, the bytes it read or wrote and the seconds it
+    took."""
+
+    __slots__ = ("calls", "bytes", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def to_json(self):
+        return {"calls": self.calls, "bytes": self.bytes, "seconds": self.seconds}
+
+
+class IOStats:
+    """Counts file operations per operation and per calling SDK method. Operations called by
+    other operations are counted too, so `save_json_as` also counts a `wopen`."""
+
+    def __init__(self):
+        self.operations = {}
+        self.callers = {}
+        self._lock = threading.Lock()
+
+    def count(self, operation, caller=None):
+        """The number of calls to the given operation, optionally from one SDK method."""
+        stats = self._get_stats(operation, caller)
+        return stats.calls if stats else 0
+
+    def bytes(self, operation, caller=None):
+        """The bytes read or written by the given operation."""
+        stats = self._get_stats(operation, caller)
+        return stats.bytes if stats else 0
+
+    def seconds(self, operation, caller=None):
+        """The seconds spent in the given operation."""
+        stats = self._get_stats(operation, caller)
+        return stats.seconds if stats else 0.0
+
+    def _get_stats(self, operation, caller):
+        if caller is None:
+            return self.operations.get(operation)
+        return self.callers.get(caller, {}).get(operation)
+
+    def clear(self):
+        with self._lock:
+            self.operations = {}
+            self.callers = {}
+
+    def record(self, operation, caller, size, seconds):
+        with self._lock:
+            caller_operations = self.callers.setdefault(caller, {})
+            for stats in (
+                self.operations.setdefault(operation, OperationStats()),
+                caller_operations.setdefault(operation, OperationStats()),
+            ):
+                stats.calls += 1
+                stats.bytes += size
+                stats.seconds += seconds
+
+    def to_records(self):
+        """One record per caller and operation, sorted by caller."""
+        with self._lock:
+            return [
+                {"caller": caller, "operation": operation, **stats.to_json()}
+                for caller, operations in sorted(self.callers.items())
+                for operation, stats in sorted(operations.items())
+            ]
+
+    def to_json(self):
+        with self._lock:
+            return {
+                "operations": {k: v.to_json() for k, v in self.operations.items()},
+                "callers": {
+                    caller: {k: v.to_json() for k, v in operations.items()}
+                    for caller, operations in self.callers.items()
+                },
+            }
+
+
+def is_recording():
+    return bool(_recorders)
+
+
+@contextmanager
+def record_io(stats=None):
+    """Count the file operations made while the block runs, on any thread."""
+    stats = stats or IOStats()
+    with _recorders_lock:
+        _recorders.append(stats)
+    try:
+        yield stats
+    finally:
+        with _recorders_lock:
+            _recorders.remove(stats)
+
+
+def accounted(operation):
+    """Decorate a function to count its calls as the given operation while recording."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _recorders:
+                return func(*args, **kwargs)
+            return _call_recorded(operation, func, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count_bytes(size):
+    """Add to the bytes of the operations that are running on this thread, such as both the
+    `save_as` and the `save_json_as` calling it."""
+    for entry in getattr(_state, "running", None) or []:
+        entry[0] += size
+
+
+def _call_recorded(operation, func, args, kwargs):
+    running = getattr(_state, "running", None)
+    if running is None:
+        running = _state.running = []
+    # The bytes counted by the operation while it runs.
+    entry = [0]
+    running.append(entry)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        running.pop()
+        caller = _get_sdk_caller()
+        for stats in list(_recorders):
+            stats.record(operation, caller, entry[0], seconds)
+
+
+def _get_sdk_caller():
+    # The outermost SDK function on the stack is the one the user called. Nested functions,
+    # such as decorator wrappers, are skipped in favor of the functions they wrap.
+    caller = OUTSIDE_SDK
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        is_nested = code.co_flags & _CO_NESTED
+        if frame.f_globals.get("__name__") == _SDK_MODULE and not is_nested:
+            caller = _get_function_name(frame)
+        frame = frame.f_back
+    return caller
+
+
+def _get_function_name(frame):
+    instance = frame.f_locals.get("self")
+    if instance is not None:
+        return f"{type(instance).__name__}.{frame.f_code.co_name}"
+    return frame.f_code.co_name
@@ -1,16 +1,26 @@
 import json
 import os
 import shutil
+import stat
+import tempfile
+import time
+from itertools import count
 from pathlib import Path
 
 from wilder.lib.errors import WildNotFoundError
+from wilder.lib.util.iostats import accounted
+from wilder.lib.util.iostats import count_bytes
+from wilder.lib.util.iostats import is_recording
 
-# This module abstracts some OS shell operations.
+# This module abstracts some OS shell operations. The operations that touch the filesystem are
+# counted while `wilder.lib.util.iostats.record_io()` is in use.
 
-
-BEGIN_OF_PREVIOUS_LINE = "\033[F"
+# The coarsest resolution of file modified times, which is 2 seconds on FAT filesystems.
+MODIFIED_TIME_RESOLUTION_NS = 2000000000
+_unsettled_signature_numbers = count()
 
 
+@accounted("wopen")
 def wopen(*args, **kwargs):
     """Open a file."""
     return open(*args, **kwargs)
@@ -31,6 +41,7 @@ def copy_files_to_dir(source_files, dest_path):
         copy_file_to_dir(file, dest_path)
 
 
+@accounted("copy_file_to_dir")
 def copy_file_to_dir(source_file, dest_path):
     """Copy a source file to the given destination."""
     if not source_file or not os.path.isfile(source_file):
@@ -42,6 +53,8 @@ def copy_file_to_dir(source_file, dest_path):
 
     remove_file_if_exists(dest_path)
     shutil.copy(source_file, dest_path)
+    if is_recording():
+        count_bytes(os.path.getsize(dest_path))
 
 
 def get_parent(path):
@@ -50,16 +63,29 @@ def get_parent(path):
         return path.parent
 
 
+@accounted("remove_file_if_exists")
 def remove_file_if_exists(file_path):
     """Delete a file if it exists."""
     if file_path and os.path.isfile(file_path):
         os.remove(file_path)
 
 
+@accounted("remove_socket_if_exists")
+def remove_socket_if_exists(socket_path):
+    """Delete a Unix domain socket file if it exists."""
+    try:
+        if stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.remove(socket_path)
+    except FileNotFoundError:
+        pass
+
+
+@accounted("remove_directory")
 def remove_directory(dir_path):
     shutil.rmtree(dir_path)
 
 
+@accounted("rename_directory")
 def rename_directory(original_path, new_name):
     """Takes a full path and a new name (of the last dir in the path) and creates the new directory.
     Returns the new path."""
@@ -70,23 +96,51 @@ def rename_directory(original_path, new_name):
     return new_path
 
 
+@accounted("create_dir_if_not_exists")
 def create_dir_if_not_exists(path):
-    """Build a directory tree."""
-    if path and not os.path.exists(path):
-        os.makedirs(path)
-
-
+    """Build a directory tree. Returns the outermost directory that was created, if any."""
+    if not path or os.path.exists(path):
+        return None
+    created_path = os.path.abspath(path)
+    while not os.path.exists(os.path.dirname(created_path)):
+        created_path = os.path.dirname(created_path)
+    os.makedirs(path)
+    return created_path
+
+
+@accounted("save_bytes_as")
+def save_bytes_as(to, data):
+    """Write the bytes to a temporary file next to the path and then move it into place, so
+    the file is never seen partly written."""
+    temp_fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(to) or None, prefix=".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(temp_fd, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, to)
+    except BaseException:
+        remove_file_if_exists(temp_path)
+        raise
+    if is_recording():
+        count_bytes(len(data))
+
+
+@accounted("save_json_as")
 def save_json_as(to, json_dict):
     """Dump a JSON dict to the file at the given location."""
     json_text = f"{json.dumps(json_dict, indent=2)}\n"
     save_as(to, json_text)
 
 
+@accounted("save_as")
 def save_as(to, file_text):
     """Overwrites or creates the file at the path with the given text."""
     remove_file_if_exists(to)
     with wopen(to, "w") as file_to_save:
         file_to_save.write(file_text)
+    if is_recording():
+        count_bytes(len(file_text.encode("utf-8")))
 
 
 def get_file_dir(file=None):
@@ -94,24 +148,39 @@ def get_file_dir(file=None):
     return os.path.dirname(os.path.abspath(file or __file__))
 
 
+@accounted("load_json_from_file")
 def load_json_from_file(file_path):
     """Get a JSON dict loaded from a file."""
     with wopen(file_path) as json_file:
-        return json.load(json_file)
-
-
+        json_text = json_file.read()
+    if is_recording():
+        count_bytes(len(json_text.encode("utf-8")))
+    return json.loads(json_text)
+
+
+@accounted("get_file_signature")
+def get_file_signature(file_path):
+    """Get a tuple that changes whenever the file changes, or None if the file does not exist.
+    The first two items are the file's modified time and size."""
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return None
+    signature = (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+    if is_recently_modified(file_stat.st_mtime_ns):
+        # The file may change again without its stats changing, so it gets a signature that
+        # matches no other, even one from another process, and is always seen as changed.
+        return signature + (os.getpid(), next(_unsettled_signature_numbers))
+    return signature
+
+
+def is_recently_modified(modified_time_ns):
+    """True if a file modified at the given time could still change without its modified time
+    changing, since it is within the timestamp resolution of the filesystem."""
+    return time.time_ns() - modified_time_ns <= MODIFIED_TIME_RESOLUTION_NS
+
+
+@accounted("file_exists_with_data")
 def file_exists_with_data(file_path):
     """Check if a file exists and contains bytes."""
     return os.path.isfile(file_path) and os.path.getsize(file_path)
-
-
-def count_lines(text):
-    """Counts the number of lines in a weird but extremely cautious way."""
-    temp_file_name = "_wilder_temp_file.txt"
-    remove_file_if_exists(temp_file_name)
-    save_as(temp_file_name, text)
-    with wopen(temp_file_name) as temp_file:
-        number_of_lines = len(temp_file.readlines())
-
-    remove_file_if_exists(temp_file_name)
-    return number_of_lines
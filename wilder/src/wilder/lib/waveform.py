@@ -0,0 +1,282 @@
+import os
+import struct
+import sys
+import wave
+from array import array
+
+from wilder.lib.constants import Constants
+from wilder.lib.errors import InvalidAudioFileError
+from wilder.lib.errors import MissingOptionalDependencyError
+from wilder.lib.errors import UnsupportedAudioTypeError
+from wilder.lib.util.iostats import count_bytes
+from wilder.lib.util.iostats import is_recording
+from wilder.lib.util.sh import get_file_signature
+from wilder.lib.util.sh import save_bytes_as
+from wilder.lib.util.sh import wopen
+
+# This module computes the overviews drawn for a track's audio, called waveforms. The audio
+# is decoded once, in chunks, and the waveform is saved in a small file next to it, called
+# a sidecar, so later drawings only read the sidecar.
+
+# The number of frames each peak covers at each zoom level. Each must be a multiple of the
+# first, which is the finest.
+DEFAULT_ZOOM_LEVELS = (256, 1024, 4096, 16384)
+WAVEFORM_AUDIO_TYPES = ("wav", "flac")
+_CHUNK_FRAMES = 65536
+_MAGIC = b"WPK1"
+# Magic, source file modified time and size, sample rate, channels, frames and the number
+# of levels. Each level then has its frames per peak and its number of peaks.
+_HEADER = struct.Struct("<4sqQIHQH")
+_LEVEL_HEADER = struct.Struct("<II")
+# Turns unsigned 8-bit samples into signed ones.
+_UNSIGNED_TO_SIGNED = bytes((b + 128) % 256 for b in range(256))
+
+
+class Waveform:
+    """The minimum and maximum sample values of audio at several zoom levels, as 16-bit
+    numbers. Each level is an array of (min, max) pairs, one for every `frames_per_peak`
+    frames and all channels.
+
+    Args:
+        sample_rate (int): The number of frames per second.
+        channels (int): The number of channels.
+        frames (int): The number of frames in the audio.
+        levels (dict): The peaks of each zoom level, by the frames per peak.
+        source_signature (tuple): The modified time and size of the audio file.
+
+    Returns: Instance of wilder.lib.waveform.Waveform.
+    """
+
+    def __init__(self, sample_rate, channels, frames, levels, source_signature=None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = frames
+        self.levels = levels
+        self.source_signature = source_signature
+
+    @property
+    def zoom_levels(self):
+        return sorted(self.levels)
+
+    def get_level(self, frames_per_peak=None):
+        """The finest zoom level with at least the given frames per peak, or the coarsest
+        level if none has that many."""
+        zoom_levels = self.zoom_levels
+        if frames_per_peak is None:
+            return zoom_levels[0]
+        for level in zoom_levels:
+            if level >= frames_per_peak:
+                return level
+        return zoom_levels[-1]
+
+    def to_json(self, frames_per_peak=None):
+        """One zoom level of the waveform as JSON, for drawing."""
+        level = self.get_level(frames_per_peak)
+        return {
+            Constants.SAMPLE_RATE: self.sample_rate,
+            Constants.CHANNELS: self.channels,
+            Constants.FRAMES: self.frames,
+            Constants.FRAMES_PER_PEAK: level,
+            Constants.PEAKS: self.levels[level].tolist(),
+        }
+
+    def to_bytes(self):
+        modified_time, size = self.source_signature or (0, 0)
+        parts = [
+            _HEADER.pack(
+                _MAGIC,
+                modified_time,
+                size,
+                self.sample_rate,
+                self.channels,
+                self.frames,
+                len(self.levels),
+            )
+        ]
+        for level in self.zoom_levels:
+            peaks = self.levels[level]
+            parts.append(_LEVEL_HEADER.pack(level, len(peaks) // 2))
+            parts.append(_to_little_endian(peaks).tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Read a waveform saved by `to_bytes()`. Returns None if the data is not one."""
+        if len(data) < _HEADER.size or data[:4] != _MAGIC:
+            return None
+        header = _HEADER.unpack_from(data)
+        _, modified_time, size, sample_rate, channels, frames, level_count = header
+        levels = {}
+        offset = _HEADER.size
+        for _ in range(level_count):
+            if offset + _LEVEL_HEADER.size > len(data):
+                return None
+            level, peak_count = _LEVEL_HEADER.unpack_from(data, offset)
+            offset += _LEVEL_HEADER.size
+            end = offset + peak_count * 4
+            if end > len(data):
+                return None
+            levels[level] = _to_little_endian(array("h", data[offset:end]))
+            offset = end
+        return cls(sample_rate, channels, frames, levels, (modified_time, size))
+
+
+def get_waveform(audio_file_path, peaks_path, zoom_levels=DEFAULT_ZOOM_LEVELS):
+    """Get the waveform of a WAV or FLAC file from its sidecar at `peaks_path`. If the
+    sidecar is missing or older than the audio, the waveform is computed and saved."""
+    waveform = load_current_waveform(
+        audio_file_path, peaks_path, zoom_levels=zoom_levels
+    )
+    if waveform is None:
+        waveform = compute_waveform(audio_file_path, zoom_levels=zoom_levels)
+        save_waveform(peaks_path, waveform)
+    return waveform
+
+
+def load_current_waveform(audio_file_path, peaks_path, zoom_levels=DEFAULT_ZOOM_LEVELS):
+    """Read the waveform sidecar of a WAV or FLAC file, or return None if there is no valid
+    one with the given zoom levels that is as new as the audio."""
+    source_signature = _get_source_signature(audio_file_path)
+    waveform = load_waveform(peaks_path)
+    if waveform is None or waveform.source_signature != source_signature:
+        return None
+    if not set(zoom_levels) <= set(waveform.levels):
+        return None
+    return waveform
+
+
+def load_waveform(peaks_path):
+    """Read a waveform sidecar, or return None if there is no valid one."""
+    try:
+        with wopen(peaks_path, "rb") as peaks_file:
+            data = peaks_file.read()
+    except FileNotFoundError:
+        return None
+    if is_recording():
+        count_bytes(len(data))
+    return Waveform.from_bytes(data)
+
+
+def save_waveform(peaks_path, waveform):
+    save_bytes_as(peaks_path, waveform.to_bytes())
+
+
+def compute_waveform(audio_file_path, zoom_levels=DEFAULT_ZOOM_LEVELS):
+    """Decode a WAV or FLAC file in chunks and compute its peaks at the given zoom levels.
+    Only the finest level is computed from the samples, and the others from it."""
+    zoom_levels = sorted(zoom_levels)
+    finest = zoom_levels[0]
+    if any(level % finest for level in zoom_levels):
+        raise ValueError("Each zoom level must be a multiple of the finest level.")
+
+    source_signature = _get_source_signature(audio_file_path)
+    extension = os.path.splitext(audio_file_path)[1][1:].lower()
+    if extension == "wav":
+        reader = _read_wav_chunks
+    elif extension == "flac":
+        reader = _read_flac_chunks
+    else:
+        raise UnsupportedAudioTypeError(extension)
+
+    finest_peaks = array("h")
+    with wopen(audio_file_path, "rb") as audio_file:
+        # Chunks hold a whole number of peaks, so no peak spans two chunks.
+        chunk_frames = _CHUNK_FRAMES - _CHUNK_FRAMES % finest or finest
+        sample_rate, channels, chunks = reader(audio_file, chunk_frames)
+        frames = 0
+        for samples in chunks:
+            frames += len(samples) // channels
+            finest_peaks.extend(_get_peaks(samples, finest * channels))
+
+    levels = {finest: finest_peaks}
+    for level in zoom_levels[1:]:
+        levels[level] = _combine_peaks(finest_peaks, level // finest)
+    return Waveform(sample_rate, channels, frames, levels, source_signature)
+
+
+def _read_wav_chunks(audio_file, chunk_frames):
+    try:
+        wav = wave.open(audio_file)
+    except (wave.Error, EOFError):
+        raise InvalidAudioFileError(audio_file.name)
+    sample_width = wav.getsampwidth()
+    if not 1 <= sample_width <= 4:
+        raise InvalidAudioFileError(audio_file.name)
+
+    def read_chunks():
+        with wav:
+            frames = wav.readframes(chunk_frames)
+            while frames:
+                yield _to_16_bit_samples(frames, sample_width)
+                frames = wav.readframes(chunk_frames)
+
+    return wav.getframerate(), wav.getnchannels(), read_chunks()
+
+
+def _read_flac_chunks(audio_file, chunk_frames):
+    try:
+        import soundfile
+    except ImportError:
+        raise MissingOptionalDependencyError("soundfile", "FLAC waveforms")
+    try:
+        sound = soundfile.SoundFile(audio_file)
+    except RuntimeError:
+        raise InvalidAudioFileError(audio_file.name)
+
+    def read_chunks():
+        with sound:
+            for block in sound.blocks(blocksize=chunk_frames, dtype="int16"):
+                # The frames' samples are interleaved, the same as in a WAV file.
+                yield array("h", block.tobytes())
+
+    return sound.samplerate, sound.channels, read_chunks()
+
+
+def _to_16_bit_samples(frames, sample_width):
+    """Convert little-endian PCM samples to 16-bit ones by keeping their two high bytes."""
+    if sample_width == 2:
+        samples = array("h", frames)
+    else:
+        high_bytes = bytearray(len(frames) // sample_width * 2)
+        if sample_width == 1:
+            high_bytes[1::2] = frames.translate(_UNSIGNED_TO_SIGNED)
+        else:
+            high_bytes[0::2] = frames[sample_width - 2 :: sample_width]
+            high_bytes[1::2] = frames[sample_width - 1 :: sample_width]
+        samples = array("h", high_bytes)
+    return _to_little_endian(samples)
+
+
+def _get_peaks(samples, samples_per_peak):
+    peaks = array("h")
+    for start in range(0, len(samples), samples_per_peak):
+        bucket = samples[start : start + samples_per_peak]
+        peaks.append(min(bucket))
+        peaks.append(max(bucket))
+    return peaks
+
+
+def _combine_peaks(peaks, peaks_per_peak):
+    minimums = peaks[0::2]
+    maximums = peaks[1::2]
+    combined = array("h")
+    for start in range(0, len(minimums), peaks_per_peak):
+        end = start + peaks_per_peak
+        combined.append(min(minimums[start:end]))
+        combined.append(max(maximums[start:end]))
+    return combined
+
+
+def _to_little_endian(samples):
+    # Arrays use the machine's byte order. Audio files and sidecars are little-endian.
+    if sys.byteorder == "big":
+        samples = array(samples.typecode, samples)
+        samples.byteswap()
+    return samples
+
+
+def _get_source_signature(audio_file_path):
+    signature = get_file_signature(audio_file_path)
+    if signature is None:
+        raise FileNotFoundError(audio_file_path)
+    return signature[:2]
@@ -1,5 +1,7 @@
 import shutil
+from contextlib import contextmanager
 from datetime import datetime
+from functools import wraps
 
 import wilder.lib.user as user
 from wilder.lib.constants import Constants as Constants
@@ -7,9 +9,18 @@ from wilder.lib.errors import ArtistAlreadyExistsError
 from wilder.lib.errors import ArtistNotFoundError
 from wilder.lib.errors import NoAlbumsError
 from wilder.lib.errors import NoArtistsFoundError
+from wilder.lib.errors import ReadOnlyWilderError
 from wilder.lib.mgmt.artist import Artist
-from wilder.lib.player import play_track
-from wilder.lib.util.sh import save_json_as
+from wilder.lib.mgmt.persistence import begin_unit_of_work
+from wilder.lib.mgmt.persistence import get_current_unit_of_work
+from wilder.lib.mgmt.persistence import load_all
+from wilder.lib.mgmt.persistence import Persistable
+from wilder.lib.mgmt.persistence import UnitOfWork
+from wilder.lib.playqueue import PlayQueue
+from wilder.lib.playqueue import QueueEntry
+from wilder.lib.storage import get_storage
+from wilder.lib.storage.jsonfiles import JsonStorage
+from wilder.lib.storage.snapshot import SnapshotStorage
 
 
 class BaseWildApi:
@@ -38,13 +49,28 @@ class BaseWildApi:
         raise ArtistNotFoundError(name)
 
 
-class Wilder(BaseWildApi):
+def _mutation(method):
+    """Decorates Wilder methods that make changes so that they fail in read-only mode."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.read_only:
+            raise ReadOnlyWilderError()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class Wilder(BaseWildApi, Persistable):
     def __init__(
-        self, artists=None, last_updated=None, focus_artist=None,
+        self, artists=None, last_updated=None, focus_artist=None, storage=None,
     ):
+        super().__init__()
         self._artists = artists
         self._last_updated = last_updated
         self._focus_artist = focus_artist
+        self._storage = storage or JsonStorage()
+        self._index_artists()
 
     def __repr__(self):
         return (
@@ -54,13 +80,19 @@ class Wilder(BaseWildApi):
     """Class"""
 
     @classmethod
-    def from_json(cls, mgmt_json):
+    def from_json(cls, mgmt_json, storage=None):
+        storage = storage or JsonStorage()
         last_updated = mgmt_json.get(Constants.LAST_UPDATED)
         focus_artist = mgmt_json.get(Constants.FOCUS_ARTIST)
-        artists = _parse_artists(mgmt_json)
-        return cls(
-            artists=artists, last_updated=last_updated, focus_artist=focus_artist,
+        artists = _parse_artists(mgmt_json, storage=storage)
+        wilder = cls(
+            artists=artists,
+            last_updated=last_updated,
+            focus_artist=focus_artist,
+            storage=storage,
         )
+        wilder.mark_clean(_without_last_updated(mgmt_json))
+        return wilder
 
     def get_mgmt(self):
         """Get the full MGMT JSON blob."""
@@ -70,6 +102,31 @@ class Wilder(BaseWildApi):
             Constants.FOCUS_ARTIST: self._focus_artist,
         }
 
+    @property
+    def storage(self):
+        """Where the catalog is stored."""
+        return self._storage
+
+    @property
+    def read_only(self):
+        return self._storage.read_only
+
+    def _get_stored_signature(self):
+        return self._storage.get_mgmt_signature()
+
+    def to_persisted_json(self):
+        return _without_last_updated(self.get_mgmt())
+
+    def _write(self, _json):
+        mgmt_json = dict(_json)
+        save(mgmt_json, storage=self._storage)
+        self._last_updated = mgmt_json[Constants.LAST_UPDATED]
+
+    def mark_clean(self, persisted_json=None):
+        super().mark_clean(persisted_json=persisted_json)
+        for artist in self._artists or []:
+            artist.mark_clean()
+
     """Artists"""
 
     def get_artists(self):
@@ -87,25 +144,60 @@ class Wilder(BaseWildApi):
             return self._artists[0]
         return artist
 
+    def is_represented(self, name):
+        """Returns True if the artist is represented by Wilder."""
+        return name in self._artists_by_name
+
+    def _get_artist_by_name(self, name):
+        """Get an artist by name or by one of their aliases."""
+        if not self._artists:
+            raise NoArtistsFoundError()
+        artist = self._artists_by_name.get(name) or self._artists_by_alias.get(name)
+        if not artist:
+            raise ArtistNotFoundError(name)
+        return artist
+
+    def _index_artists(self):
+        self._artists_by_name = {}
+        self._artists_by_alias = {}
+        for artist in self._artists or []:
+            self._index_artist(artist)
+
+    def _index_artist(self, artist):
+        self._artists_by_name[artist.name] = artist
+        for alias in artist.also_known_as:
+            self._artists_by_alias[alias] = artist
+
+    def _unindex_artist(self, artist):
+        if self._artists_by_name.get(artist.name) is artist:
+            del self._artists_by_name[artist.name]
+        for alias in artist.also_known_as:
+            if self._artists_by_alias.get(alias) is artist:
+                del self._artists_by_alias[alias]
+
     def _get_focus_artist(self):
         name = self._focus_artist
         if name:
             return self._get_artist_by_name(name)
 
+    @_mutation
     def focus_on_artist(self, artist_name):
         """Change the focus artist."""
         artist = self._get_artist_by_name(artist_name)
         self._focus_artist = artist.name
         self._save()
 
+    @_mutation
     def create_artist(self, name, bio=None):
         """Create a new artist."""
         if self.is_represented(name):
             raise ArtistAlreadyExistsError(name)
-        artist = Artist(name=name, bio=bio)
+        artist = Artist(name=name, bio=bio, storage=self._storage)
         self._artists.append(artist)
+        self._index_artist(artist)
         self._save()
 
+    @_mutation
     def delete_artist(self, name):
         """Remove an artist."""
         if not self.is_represented(name):
@@ -119,6 +211,8 @@ class Wilder(BaseWildApi):
         for artist in self._artists:
             if artist.name != name:
                 new_artists.append(artist)
+            else:
+                self._unindex_artist(artist)
 
         # Unset focus artist, if deleting the current focus artist.
         if self._focus_artist == name:
@@ -126,19 +220,23 @@ class Wilder(BaseWildApi):
 
         self._artists = new_artists
 
+    @_mutation
     def update_artist(self, name=None, bio=None):
         """Update artist information."""
         artist = self.get_artist(name=name)
         artist.bio = bio or artist.bio
         self._save()
 
+    @_mutation
     def rename_artist(self, new_name, artist_name=None, forget_old_name=False):
         """Change an artist's performer name."""
         if not new_name:
             raise ValueError("Must provide a new name when renaming an artist.")
         artist = self.get_artist(name=artist_name)
         old_name = artist.name
+        self._unindex_artist(artist)
         artist.rename(new_name, forget_old_name=forget_old_name)
+        self._index_artist(artist)
 
         # Set focus artist to the new artist's name, if renaming the focus artist.
         if old_name == self._focus_artist:
@@ -146,16 +244,22 @@ class Wilder(BaseWildApi):
 
         self._save()
 
+    @_mutation
     def add_alias(self, alias, artist_name=None):
         """Add an additional artist name, such as a "formerly known as"."""
         artist = self.get_artist(name=artist_name)
+        self._unindex_artist(artist)
         artist.add_alias(alias)
+        self._index_artist(artist)
         self._save()
 
+    @_mutation
     def remove_alias(self, alias, artist_name=None):
         """Remove one of the additional artist names."""
         artist = self.get_artist(name=artist_name)
+        self._unindex_artist(artist)
         artist.remove_alias(alias)
+        self._index_artist(artist)
         self._save()
 
     """Albums"""
@@ -173,6 +277,7 @@ class Wilder(BaseWildApi):
         artist = self.get_artist(name=artist_name)
         return artist.get_album(name)
 
+    @_mutation
     def create_album(
         self,
         album_path,
@@ -181,8 +286,10 @@ class Wilder(BaseWildApi):
         description=None,
         album_type=None,
         status=None,
+        use_manifest=False,
     ):
-        """Start a new album."""
+        """Start a new album. Set `use_manifest` to True to store the album's track metadata
+        in the album JSON."""
         artist = self.get_artist(name=artist_name)
         artist.create_album(
             album_path,
@@ -190,9 +297,11 @@ class Wilder(BaseWildApi):
             description=description,
             album_type=album_type,
             status=status,
+            use_manifest=use_manifest,
         )
         self._save()
 
+    @_mutation
     def update_album(
         self,
         album_name,
@@ -206,12 +315,21 @@ class Wilder(BaseWildApi):
         album.update(description=description, album_type=album_type, status=status)
         self._save()
 
-    def rename_album(self, new_name, album_name, artist_name=None, hard=False):
+    @_mutation
+    def rename_album(self, new_name, album_name, artist_name=None):
         """Change the name of an album."""
-        album = self.get_album(album_name, artist_name=artist_name)
-        album.rename(new_name, hard=hard)
+        artist = self.get_artist(name=artist_name)
+        artist.rename_album(new_name, album_name)
         self._save()
 
+    @_mutation
+    def use_album_manifest(self, album_name, artist_name=None, enabled=True):
+        """Move an album's track metadata into the album JSON, or back out to each track's
+        own JSON when `enabled` is False."""
+        album = self.get_album(album_name, artist_name=artist_name)
+        album.use_manifest(enabled=enabled)
+
+    @_mutation
     def delete_album(self, album_name, artist_name=None, hard=False):
         """Delete an album."""
         artist = self.get_artist(artist_name)
@@ -221,6 +339,7 @@ class Wilder(BaseWildApi):
 
     """Tracks"""
 
+    @_mutation
     def create_track(
         self,
         track_name,
@@ -240,6 +359,7 @@ class Wilder(BaseWildApi):
         )
         self._save()
 
+    @_mutation
     def update_track(
         self,
         track_name,
@@ -262,26 +382,45 @@ class Wilder(BaseWildApi):
         album = self.get_album(album_name, artist_name=artist_name)
         return album.tracks
 
+    def iter_tracks(self, filter=None):
+        """Yield every track in the catalog, ordered by artist, then album, then track number.
+        Each album is only read when reached. Albums that had not been read before are
+        unloaded once their tracks are yielded, so memory use does not grow with the catalog.
+        `filter` is an optional function that returns True for the tracks to yield."""
+        for artist in self._artists or []:
+            for album in artist.get_discography(err_on_none=False):
+                was_loaded = album._is_loaded
+                tracks = sorted(album.tracks, key=lambda t: (t.track_number, t.name))
+                for track in tracks:
+                    if filter is None or filter(track):
+                        yield track
+                if not was_loaded and not _has_unsaved_changes(album):
+                    album.unload()
+
     def get_track(self, track_name, album_name, artist_name=None):
         """Get a single track from an album."""
         album = self.get_album(album_name, artist_name=artist_name)
         return album.get_track(track_name)
 
+    @_mutation
     def delete_track(self, track_name, album_name, artist_name=None, hard=None):
         """Delete a track from an album."""
         album = self.get_album(album_name, artist_name=artist_name)
         album.delete_track(track_name, hard=hard)
 
+    @_mutation
     def rename_track(self, new_name, track_name, album_name, artist_name=None):
         """Change the name of a track."""
         album = self.get_album(album_name, artist_name=artist_name)
         album.rename_track(new_name, track_name)
 
+    @_mutation
     def bulk_set_track_numbers(self, track_numbers, album_name, artist_name=None):
         """Bulk set all of the track numbers on an album."""
         album = self.get_album(album_name, artist_name=artist_name)
         album.bulk_set_track_numbers(track_numbers)
 
+    @_mutation
     def auto_set_track_numbers(self, album_name, artist_name=None):
         """Automatically adjust the track numbers on an album."""
         album = self.get_album(album_name, artist_name=artist_name)
@@ -290,36 +429,203 @@ class Wilder(BaseWildApi):
     def play_track(self, track_name, album_name, audio_type=None, artist_name=None):
         """Play a track from an album."""
         track = self.get_track(track_name, album_name, artist_name=artist_name)
-        path = track.get_file(audio_type=audio_type)
-        return play_track(path)
+        entry = _get_queue_entry(track, audio_type)
+        # The VLC bindings are slow to import and only needed for playing.
+        from wilder.lib.player import play_track
+
+        return play_track(entry.path, duration=entry.duration)
+
+    def play_album(
+        self,
+        album_name,
+        artist_name=None,
+        start_track_name=None,
+        audio_type=None,
+        loop=False,
+    ):
+        """Get a player for an album, starting at the given track. Iterating its `play()`
+        plays the album and yields each track's entry and seconds remaining."""
+        play_queue = self.get_album_queue(
+            album_name,
+            artist_name=artist_name,
+            start_track_name=start_track_name,
+            audio_type=audio_type,
+            loop=loop,
+        )
+        from wilder.lib.player import QueuePlayer
+
+        return QueuePlayer(play_queue)
+
+    def get_album_queue(
+        self,
+        album_name,
+        artist_name=None,
+        start_track_name=None,
+        audio_type=None,
+        loop=False,
+    ):
+        """Get the queue of an album's audio files, starting at the given track."""
+        album = self.get_album(album_name, artist_name=artist_name)
+        tracks = album.get_tracks()
+        start_index = 0
+        if start_track_name is not None:
+            start_track = album.get_track(start_track_name)
+            start_index = [t.name for t in tracks].index(start_track.name)
+        entries = [_get_queue_entry(t, audio_type) for t in tracks]
+        return PlayQueue(entries, start_index=start_index, loop=loop)
+
+    def get_track_queue(
+        self, track_name, album_name, audio_type=None, artist_name=None
+    ):
+        """Get a queue of just the given track's audio file."""
+        track = self.get_track(track_name, album_name, artist_name=artist_name)
+        return PlayQueue([_get_queue_entry(track, audio_type)])
+
+    def get_track_waveform(
+        self, track_name, album_name, audio_type=None, artist_name=None
+    ):
+        """Get the waveform peaks of a track, for drawing. They are computed and saved if
+        needed, except in read-only mode, where `WaveformNotFoundError` is raised instead."""
+        track = self.get_track(track_name, album_name, artist_name=artist_name)
+        return track.get_waveform(audio_type=audio_type, compute=not self.read_only)
 
     """Other"""
 
+    @contextmanager
+    def batch(self):
+        """Defer writing the MGMT, album and track JSON until the block completes, writing each
+        changed one once and in a single storage transaction. If the block raises, nothing is
+        written, the album and track directories created in the block are removed and the
+        in-memory state is reloaded from storage. Other directory changes, such as renaming
+        album directories, happen immediately and are kept.
+
+        Usage:
+
+        with wilder.batch():
+            wilder.create_track("Track 1", "Album")
+            wilder.create_track("Track 2", "Album")
+        """
+        if get_current_unit_of_work() is not None:
+            # Nested batches are part of the outer batch.
+            yield self
+            return
+
+        work = UnitOfWork()
+        try:
+            with begin_unit_of_work(work):
+                yield self
+        except BaseException:
+            work.discard()
+            self._rollback()
+            raise
+        with self._storage.transaction():
+            work.flush()
+
+    transaction = batch
+
     @staticmethod
     def nuke():
         shutil.rmtree(user.get_project_path())
 
     def _save(self):
-        _json = self.get_mgmt()
-        return save(_json)
+        """Write the MGMT JSON if it changed. Albums and tracks write their own JSON when
+        they change, so loaded ones are not checked here. During a batch, this waits until
+        the batch completes."""
+        work = get_current_unit_of_work()
+        if work is not None:
+            work.register(self)
+            return 0
+
+        with self._storage.transaction():
+            return int(self.flush())
+
+    def preload(self, max_workers=None):
+        """Read the metadata of every album and then every track now instead of when first
+        accessed, reading up to `max_workers` files at once. Useful on network storage."""
+        albums = []
+        for artist in self._artists:
+            albums += artist.get_discography(err_on_none=False)
+        load_all(albums, max_workers=max_workers)
+        load_all([t for a in albums for t in a.tracks], max_workers=max_workers)
+        return self
+
+    def refresh(self):
+        """Re-read whatever changed in storage since it was last read, leaving everything else
+        in memory. Returns this object, or a new Wilder object if the MGMT changed."""
+        loaded_albums = _get_loaded_albums(self._artists)
+        if self.is_stale():
+            wilder = get_wilder_sdk(storage=self._storage)
+            for artist in wilder._artists:
+                artist.reuse_albums(loaded_albums)
+            loaded_albums = _get_loaded_albums(wilder._artists)
+        else:
+            wilder = self
+
+        for album in loaded_albums:
+            album.refresh()
+        return wilder
+
+    def needs_refresh(self):
+        """True if anything that was read changed in storage since, so `refresh()` would
+        re-read it. This only checks the files' stats and changes nothing."""
+        if self.is_stale():
+            return True
+        for album in _get_loaded_albums(self._artists):
+            if album.is_stale() or any(t.is_stale() for t in album.loaded_tracks):
+                return True
+        return False
+
+    def _rollback(self):
+        """Discard in-memory changes by reloading from the MGMT JSON."""
+        wilder = get_wilder_sdk(storage=self._storage)
+        self._artists = wilder._artists
+        self._index_artists()
+        self._last_updated = wilder._last_updated
+        self._focus_artist = wilder._focus_artist
+        self._persisted_json = wilder._persisted_json
+        self._stored_signature = wilder._stored_signature
+
+
+def _parse_artists(mgmt_json, storage=None):
+    artist_paths = mgmt_json.get(Constants.ARTISTS) or []
+    return [Artist.from_json(a, storage=storage) for a in artist_paths]
+
+
+def get_wilder_sdk(read_only=False, storage=None, use_snapshot=False, max_workers=None):
+    """Loads the MGMT JSON from the configured storage and returns the Wilder object. Album and
+    track data is only read once it is accessed, unless `max_workers` is given, in which case
+    it is all read up front using that many threads. Set `read_only` to True to never write
+    anything, such as when only serving data. Set `use_snapshot` to True to read unchanged data
+    from the snapshot in ~/.wilder/cache; call `wilder.storage.save_snapshot()` after."""
+    storage = storage or get_storage(read_only=read_only)
+    if use_snapshot:
+        storage = SnapshotStorage(storage)
+    stored_signature = storage.get_mgmt_signature()
+    mgmt_json = storage.load_mgmt()
+    wilder = Wilder.from_json(mgmt_json, storage=storage)
+    wilder._stored_signature = stored_signature
+    if max_workers:
+        wilder.preload(max_workers=max_workers)
+    return wilder
+
+
+def save(mgmt_json_dict, storage=None):
+    """Save a MGMT dictionary to the configured storage."""
+    storage = storage or get_storage()
+    mgmt_json_dict[Constants.LAST_UPDATED] = datetime.utcnow().timestamp()
+    storage.save_mgmt(mgmt_json_dict)
 
 
-def _parse_artists(mgmt_json):
-    artist_paths = mgmt_json.get(Constants.ARTISTS) or []
-    return [Artist.from_json(a) for a in artist_paths]
+def _has_unsaved_changes(album):
+    return album.is_dirty or any(t.is_dirty for t in album.loaded_tracks)
 
 
-def get_wilder_sdk():
-    """Parses the mgmt JSON file at the .wilder directory and returns the Mgmt object."""
-    mgmt_json = user.get_mgmt_json()
-    return Wilder.from_json(mgmt_json)
+def _get_loaded_albums(artists):
+    return [album for artist in artists or [] for album in artist.loaded_albums]
 
 
-def save(mgmt_json_dict):
-    """Save a MGMT dictionary to the .wilder/mgmt.json file."""
-    mgmt_json_dict[Constants.LAST_UPDATED] = datetime.utcnow().timestamp()
-    mgmt_path = user.get_mgmt_json_path()
-    save_json_as(mgmt_path, mgmt_json_dict)
+def _without_last_updated(mgmt_json):
+    return {k: v for k, v in mgmt_json.items() if k != Constants.LAST_UPDATED}
 
 
 def _get_albums_from_artists(artists):
@@ -329,3 +635,10 @@ def _get_albums_from_artists(artists):
     if not albums:
         raise NoAlbumsError()
     return albums
+
+
+def _get_queue_entry(track, audio_type):
+    path = track.get_file(audio_type=audio_type)
+    metadata = track.get_audio_metadata(audio_type=audio_type)
+    duration = metadata.duration if metadata else None
+    return QueueEntry(path, duration=duration, item=track)
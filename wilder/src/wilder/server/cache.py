@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from threading import Condition
+
+from wilder.sdk import get_wilder_sdk
+
+# This module keeps one parsed catalog in memory for the life of the server process. The
+# cached SDKs are changed in place, so requests take turns with them using a read-write lock.
+
+
+class _ReadWriteLock:
+    """Lets any number of readers, or else one writer, hold the lock. Waiting writers go
+    before new readers, so a steady stream of readers cannot keep a writer out."""
+
+    def __init__(self):
+        self._condition = Condition()
+        self._readers = 0
+        self._waiting_writers = 0
+        self._is_writing = False
+
+    @contextmanager
+    def reading(self):
+        with self._condition:
+            while self._is_writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._is_writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._is_writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._is_writing = False
+                self._condition.notify_all()
+
+
+_sdk_lock = _ReadWriteLock()
+_cached_sdks = {}
+
+
+@contextmanager
+def use_cached_wilder_sdk(read_only=False):
+    """Use the server's Wilder SDK for the length of the block. The first use parses
+    mgmt.json; later uses only check the files' stats and re-read the ones that changed since
+    they were read. Read-only blocks run at the same time as each other. Other blocks have
+    both SDKs to themselves, since they change the files that the read-only SDK re-reads."""
+    if not read_only:
+        with _sdk_lock.writing():
+            yield _refresh_cached_sdk(read_only)
+        return
+
+    with _sdk_lock.reading():
+        wilder = _cached_sdks.get(read_only)
+        if wilder is not None and not wilder.needs_refresh():
+            yield wilder
+            return
+    # Re-reading changes the SDK in place, so no request may be reading it meanwhile.
+    with _sdk_lock.writing():
+        _refresh_cached_sdk(read_only)
+    with _sdk_lock.reading():
+        yield _cached_sdks[read_only]
+
+
+def _refresh_cached_sdk(read_only):
+    wilder = _cached_sdks.get(read_only)
+    if wilder is None:
+        wilder = get_wilder_sdk(read_only=read_only)
+    else:
+        wilder = wilder.refresh()
+    _cached_sdks[read_only] = wilder
+    return wilder
+
+
+def reset_sdk_cache_after_fork():
+    """Forget the SDKs cached by the parent process. The lock is replaced too, since another
+    thread may have held it when the process forked."""
+    global _sdk_lock
+    _sdk_lock = _ReadWriteLock()
+    _cached_sdks.clear()
@@ -1,3 +1,5 @@
+from functools import wraps
+
 from flask import Flask
 from flask import jsonify
 from flask import request
@@ -5,18 +7,38 @@ from wilder.lib.constants import Constants as Consts
 from wilder.lib.errors import WildError
 from wilder.lib.errors import WildNotFoundError as WildCoreNotFoundError
 from wilder.lib.user import get_mgmt_json
-from wilder.sdk import get_wilder_sdk
 from wilder.server._helper import error_response
 from wilder.server._helper import HttpMethod
 from wilder.server._helper import successful_response
+from wilder.server.cache import use_cached_wilder_sdk
 from wilder.server.error import get_response_error_data
 from wilder.server.error import ShortErrorMessages
 from wilder.server.error import WildServerError
+from wilder.server.wsgi import DEFAULT_THREADS
+from wilder.server.wsgi import DEFAULT_TIMEOUT
+from wilder.server.wsgi import DEFAULT_WORKERS
+from wilder.server.wsgi import serve
 
 
 app = Flask(__name__)
 _ARTIST = f"/{Consts.ARTIST}"
 _ALBUM = f"/{Consts.ALBUM}"
+_TRACK = f"/{Consts.TRACK}"
+
+
+def _uses_wilder_sdk(read_only=False):
+    """Decorates routes to pass them the server's Wilder SDK, which they have the use of
+    until they return."""
+
+    def decorator(route):
+        @wraps(route)
+        def wrapper(*args, **kwargs):
+            with use_cached_wilder_sdk(read_only=read_only) as wilder:
+                return route(wilder, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 
 """**************"""
@@ -75,35 +97,35 @@ def mgmt():
 
 
 @app.route(f"{_ARTIST}/{Consts.LIST}", methods=[HttpMethod.GET])
-def artist_list():
+@_uses_wilder_sdk(read_only=True)
+def artist_list(wilder):
     """Get all artists."""
-    wilder = get_wilder_sdk()
     _artists = wilder.get_artists()
     return {Consts.ARTISTS: [a.to_json() for a in _artists]}
 
 
 @app.route(_ARTIST, methods=[HttpMethod.GET])
-def artist():
+@_uses_wilder_sdk(read_only=True)
+def artist(wilder):
     """Get an artist."""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_query_param(Consts.ARTIST)
     _artist = wilder.get_artist(artist_name)
     return _artist.to_json()
 
 
 @app.route(f"{_ARTIST}/{Consts.FOCUS}", methods=[HttpMethod.POST])
-def artist_focus():
+@_uses_wilder_sdk()
+def artist_focus(wilder):
     """Change the focus artist."""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     wilder.focus_on_artist(artist_name)
     return successful_response()
 
 
 @app.route(f"{_ARTIST}/{Consts.SIGN}", methods=[HttpMethod.POST])
-def artist_sign():
+@_uses_wilder_sdk()
+def artist_sign(wilder):
     """Sign a new artist."""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     bio = _get_request_data_param(Consts.BIO)
     wilder.create_artist(artist_name, bio=bio)
@@ -111,18 +133,18 @@ def artist_sign():
 
 
 @app.route(f"{_ARTIST}/{Consts.UNSIGN}", methods=[HttpMethod.POST])
-def artist_unsign():
+@_uses_wilder_sdk()
+def artist_unsign(wilder):
     """Remove a managed artist."""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     wilder.delete_artist(artist_name)
     return successful_response()
 
 
 @app.route(f"{_ARTIST}/{Consts.UPDATE}", methods=[HttpMethod.POST])
-def artist_update():
+@_uses_wilder_sdk()
+def artist_update(wilder):
     """Update artist information."""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     bio = _get_request_data_param(Consts.BIO)
     wilder.update_artist(name=artist_name, bio=bio)
@@ -130,9 +152,9 @@ def artist_update():
 
 
 @app.route(f"{_ARTIST}/{Consts.RENAME}", methods=[HttpMethod.POST])
-def artist_rename():
+@_uses_wilder_sdk()
+def artist_rename(wilder):
     """Update artist information."""
-    wilder = get_wilder_sdk()
     new_name = _get_request_data_param(Consts.NEW_NAME)
     artist_name = _get_request_data_param(Consts.ARTIST)
     forget_old_name = _get_request_data_param(Consts.FORGET_OLD_NAME)
@@ -146,9 +168,9 @@ def artist_rename():
     f"{_ARTIST}/{Consts.ALIAS}",
     methods=[HttpMethod.POST, HttpMethod.DELETE, HttpMethod.GET],
 )
-def artist_alias():
+@_uses_wilder_sdk()
+def artist_alias(wilder):
     """Add, remove, or retrieve artist aliases."""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     if request.method == HttpMethod.POST:
         new_alias = _get_request_data_param(Consts.ALSO_KNOWN_AS)
@@ -167,18 +189,18 @@ def artist_alias():
 
 
 @app.route(f"{_ALBUM}/{Consts.DISCOGRAPHY}", methods=[HttpMethod.GET])
-def album_discography():
+@_uses_wilder_sdk(read_only=True)
+def album_discography(wilder):
     """Get all albums for artist."""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     albums = wilder.get_discography(artist_name=artist_name)
     return {Consts.DISCOGRAPHY: [a.to_json for a in albums]}
 
 
 @app.route(_ALBUM, methods=[HttpMethod.GET])
-def album():
+@_uses_wilder_sdk(read_only=True)
+def album(wilder):
     """Get an album."""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_query_param(Consts.ARTIST)
     album_name = _get_request_query_param(Consts.ALBUM)
     _album = wilder.get_album(album_name, artist_name=artist_name)
@@ -186,9 +208,9 @@ def album():
 
 
 @app.route(f"{_ALBUM}/{Consts.CREATE_ALBUM}", methods=[HttpMethod.POST])
-def album_create():
+@_uses_wilder_sdk()
+def album_create(wilder):
     """Create a new album."""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     path = _get_request_data_param(Consts.PATH)
     _album = _get_request_data_param(Consts.ALBUM)
@@ -207,9 +229,9 @@ def album_create():
 
 
 @app.route(f"{_ALBUM}/{Consts.UPDATE}", methods=[HttpMethod.POST])
-def album_update():
+@_uses_wilder_sdk()
+def album_update(wilder):
     """Update an album"""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     _album = _get_request_data_param(Consts.ALBUM)
     description = _get_request_data_param(Consts.DESCRIPTION)
@@ -226,8 +248,8 @@ def album_update():
 
 
 @app.route(f"{_ALBUM}/{Consts.CREATE_TRACK}")
-def album_create_track():
-    wilder = get_wilder_sdk()
+@_uses_wilder_sdk()
+def album_create_track(wilder):
     artist_name = _get_request_data_param(Consts.ARTIST)
     _album = _get_request_data_param(Consts.ALBUM)
     track = _get_request_data_param(Consts.TRACK)
@@ -245,9 +267,9 @@ def album_create_track():
 
 
 @app.route(f"{_ALBUM}/{Consts.DELETE}", methods=[HttpMethod.POST])
-def album_delete():
+@_uses_wilder_sdk()
+def album_delete(wilder):
     """Delete an album"""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     _album = _get_request_data_param(Consts.ALBUM)
     wilder.delete_album(_album, artist_name=artist_name)
@@ -255,15 +277,36 @@ def album_delete():
 
 
 @app.route(f"{_ALBUM}/{Consts.LIST_TRACKS}", methods=[HttpMethod.GET])
-def album_list_tracks():
+@_uses_wilder_sdk(read_only=True)
+def album_list_tracks(wilder):
     """List the tracks on an album"""
-    wilder = get_wilder_sdk()
     artist_name = _get_request_data_param(Consts.ARTIST)
     album_name = _get_request_data_param(Consts.ALBUM)
     _album = wilder.get_album(album_name, artist_name)
     return {Consts.ALBUMS: [t.to_json() for t in _album.tracks]}
 
 
+"""********"""
+"""TRACK(S)"""
+"""********"""
+
+
+@app.route(f"{_TRACK}/{Consts.PEAKS}", methods=[HttpMethod.GET])
+@_uses_wilder_sdk(read_only=True)
+def track_peaks(wilder):
+    """Get the waveform peaks of a track from its sidecar. Responds with 404 when the peaks
+    have not been computed, such as using `wild track waveform`."""
+    artist_name = _get_request_query_param(Consts.ARTIST)
+    album_name = _get_request_query_param(Consts.ALBUM)
+    track_name = _get_request_query_param(Consts.TRACK)
+    audio_type = _get_request_query_param(Consts.AUDIO_TYPE)
+    frames_per_peak = request.args.get(Consts.FRAMES_PER_PEAK, type=int)
+    waveform = wilder.get_track_waveform(
+        track_name, album_name, audio_type=audio_type, artist_name=artist_name
+    )
+    return waveform.to_json(frames_per_peak=frames_per_peak)
+
+
 def _get_request_query_param(key):
     return request.args.get(key)
 
@@ -272,5 +315,11 @@ def _get_request_data_param(key):
     return request.json.get(key)
 
 
-def run(host, port):
-    app.run(host=host, port=port)
+def run(
+    host,
+    port,
+    workers=DEFAULT_WORKERS,
+    threads=DEFAULT_THREADS,
+    timeout=DEFAULT_TIMEOUT,
+):
+    serve(app, host, port, workers=workers, threads=threads, timeout=timeout)
@@ -0,0 +1,88 @@
+import importlib.util
+
+# This module serves the Flask app for production use. Gunicorn is used when it is installed,
+# for pre-forked worker processes with request timeouts and graceful reloads. Otherwise,
+# Werkzeug's server is used, which is one process.
+
+DEFAULT_WORKERS = 1
+DEFAULT_THREADS = 4
+DEFAULT_TIMEOUT = 30
+
+
+def is_gunicorn_available():
+    return importlib.util.find_spec("gunicorn") is not None
+
+
+def serve(
+    app,
+    host,
+    port,
+    workers=DEFAULT_WORKERS,
+    threads=DEFAULT_THREADS,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """Serve the app until stopped. With Gunicorn, sending the main process a SIGHUP reloads
+    the workers gracefully, finishing the requests in progress first."""
+    if is_gunicorn_available():
+        options = get_gunicorn_options(host, port, workers, threads, timeout)
+        _create_gunicorn_application(app, options).run()
+    else:
+        _serve_with_werkzeug(app, host, port, threads, timeout)
+
+
+def get_gunicorn_options(host, port, workers, threads, timeout):
+    return {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "threads": threads,
+        # Each threaded worker handles requests on a pool of threads, so one slow request
+        # does not block the others.
+        "worker_class": "gthread" if threads > 1 else "sync",
+        "timeout": timeout,
+        "graceful_timeout": timeout,
+        # The app is imported once, before forking, so workers start quickly.
+        "preload_app": True,
+        "post_fork": _on_worker_forked,
+    }
+
+
+def _on_worker_forked(server, worker):
+    # Workers must not share the SDKs cached by the main process.
+    from wilder.server.cache import reset_sdk_cache_after_fork
+
+    reset_sdk_cache_after_fork()
+
+
+def _create_gunicorn_application(app, options):
+    from gunicorn.app.base import BaseApplication
+
+    class WilderApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    return WilderApplication()
+
+
+def _serve_with_werkzeug(app, host, port, threads, timeout):
+    from werkzeug.serving import run_simple
+    from werkzeug.serving import WSGIRequestHandler
+
+    class TimeoutRequestHandler(WSGIRequestHandler):
+        pass
+
+    # Werkzeug cannot stop a request that takes too long. It can only close connections
+    # that stop sending, so slow clients cannot hold the server.
+    TimeoutRequestHandler.timeout = timeout
+    # Werkzeug cannot limit its threads, so unless only one is asked for, each request gets
+    # a thread of its own, as with `app.run()`.
+    run_simple(
+        host,
+        port,
+        app,
+        threaded=threads > 1,
+        request_handler=TimeoutRequestHandler,
+    )
@@ -3,9 +3,65 @@ import os
 
 import pytest
 from wilder import parse_mgmt
+from wilder.lib.util.iostats import record_io
+from wilder.lib.util.sh import is_recently_modified
+from wilder.lib.util.sh import MODIFIED_TIME_RESOLUTION_NS
+from wilder.sdk import get_wilder_sdk
 
 HERE = os.path.dirname(os.path.abspath(__file__))
 
+TEST_ARTIST = "Wilder"
+TEST_ALBUM = "Wild 1 - No Es"
+TEST_TRACKS = ["Grantsong + NoBlame", "WUTD (Witch Routine)"]
+
+
+@pytest.fixture()
+def wild_home(tmp_path, monkeypatch):
+    """A home directory of its own for the test, where Wilder keeps its data."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture()
+def settle_files(wild_home):
+    """Returns a function that moves the files changed in the last few seconds back in time,
+    so they are no longer treated as changed on every check."""
+
+    def settle():
+        for dir_path, dir_names, file_names in os.walk(wild_home):
+            for name in dir_names + file_names:
+                path = os.path.join(dir_path, name)
+                modified_time = os.stat(path).st_mtime_ns
+                if is_recently_modified(modified_time):
+                    modified_time -= 2 * MODIFIED_TIME_RESOLUTION_NS
+                    os.utime(path, ns=(modified_time, modified_time))
+
+    return settle
+
+
+@pytest.fixture()
+def create_catalog(wild_home, settle_files):
+    """Returns a function that creates the test artist, with the test album and its tracks
+    under ~/music, in the given storage or else the configured one."""
+
+    def create(storage=None):
+        wilder = get_wilder_sdk(storage=storage)
+        wilder.create_artist(TEST_ARTIST)
+        wilder.create_album(str(wild_home / "music"), album_name=TEST_ALBUM)
+        for track_name in TEST_TRACKS:
+            wilder.create_track(track_name, TEST_ALBUM)
+        settle_files()
+        return wilder
+
+    return create
+
+
+@pytest.fixture()
+def catalog(wild_home, create_catalog):
+    """The test artist, album and tracks in the configured storage."""
+    create_catalog()
+    return wild_home
+
 
 @pytest.fixture()
 def test_mgmt_json_path():
@@ -26,3 +82,10 @@ def test_wav_file_path():
 @pytest.fixture()
 def parsed_test_mgmt(test_mgmt_json):
     return parse_mgmt(test_mgmt_json)
+
+
+@pytest.fixture()
+def io_stats():
+    """Counts the file operations made during the test, for asserting I/O budgets."""
+    with record_io() as stats:
+        yield stats
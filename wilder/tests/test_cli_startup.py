@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["flask", "PyInquirer", "requests", "sqlite3", "vlc"]
+
+# The most `import wilder.cli.main` may take, in microseconds.
+IMPORT_TIME_BUDGET = 500000
+
+_PRINT_HEAVY_MODULES_AT_EXIT = f"""
+import atexit
+import sys
+atexit.register(lambda: print([m for m in {HEAVY_MODULES} if m in sys.modules]))
+"""
+
+
+def _run_python(code, wild_home, *args):
+    env = dict(os.environ, HOME=str(wild_home))
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+
+def test_import_cli_does_not_import_heavy_dependencies(wild_home):
+    code = f"{_PRINT_HEAVY_MODULES_AT_EXIT}\nimport wilder.cli.main"
+    result = _run_python(code, wild_home)
+    assert result.stdout.strip() == "[]"
+
+
+def test_artist_list_does_not_import_heavy_dependencies(wild_home):
+    code = (
+        f"{_PRINT_HEAVY_MODULES_AT_EXIT}\n"
+        "from wilder.cli.main import cli\n"
+        "cli(['artist', 'list'], standalone_mode=False)"
+    )
+    result = _run_python(code, wild_home)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_import_cli_is_within_time_budget(wild_home):
+    result = _run_python("import wilder.cli.main", wild_home, "-X", "importtime")
+    cumulative_times = [
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.rstrip().endswith("| wilder.cli.main")
+    ]
+    assert cumulative_times and cumulative_times[0] < IMPORT_TIME_BUDGET
@@ -0,0 +1,50 @@
+import os
+import shutil
+
+import pytest
+from click.testing import CliRunner
+from wilder.cli import argv
+from wilder.cli.main import cli
+from wilder.sdk import get_wilder_sdk
+
+from tests.conftest import TEST_ALBUM
+from tests.conftest import TEST_ARTIST
+from tests.conftest import TEST_TRACKS
+
+
+@pytest.fixture(autouse=True)
+def fail_to_prompt(monkeypatch):
+    def fail(*args, **kwargs):
+        pytest.fail("Prompted for an artist.")
+
+    monkeypatch.setattr(argv, "get_user_selected_resource", fail)
+
+
+def test_track_list_when_all_does_not_prompt_for_artist(catalog):
+    get_wilder_sdk().create_artist("Yingthi")
+    result = CliRunner().invoke(cli, ["track", "list", "--all"])
+    assert result.exit_code == 0, result.output
+    assert TEST_TRACKS[0] in result.output
+
+
+def test_album_scan_when_all_does_not_prompt_for_artist(catalog):
+    get_wilder_sdk().create_artist("Yingthi")
+    result = CliRunner().invoke(cli, ["album", "scan", "--all"])
+    assert result.exit_code == 0, result.output
+
+
+def test_track_waveform_saves_peaks_sidecar(catalog, test_wav_file_path):
+    track = get_wilder_sdk().get_track(TEST_TRACKS[0], TEST_ALBUM)
+    shutil.copy(test_wav_file_path, track.wav_path)
+    args = [
+        "track",
+        "waveform",
+        TEST_TRACKS[0],
+        "--artist",
+        TEST_ARTIST,
+        "--album",
+        TEST_ALBUM,
+    ]
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert os.path.isfile(f"{track.wav_path}.peaks")
@@ -0,0 +1,94 @@
+import fcntl
+import socket
+import threading
+
+import pytest
+from wilder.cli.player import format_player_status
+from wilder.lib.daemon import PlayerClient
+from wilder.lib.daemon import PlayerDaemon
+from wilder.lib.errors import PlayerDaemonError
+from wilder.lib.errors import PlayerNotRunningError
+
+
+@pytest.fixture()
+def socket_path(tmp_path):
+    return str(tmp_path / "player.sock")
+
+
+@pytest.fixture()
+def player_daemon(socket_path):
+    player_daemon = PlayerDaemon(socket_path=socket_path)
+    thread = threading.Thread(target=player_daemon.serve)
+    thread.start()
+    client = PlayerClient(socket_path)
+    assert client.wait_until_running()
+    yield player_daemon
+    client.shutdown()
+    thread.join()
+
+
+def test_get_status_when_not_running_returns_stopped(socket_path):
+    client = PlayerClient(socket_path)
+    assert not client.is_running()
+    assert client.get_status() == {"state": "stopped"}
+
+
+def test_pause_when_not_running_raises_not_running_error(socket_path):
+    with pytest.raises(PlayerNotRunningError):
+        PlayerClient(socket_path).pause()
+
+
+def test_send_status_when_nothing_playing_returns_stopped(player_daemon, socket_path):
+    assert PlayerClient(socket_path).send("status") == {"state": "stopped"}
+
+
+def test_send_when_nothing_playing_returns_error_from_daemon(
+    player_daemon, socket_path
+):
+    with pytest.raises(PlayerDaemonError) as err:
+        PlayerClient(socket_path).next()
+    assert "Nothing is playing in the background." in str(err.value)
+
+
+def test_send_when_command_unknown_raises_daemon_error(player_daemon, socket_path):
+    with pytest.raises(PlayerDaemonError) as err:
+        PlayerClient(socket_path).send("rewind")
+    assert "Unknown command 'rewind'." in str(err.value)
+
+
+def test_serve_when_another_daemon_is_running_returns(player_daemon, socket_path):
+    PlayerDaemon(socket_path=socket_path).serve()
+    assert PlayerClient(socket_path).is_running()
+
+
+def test_serve_when_another_daemon_is_starting_keeps_its_socket(socket_path, tmp_path):
+    # The other daemon holds the lock and has bound the socket, but does not answer yet.
+    with open(f"{socket_path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as other_socket:
+            other_socket.bind(socket_path)
+            PlayerDaemon(socket_path=socket_path).serve()
+            assert (tmp_path / "player.sock").exists()
+
+
+def test_shutdown_stops_daemon_and_removes_socket(socket_path, tmp_path):
+    player_daemon = PlayerDaemon(socket_path=socket_path)
+    thread = threading.Thread(target=player_daemon.serve)
+    thread.start()
+    client = PlayerClient(socket_path)
+    assert client.wait_until_running()
+    client.shutdown()
+    thread.join()
+    assert not (tmp_path / "player.sock").exists()
+
+
+def test_format_player_status_when_playing_shows_track_and_time_remaining():
+    status = {
+        "state": "playing",
+        "index": 1,
+        "count": 3,
+        "item": {"name": "Second", "album": "Wild", "artist": "Wilder"},
+        "remaining": 65.2,
+    }
+    expected = "Playing 'Second' by 'Wilder' (2 of 3), 0:01:05 remaining."
+    assert format_player_status(status) == expected
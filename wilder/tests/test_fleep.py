@@ -1,7 +1,11 @@
+import os
+import shutil
+import struct
+
 import pytest
-import wilder.fleep as fleep
-from wilder.errors import InvalidAudioFileError
-from wilder.errors import WildNotFoundError
+import wilder.lib.fleep as fleep
+from wilder.lib.errors import InvalidAudioFileError
+from wilder.lib.errors import WildNotFoundError
 
 
 def test_get_audio_file_info_when_wav_file_returns_info(test_wav_file_path):
@@ -23,3 +27,193 @@ def test_get_audio_file_info_when_text_file_raises_error(test_mgmt_json_path):
 def test_get_audio_file_info_when_file_does_not_exist_raises_error(test_mgmt_json_path):
     with pytest.raises(WildNotFoundError):
         fleep.get_audio_file_info("no")
+
+
+@pytest.mark.parametrize(
+    "header,extension",
+    [
+        (b"ID3\x03\x00", "mp3"),
+        (b"fLaC\x00\x00\x00\x22", "flac"),
+        (b"\x00\x00\x00\x20ftypM4A ", "m4a"),
+        (b"\x0b\x77", "ac3"),
+    ],
+)
+def test_get_audio_file_info_when_header_matches_returns_extension(
+    tmp_path, header, extension
+):
+    audio_path = tmp_path / "audio"
+    audio_path.write_bytes(header + bytes(64))
+    info = fleep.get_audio_file_info(str(audio_path))
+    assert info.extension == [extension]
+
+
+def test_get_audio_file_info_when_file_shorter_than_signature_raises_error(tmp_path):
+    audio_path = tmp_path / "audio"
+    audio_path.write_bytes(b"fLa")
+    with pytest.raises(InvalidAudioFileError):
+        fleep.get_audio_file_info(str(audio_path))
+
+
+@pytest.fixture()
+def audio_files(tmp_path, test_wav_file_path, test_mgmt_json_path):
+    wav_path = str(tmp_path / "test.wav")
+    shutil.copy(test_wav_file_path, wav_path)
+    text_path = str(tmp_path / "mgmt.json")
+    shutil.copy(test_mgmt_json_path, text_path)
+    return wav_path, text_path
+
+
+def test_identify_many_returns_info_of_each_existing_file(tmp_path, audio_files):
+    wav_path, text_path = audio_files
+    missing_path = str(tmp_path / "missing.mp3")
+    cache = fleep.AudioInfoCache()
+    infos = fleep.identify_many([wav_path, text_path, missing_path], cache=cache)
+    assert infos[wav_path].extension == ["wav"]
+    assert infos[text_path] is None
+    assert missing_path not in infos
+
+
+def test_identify_many_when_files_unchanged_does_not_read_them_again(
+    tmp_path, audio_files, mocker
+):
+    cache_path = str(tmp_path / "audio-info.json")
+    cache = fleep.AudioInfoCache(cache_path)
+    fleep.identify_many(audio_files, cache=cache)
+    assert cache.save()
+    identify_spy = mocker.spy(fleep, "get_audio_file_info")
+    infos = fleep.identify_many(audio_files, cache=fleep.AudioInfoCache(cache_path))
+    assert not identify_spy.call_count
+    assert infos[audio_files[0]].mime == ["audio/wav"]
+    assert infos[audio_files[1]] is None
+
+
+def test_identify_many_when_file_changed_reads_it_again(audio_files, mocker):
+    cache = fleep.AudioInfoCache()
+    fleep.identify_many(audio_files, cache=cache)
+    with open(audio_files[1], "a") as text_file:
+        text_file.write("\n")
+    identify_spy = mocker.spy(fleep, "get_audio_file_info")
+    fleep.identify_many(audio_files, cache=cache)
+    assert identify_spy.call_count == 1
+
+
+def test_identify_many_drops_cached_files_not_seen_again(tmp_path, audio_files):
+    cache_path = str(tmp_path / "audio-info.json")
+    fleep.identify_many(audio_files, cache=fleep.AudioInfoCache(cache_path))
+    cache = fleep.AudioInfoCache(cache_path)
+    fleep.identify_many(audio_files[:1], cache=cache)
+    assert cache.save()
+    assert list(fleep.AudioInfoCache(cache_path).entries) == [audio_files[0]]
+
+
+def test_audio_info_cache_save_when_replace_fails_keeps_old_file(
+    tmp_path, audio_files, monkeypatch
+):
+    cache_path = str(tmp_path / "audio-info.json")
+    cache = fleep.AudioInfoCache(cache_path)
+    fleep.identify_many(audio_files, cache=cache)
+    cache.save()
+    cache = fleep.AudioInfoCache(cache_path)
+    fleep.identify_many(audio_files[:1], cache=cache)
+
+    def fail_to_replace(*args, **kwargs):
+        raise OSError()
+
+    monkeypatch.setattr(os, "replace", fail_to_replace)
+    assert not cache.save()
+    monkeypatch.undo()
+    assert len(fleep.AudioInfoCache(cache_path).entries) == 2
+    assert not [n for n in os.listdir(str(tmp_path)) if n.endswith(".tmp")]
+
+
+def _write_bytes(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def _create_flac_bytes(sample_rate, channels, bits_per_sample, total_samples):
+    packed = (
+        sample_rate << 44
+        | (channels - 1) << 41
+        | (bits_per_sample - 1) << 36
+        | total_samples
+    )
+    stream_info = bytes(10) + struct.pack(">Q", packed) + bytes(16)
+    return b"fLaC" + b"\x80\x00\x00\x22" + stream_info + bytes(64)
+
+
+# An MPEG 1 Layer III frame header for 128 kbps, 44100 Hz stereo.
+_MP3_FRAME_HEADER = b"\xff\xfb\x90\x00"
+
+
+def test_get_audio_metadata_when_wav_file_returns_duration_and_format(
+    test_wav_file_path,
+):
+    metadata = fleep.get_audio_metadata(test_wav_file_path)
+    assert metadata.extension == "wav"
+    assert metadata.duration == 0.1
+    assert metadata.sample_rate == 8000
+    assert metadata.channels == 1
+    assert metadata.bits_per_sample == 16
+    assert metadata.bitrate == 128000
+
+
+def test_get_audio_metadata_when_flac_file_returns_stream_info(tmp_path):
+    flac_path = _write_bytes(
+        tmp_path, "test.flac", _create_flac_bytes(48000, 2, 24, 48000 * 90)
+    )
+    metadata = fleep.get_audio_metadata(flac_path)
+    assert metadata.extension == "flac"
+    assert metadata.duration == 90
+    assert metadata.sample_rate == 48000
+    assert metadata.channels == 2
+    assert metadata.bits_per_sample == 24
+
+
+def test_get_audio_metadata_when_cbr_mp3_file_returns_duration_from_bitrate(tmp_path):
+    id3_tag = b"ID3\x03\x00\x00\x00\x00\x00\x14" + bytes(20)
+    mp3_path = _write_bytes(
+        tmp_path, "test.mp3", id3_tag + _MP3_FRAME_HEADER + bytes(15996)
+    )
+    metadata = fleep.get_audio_metadata(mp3_path)
+    assert metadata.extension == "mp3"
+    assert metadata.duration == 1
+    assert metadata.sample_rate == 44100
+    assert metadata.channels == 2
+    assert metadata.bitrate == 128000
+
+
+def test_get_audio_metadata_when_vbr_mp3_file_returns_duration_from_xing_frames(
+    tmp_path,
+):
+    xing = b"Xing" + struct.pack(">II", 1, 441)
+    frame = _MP3_FRAME_HEADER + bytes(32) + xing
+    mp3_path = _write_bytes(tmp_path, "test.mp3", frame + bytes(1000))
+    metadata = fleep.get_audio_metadata(mp3_path)
+    assert metadata.duration == 441 * 1152 / 44100
+
+
+def test_get_audio_metadata_when_not_audio_raises_error(test_mgmt_json_path):
+    with pytest.raises(InvalidAudioFileError):
+        fleep.get_audio_metadata(test_mgmt_json_path)
+
+
+def test_get_audio_metadata_when_other_audio_type_raises_error(tmp_path):
+    # An AC-3 file whose data happens to contain an MPEG frame sync.
+    ac3_path = _write_bytes(tmp_path, "test.ac3", b"\x0b\x77" + _MP3_FRAME_HEADER * 64)
+    with pytest.raises(InvalidAudioFileError):
+        fleep.get_audio_metadata(ac3_path)
+
+
+def test_get_audio_metadata_when_header_cut_short_raises_error(tmp_path):
+    mp3_path = _write_bytes(
+        tmp_path, "test.mp3", _MP3_FRAME_HEADER + bytes(32) + b"Xing"
+    )
+    with pytest.raises(InvalidAudioFileError):
+        fleep.get_audio_metadata(mp3_path)
+
+
+def test_get_audio_metadata_when_file_empty_raises_error(tmp_path):
+    with pytest.raises(InvalidAudioFileError):
+        fleep.get_audio_metadata(_write_bytes(tmp_path, "empty.wav", b""))
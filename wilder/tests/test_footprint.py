@@ -0,0 +1,55 @@
+import gc
+import tracemalloc
+
+import pytest
+from wilder.sdk import get_wilder_sdk
+
+TEST_ALBUM = "Wild 1 - No Es"
+TRACK_COUNT = 200
+
+# The most memory a loaded track may take, including its metadata.
+BYTES_PER_TRACK_BUDGET = 1024
+
+
+@pytest.fixture()
+def large_album(wild_home):
+    wilder = get_wilder_sdk()
+    wilder.create_artist("Wilder")
+    wilder.create_album(str(wild_home / "music"), TEST_ALBUM, use_manifest=True)
+    with wilder.batch():
+        for track_number in range(TRACK_COUNT):
+            wilder.create_track(
+                f"Track {track_number}",
+                TEST_ALBUM,
+                description=f"The story of track {track_number}.",
+                collaborators=["Yingthi"],
+            )
+
+
+def _measure_bytes_per_track():
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        wilder = get_wilder_sdk()
+        tracks = wilder.get_album(TEST_ALBUM).tracks
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    assert len(tracks) == TRACK_COUNT
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return allocated / TRACK_COUNT
+
+
+def test_loaded_tracks_are_within_memory_budget(large_album):
+    bytes_per_track = _measure_bytes_per_track()
+    assert (
+        bytes_per_track < BYTES_PER_TRACK_BUDGET
+    ), f"Loaded tracks take {bytes_per_track:.0f} bytes each."
+
+
+def test_loaded_tracks_share_artist_and_album_names(large_album):
+    tracks = get_wilder_sdk().get_album(TEST_ALBUM).tracks
+    assert all(t.artist is tracks[0].artist for t in tracks)
+    assert all(t.album is tracks[0].album for t in tracks)
@@ -0,0 +1,83 @@
+import os
+import re
+
+import pytest
+from click.testing import CliRunner
+from wilder.cli.main import cli
+from wilder.lib.util.iostats import IOStats
+from wilder.lib.util.iostats import OUTSIDE_SDK
+from wilder.lib.util.iostats import record_io
+from wilder.lib.util.sh import load_json_from_file
+from wilder.lib.util.sh import save_json_as
+from wilder.sdk import get_wilder_sdk
+
+from tests.conftest import TEST_ALBUM
+from tests.conftest import TEST_TRACKS
+
+
+def test_record_io_counts_calls_and_bytes_including_nested_operations(tmp_path):
+    json_path = str(tmp_path / "test.json")
+    with record_io() as stats:
+        save_json_as(json_path, {"name": "Wilder"})
+        load_json_from_file(json_path)
+    size = os.path.getsize(json_path)
+    assert stats.count("save_json_as") == 1
+    assert stats.count("wopen") == 2
+    assert stats.bytes("save_json_as") == size
+    assert stats.bytes("save_as") == size
+    assert stats.bytes("load_json_from_file") == size
+    assert stats.count("wopen", caller=OUTSIDE_SDK) == 2
+
+
+def test_record_io_when_not_recording_does_not_count(tmp_path):
+    stats = IOStats()
+    save_json_as(str(tmp_path / "test.json"), {})
+    with record_io(stats):
+        pass
+    save_json_as(str(tmp_path / "test.json"), {})
+    assert not stats.operations
+
+
+def test_get_wilder_sdk_opens_only_mgmt_json(catalog, io_stats):
+    get_wilder_sdk()
+    assert io_stats.count("wopen") == 1
+    assert io_stats.count("wopen", caller="get_wilder_sdk") == 1
+
+
+def test_get_album_when_read_opens_at_most_two_files(catalog, io_stats):
+    wilder = get_wilder_sdk()
+    io_stats.clear()
+    assert wilder.get_album(TEST_ALBUM).description is None
+    assert io_stats.count("wopen") <= 2
+
+
+def test_get_tracks_opens_one_file_per_track(catalog, io_stats):
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    album.description
+    io_stats.clear()
+    assert [t.track_number for t in album.get_tracks()] == [1, 2]
+    assert io_stats.count("wopen") == len(TEST_TRACKS)
+
+
+def test_create_track_writes_album_json_and_track_json_once(catalog, io_stats):
+    wilder = get_wilder_sdk()
+    wilder.get_album(TEST_ALBUM).get_tracks()
+    io_stats.clear()
+    wilder.create_track("Yingthi", TEST_ALBUM)
+    assert io_stats.count("save_json_as") == 2
+    assert io_stats.count("save_json_as", caller="Wilder.create_track") == 2
+
+
+def test_update_album_when_nothing_changes_does_not_touch_files(catalog, io_stats):
+    wilder = get_wilder_sdk()
+    wilder.get_album(TEST_ALBUM).description
+    io_stats.clear()
+    wilder.update_album(TEST_ALBUM)
+    assert not io_stats.operations
+
+
+def test_dev_io_stats_shows_operations_of_command_per_caller(catalog):
+    result = CliRunner().invoke(cli, ["dev", "io-stats", "album", "list"])
+    assert result.exit_code == 0
+    assert TEST_ALBUM in result.output
+    assert re.search(r"get_wilder_sdk +load_json_from_file +\d+ ", result.output)
@@ -0,0 +1,157 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+import vlc
+from wilder.cli.player import AlbumPlayerDisplay
+from wilder.lib.mgmt.album import Album
+from wilder.lib.mgmt.track import Track
+from wilder.lib.player import QueuePlayer
+from wilder.lib.playqueue import PlayQueue
+from wilder.lib.playqueue import QueueEntry
+
+_TIME_CHANGED = vlc.EventType.MediaPlayerTimeChanged
+_END_REACHED = vlc.EventType.MediaPlayerEndReached
+
+
+class FakeVLCPlayer:
+    """Stands in for the VLC instance and its media player, and sends their events."""
+
+    def __init__(self):
+        self.state = vlc.State.NothingSpecial
+        self.played = []
+        self.on_play = lambda: None
+        self._media = None
+        self._callbacks = {}
+
+    def media_player_new(self):
+        return self
+
+    def media_new(self, path):
+        return SimpleNamespace(path=path, parse_with_options=lambda *args: None)
+
+    def event_manager(self):
+        return self
+
+    def event_attach(self, event_type, callback):
+        self._callbacks[event_type] = callback
+
+    def event_detach(self, event_type):
+        self._callbacks.pop(event_type, None)
+
+    def set_media(self, media):
+        self._media = media
+
+    def play(self):
+        self.state = vlc.State.Playing
+        self.played.append(self._media.path)
+        self.on_play()
+        return 0
+
+    def stop(self):
+        self.state = vlc.State.Stopped
+
+    def get_state(self):
+        return self.state
+
+    def send(self, event_type, new_time=0):
+        self._callbacks[event_type](
+            SimpleNamespace(u=SimpleNamespace(new_time=new_time))
+        )
+
+    def end(self):
+        self.state = vlc.State.Ended
+        self.send(_END_REACHED)
+
+
+@pytest.fixture()
+def vlc_player():
+    return FakeVLCPlayer()
+
+
+@pytest.fixture()
+def queue_player(vlc_player):
+    entries = [QueueEntry(f"/albums/Wild/{n}.wav", duration=60) for n in "ABC"]
+    return QueuePlayer(PlayQueue(entries), instance=vlc_player)
+
+
+@pytest.fixture()
+def album():
+    tracks = [
+        Track(f"/albums/Wild/{name}", name, number, "Wilder", "Wild")
+        for number, name in enumerate(("First", "Second", "Third"), start=1)
+    ]
+    return Album("/albums/Wild", "Wild", "Wilder", tracks=tracks)
+
+
+def test_update_when_first_called_draws_layout_with_countdown(album):
+    stream = io.StringIO()
+    display = AlbumPlayerDisplay(album, album.tracks, stream=stream)
+    display.update(1, 65)
+    output = stream.getvalue()
+    assert output.startswith("'Wild' by 'Wilder'\n\n 1. First\n>2. Second")
+    assert " 3. Third\n" in output
+    assert "0:01:05" in output
+
+
+def test_update_when_same_track_only_redraws_its_line(album):
+    stream = io.StringIO()
+    display = AlbumPlayerDisplay(album, album.tracks, stream=stream)
+    display.update(0, 65)
+    stream.seek(0)
+    stream.truncate()
+    display.update(0, 64)
+    assert stream.getvalue() == "\033[3A\r\033[K>1. First         0:01:04\033[3B\r"
+
+
+def test_update_when_track_changes_redraws_previous_and_current_lines(album):
+    stream = io.StringIO()
+    display = AlbumPlayerDisplay(album, album.tracks, stream=stream)
+    display.update(0, 1)
+    stream.seek(0)
+    stream.truncate()
+    display.update(1, 120)
+    output = stream.getvalue()
+    assert "\033[3A\r\033[K 1. First\033[3B\r" in output
+    assert "\033[2A\r\033[K>2. Second         0:02:00\033[2B\r" in output
+    assert output.count("\n") == 0
+
+
+def test_update_does_no_file_io(album, io_stats):
+    display = AlbumPlayerDisplay(album, album.tracks, stream=io.StringIO())
+    for index in range(len(album.tracks)):
+        for time_remaining in range(100, 0, -1):
+            display.update(index, time_remaining)
+    assert not io_stats.to_records()
+
+
+def test_queue_player_when_entries_end_plays_each_in_order(queue_player, vlc_player):
+    vlc_player.on_play = lambda: vlc_player.send(_TIME_CHANGED, 1000)
+    playing = queue_player.play()
+    for name in "ABC":
+        entry, remaining = next(playing)
+        assert entry.path == f"/albums/Wild/{name}.wav"
+        assert remaining == 59
+        vlc_player.end()
+    with pytest.raises(StopIteration):
+        next(playing)
+    assert vlc_player.played == [f"/albums/Wild/{n}.wav" for n in "ABC"]
+
+
+def test_queue_player_when_end_event_comes_late_does_not_skip_next_entry(
+    queue_player, vlc_player
+):
+    def send_late_end():
+        if len(vlc_player.played) > 1:
+            vlc_player.send(_END_REACHED)
+        vlc_player.send(_TIME_CHANGED, 1000)
+
+    vlc_player.on_play = send_late_end
+    playing = queue_player.play()
+    next(playing)
+    vlc_player.end()
+    vlc_player.send(_END_REACHED)
+    entry, _ = next(playing)
+    assert entry.path == "/albums/Wild/B.wav"
+    playing.close()
+    assert vlc_player.played == ["/albums/Wild/A.wav", "/albums/Wild/B.wav"]
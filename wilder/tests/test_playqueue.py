@@ -0,0 +1,45 @@
+from wilder.lib.playqueue import PlayQueue
+from wilder.lib.playqueue import QueueEntry
+
+
+def _create_queue(start_index=0, loop=False):
+    entries = [QueueEntry(f"/tracks/{n}.wav", duration=n) for n in range(1, 4)]
+    return PlayQueue(entries, start_index=start_index, loop=loop)
+
+
+def test_advance_when_not_at_end_moves_to_next_entry():
+    play_queue = _create_queue()
+    assert play_queue.advance()
+    assert play_queue.current.path == "/tracks/2.wav"
+
+
+def test_advance_when_at_end_and_not_looping_ends_queue():
+    play_queue = _create_queue(start_index=2)
+    assert play_queue.peek_next() is None
+    assert not play_queue.advance()
+    assert play_queue.current is None
+
+
+def test_advance_when_at_end_and_looping_starts_over():
+    play_queue = _create_queue(start_index=2, loop=True)
+    assert play_queue.peek_next().path == "/tracks/1.wav"
+    assert play_queue.advance()
+    assert play_queue.current.path == "/tracks/1.wav"
+
+
+def test_skip_when_negative_and_not_looping_stops_at_first_entry():
+    play_queue = _create_queue(start_index=1)
+    assert play_queue.skip(-5)
+    assert play_queue.index == 0
+
+
+def test_skip_when_past_end_and_looping_wraps_around():
+    play_queue = _create_queue(start_index=1, loop=True)
+    assert play_queue.skip(4)
+    assert play_queue.index == 2
+
+
+def test_current_when_no_entries_returns_none():
+    play_queue = PlayQueue([])
+    assert play_queue.current is None
+    assert not play_queue.advance()
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+from click.testing import CliRunner
+from wilder.cli.main import cli
+from wilder.sdk import get_wilder_sdk
+
+
+@pytest.fixture(autouse=True)
+def artist(wild_home):
+    get_wilder_sdk().create_artist("Wilder")
+
+
+def _get_profile_paths(wild_home):
+    log_path = wild_home / ".wilder" / "log"
+    if not log_path.exists():
+        return []
+    return [p for p in os.listdir(str(log_path)) if p.endswith(".pstats")]
+
+
+def test_profile_when_given_to_main_group_saves_profile_and_shows_hotspots(wild_home):
+    result = CliRunner().invoke(
+        cli, ["--profile", "--profile-top", "3", "artist", "list"]
+    )
+    assert result.exit_code == 0
+    assert "Wilder" in result.output
+    assert "Ordered by: cumulative time" in result.output
+    assert "due to restriction <3>" in result.output
+    assert len(_get_profile_paths(wild_home)) == 1
+
+
+def test_profile_when_given_to_subcommand_saves_profile(wild_home):
+    result = CliRunner().invoke(cli, ["artist", "list", "--profile"])
+    assert result.exit_code == 0
+    assert len(_get_profile_paths(wild_home)) == 1
+
+
+def test_profile_memory_shows_peak_memory_without_saving_profile(wild_home):
+    result = CliRunner().invoke(cli, ["artist", "list", "--profile-memory"])
+    assert result.exit_code == 0
+    assert "at peak" in result.output
+    assert not _get_profile_paths(wild_home)
+
+
+def test_artist_list_when_not_profiling_does_not_show_hotspots(wild_home):
+    result = CliRunner().invoke(cli, ["artist", "list"])
+    assert "Ordered by" not in result.output
+    assert not _get_profile_paths(wild_home)
@@ -0,0 +1,453 @@
+import os
+import shutil
+import threading
+
+import pytest
+from wilder.lib.constants import Constants
+from wilder.lib.errors import AlbumNotFoundError
+from wilder.lib.errors import ArtistNotFoundError
+from wilder.lib.errors import AudioTypeNotFoundError
+from wilder.lib.errors import NoAudioFoundError
+from wilder.lib.errors import ReadOnlyWilderError
+from wilder.lib.errors import TrackNotFoundError
+from wilder.lib.errors import UnsupportedAudioTypeError
+from wilder.lib.errors import WaveformNotFoundError
+from wilder.lib.mgmt.album import Album
+from wilder.lib.mgmt.track import Track
+from wilder.lib.storage.jsonfiles import JsonStorage
+from wilder.sdk import get_wilder_sdk
+
+from tests.conftest import TEST_ALBUM
+from tests.conftest import TEST_ARTIST
+from tests.conftest import TEST_TRACKS
+
+
+@pytest.fixture()
+def spy_loads(monkeypatch):
+    loads = []
+
+    def spy(func_name):
+        original = getattr(JsonStorage, func_name)
+
+        def wrapped(self, *args, **kwargs):
+            loads.append(args[0])
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(JsonStorage, func_name, wrapped)
+
+    spy("load_album")
+    spy("load_track")
+    return loads
+
+
+def test_get_wilder_sdk_does_not_read_album_dirs(catalog, spy_loads):
+    get_wilder_sdk()
+    assert not spy_loads
+
+
+def test_get_wilder_sdk_get_mgmt_does_not_read_album_dirs(catalog, spy_loads):
+    get_wilder_sdk().get_mgmt()
+    assert not spy_loads
+
+
+def test_get_album_reads_album_dir_when_accessed(catalog, spy_loads):
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    assert not spy_loads
+    assert album.description is None
+    assert spy_loads == [os.path.join(str(catalog), "music", TEST_ALBUM)]
+
+
+def test_get_track_reads_only_that_track(catalog, spy_loads):
+    track = get_wilder_sdk().get_track(TEST_TRACKS[1], TEST_ALBUM)
+    assert track.track_number == 2
+    track_paths = spy_loads[1:]
+    assert track_paths == [track.path]
+
+
+def test_get_tracks_returns_tracks_sorted_by_track_number(catalog):
+    tracks = get_wilder_sdk().get_album(TEST_ALBUM).get_tracks()
+    assert [t.name for t in tracks] == TEST_TRACKS
+    assert [t.track_number for t in tracks] == [1, 2]
+
+
+def test_get_wilder_sdk_when_album_json_up_to_date_does_not_rewrite_it(catalog):
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    modified_time = os.stat(album.dir_json_path).st_mtime_ns
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    album.get_tracks()
+    assert os.stat(album.dir_json_path).st_mtime_ns == modified_time
+
+
+def test_get_wilder_sdk_when_read_only_does_not_create_missing_album_dir(catalog):
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    shutil.rmtree(album.path)
+    album = get_wilder_sdk(read_only=True).get_album(TEST_ALBUM)
+    assert album.tracks == []
+    assert not os.path.exists(album.path)
+
+
+def test_get_wilder_sdk_when_read_only_raises_on_changes(catalog):
+    wilder = get_wilder_sdk(read_only=True)
+    with pytest.raises(ReadOnlyWilderError):
+        wilder.create_artist("Yingthi")
+    assert not get_wilder_sdk().is_represented("Yingthi")
+
+
+def test_update_album_when_nothing_changes_does_not_write(catalog):
+    wilder = get_wilder_sdk()
+    album = wilder.get_album(TEST_ALBUM)
+    modified_time = os.stat(album.dir_json_path).st_mtime_ns
+    wilder.update_album(TEST_ALBUM, description=album.description)
+    assert os.stat(album.dir_json_path).st_mtime_ns == modified_time
+
+
+def test_album_dirty_fields_returns_changed_fields(catalog):
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    assert not album.is_dirty
+    album.description = "A wild one."
+    assert album.dirty_fields == {Constants.DESCRIPTION}
+    album.save_album_metadata()
+    assert not album.is_dirty
+
+
+def test_add_alias_when_artist_changes_only_writes_mgmt_json(catalog, mocker):
+    wilder = get_wilder_sdk()
+    wilder.get_album(TEST_ALBUM).get_tracks()
+    spy = mocker.patch.object(JsonStorage, "save_album")
+    track_spy = mocker.patch.object(JsonStorage, "save_track")
+    wilder.add_alias("Yingthi")
+    assert not spy.call_count
+    assert not track_spy.call_count
+    assert get_wilder_sdk().get_artist().also_known_as == ["Yingthi"]
+
+
+def test_mutation_does_not_check_loaded_albums_for_changes(catalog, mocker):
+    wilder = get_wilder_sdk()
+    wilder.get_album(TEST_ALBUM).get_tracks()
+    album_checks = mocker.spy(Album, "to_persisted_json")
+    track_checks = mocker.spy(Track, "to_persisted_json")
+    wilder.add_alias("Yingthi")
+    assert not album_checks.call_count
+    assert not track_checks.call_count
+
+
+def test_batch_writes_each_changed_file_once(catalog, mocker):
+    wilder = get_wilder_sdk()
+    album_writes = mocker.spy(JsonStorage, "save_album")
+    with wilder.batch():
+        wilder.create_track("Kill them in their Sleep Paralysis", TEST_ALBUM)
+        wilder.create_track("Yingthi", TEST_ALBUM)
+        wilder.update_album(TEST_ALBUM, description="A wild one.")
+        assert not album_writes.call_count
+    assert album_writes.call_count == 1
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    assert album.description == "A wild one."
+    assert len(album.get_tracks()) == 4
+
+
+def test_batch_when_error_raised_does_not_write_and_rolls_back(catalog):
+    wilder = get_wilder_sdk()
+    with pytest.raises(ValueError):
+        with wilder.batch():
+            wilder.update_album(TEST_ALBUM, description="A wild one.")
+            wilder.add_alias("Yingthi")
+            raise ValueError()
+    assert wilder.get_album(TEST_ALBUM).description is None
+    assert not wilder.get_artist().also_known_as
+    assert get_wilder_sdk().get_album(TEST_ALBUM).description is None
+
+
+def test_batch_when_error_raised_removes_created_directories(catalog):
+    wilder = get_wilder_sdk()
+    with pytest.raises(ValueError):
+        with wilder.batch():
+            wilder.create_album(str(catalog / "new music"), album_name="Wild 2")
+            wilder.create_track("Yingthi", TEST_ALBUM)
+            raise ValueError()
+    assert not (catalog / "new music").exists()
+    assert not (catalog / "music" / TEST_ALBUM / "Yingthi").exists()
+    assert (catalog / "music" / TEST_ALBUM).exists()
+
+
+def test_refresh_when_nothing_changed_keeps_loaded_data(catalog, spy_loads):
+    wilder = get_wilder_sdk()
+    wilder.get_album(TEST_ALBUM).get_tracks()
+    loads = len(spy_loads)
+    assert wilder.refresh() is wilder
+    wilder.get_album(TEST_ALBUM).get_tracks()
+    assert len(spy_loads) == loads
+
+
+def test_refresh_when_track_json_changed_rereads_only_that_track(catalog, spy_loads):
+    wilder = get_wilder_sdk()
+    wilder.get_album(TEST_ALBUM).get_tracks()
+    get_wilder_sdk().update_track(TEST_TRACKS[0], TEST_ALBUM, description="Witchy")
+    del spy_loads[:]
+    wilder = wilder.refresh()
+    track = wilder.get_track(TEST_TRACKS[0], TEST_ALBUM)
+    assert track.description == "Witchy"
+    assert spy_loads == [track.path]
+
+
+def test_refresh_when_mgmt_json_changed_returns_new_wilder(catalog, spy_loads):
+    wilder = get_wilder_sdk()
+    wilder.get_album(TEST_ALBUM).get_tracks()
+    get_wilder_sdk().update_artist(bio="A wild one.")
+    del spy_loads[:]
+    refreshed = wilder.refresh()
+    assert refreshed is not wilder
+    assert refreshed.get_artist().bio == "A wild one."
+    refreshed.get_album(TEST_ALBUM).get_tracks()
+    assert not spy_loads
+
+
+def test_needs_refresh_when_track_json_changed_returns_true(catalog):
+    wilder = get_wilder_sdk()
+    wilder.get_album(TEST_ALBUM).get_tracks()
+    assert not wilder.needs_refresh()
+    get_wilder_sdk().update_track(TEST_TRACKS[0], TEST_ALBUM, description="Witchy")
+    assert wilder.needs_refresh()
+
+
+def test_needs_refresh_when_track_json_rewritten_within_one_tick_returns_true(catalog):
+    get_wilder_sdk().update_track(TEST_TRACKS[0], TEST_ALBUM, description="Witch")
+    wilder = get_wilder_sdk()
+    track = wilder.get_track(TEST_TRACKS[0], TEST_ALBUM)
+    assert track.description == "Witch"
+    track_json_path = os.path.join(track.path, "track.json")
+    modified_time = os.stat(track_json_path).st_mtime_ns
+    with open(track_json_path, "r+") as track_file:
+        track_json = track_file.read().replace("Witch", "Wytch")
+        track_file.seek(0)
+        track_file.write(track_json)
+    os.utime(track_json_path, ns=(modified_time, modified_time))
+    assert wilder.needs_refresh()
+    assert wilder.refresh().get_track(TEST_TRACKS[0], TEST_ALBUM).description == "Wytch"
+
+
+def test_get_artist_when_given_alias_returns_artist(catalog):
+    wilder = get_wilder_sdk()
+    wilder.add_alias("Yingthi")
+    assert wilder.get_artist("Yingthi").name == TEST_ARTIST
+    wilder.remove_alias("Yingthi")
+    with pytest.raises(ArtistNotFoundError):
+        wilder.get_artist("Yingthi")
+
+
+def test_rename_artist_keeps_old_name_as_alias(catalog):
+    wilder = get_wilder_sdk()
+    wilder.rename_artist("Yingthi")
+    assert wilder.get_artist("Yingthi") is wilder.get_artist(TEST_ARTIST)
+    assert not wilder.is_represented(TEST_ARTIST)
+
+
+def test_rename_track_updates_track_lookup(catalog):
+    wilder = get_wilder_sdk()
+    wilder.rename_track("Yingthi", TEST_TRACKS[0], TEST_ALBUM)
+    assert wilder.get_track("Yingthi", TEST_ALBUM).track_number == 1
+    with pytest.raises(TrackNotFoundError):
+        wilder.get_track(TEST_TRACKS[0], TEST_ALBUM)
+
+
+def test_delete_album_removes_only_that_album(catalog):
+    wilder = get_wilder_sdk()
+    wilder.create_album(str(catalog / "music"), album_name="Wild 2")
+    wilder.delete_album(TEST_ALBUM)
+    assert [a.name for a in wilder.get_discography()] == ["Wild 2"]
+    with pytest.raises(AlbumNotFoundError):
+        wilder.get_album(TEST_ALBUM)
+
+
+def test_use_album_manifest_moves_track_metadata_to_album_json(catalog, spy_loads):
+    wilder = get_wilder_sdk()
+    wilder.update_track(TEST_TRACKS[1], TEST_ALBUM, description="Witchy")
+    wilder.use_album_manifest(TEST_ALBUM)
+    del spy_loads[:]
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    assert [t.track_number for t in album.get_tracks()] == [1, 2]
+    assert album.get_track(TEST_TRACKS[1]).description == "Witchy"
+    assert spy_loads == [album.path]
+
+
+def test_use_album_manifest_when_not_enabled_writes_track_json_again(catalog):
+    wilder = get_wilder_sdk()
+    wilder.use_album_manifest(TEST_ALBUM)
+    track = wilder.get_track(TEST_TRACKS[0], TEST_ALBUM)
+    os.remove(track.dir_json_path)
+    wilder.use_album_manifest(TEST_ALBUM, enabled=False)
+    assert os.path.isfile(track.dir_json_path)
+    assert not get_wilder_sdk().get_album(TEST_ALBUM).uses_manifest
+
+
+def test_auto_set_track_numbers_when_using_manifest_writes_album_once(catalog, mocker):
+    wilder = get_wilder_sdk()
+    wilder.use_album_manifest(TEST_ALBUM)
+    wilder.delete_track(TEST_TRACKS[0], TEST_ALBUM)
+    album_writes = mocker.spy(JsonStorage, "save_album")
+    track_writes = mocker.spy(JsonStorage, "save_track")
+    wilder.bulk_set_track_numbers({TEST_TRACKS[1]: 5}, TEST_ALBUM)
+    wilder.auto_set_track_numbers(TEST_ALBUM)
+    assert album_writes.call_count == 2
+    assert not track_writes.call_count
+    assert get_wilder_sdk().get_track(TEST_TRACKS[1], TEST_ALBUM).track_number == 1
+
+
+def test_create_album_when_using_manifest_does_not_write_track_json(wild_home):
+    wilder = get_wilder_sdk()
+    wilder.create_artist(TEST_ARTIST)
+    wilder.create_album(str(wild_home / "music"), TEST_ALBUM, use_manifest=True)
+    wilder.create_track(TEST_TRACKS[0], TEST_ALBUM)
+    track = get_wilder_sdk().get_track(TEST_TRACKS[0], TEST_ALBUM)
+    assert track.track_number == 1
+    assert not os.path.exists(track.dir_json_path)
+
+
+def test_get_wilder_sdk_when_given_max_workers_reads_everything(catalog, spy_loads):
+    wilder = get_wilder_sdk(max_workers=4)
+    assert len(spy_loads) == 1 + len(TEST_TRACKS)
+    del spy_loads[:]
+    tracks = wilder.get_album(TEST_ALBUM).get_tracks()
+    assert [t.name for t in tracks] == TEST_TRACKS
+    assert not spy_loads
+
+
+def test_preload_when_loads_fail_raises_first_error_in_order(catalog, monkeypatch):
+    wilder = get_wilder_sdk()
+    for album_number in range(2, 6):
+        wilder.create_album(str(catalog / "music"), album_name=f"Wild {album_number}")
+
+    def load_album(self, album_path, album_name):
+        raise ValueError(album_name)
+
+    monkeypatch.setattr(JsonStorage, "load_album", load_album)
+    with pytest.raises(ValueError, match=TEST_ALBUM):
+        get_wilder_sdk(max_workers=4)
+
+
+def test_identify_audio_files_returns_info_of_existing_audio_files(catalog):
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    track = album.get_track(TEST_TRACKS[0])
+    with open(track.wav_path, "wb") as wav_file:
+        wav_file.write(b"RIFF" + bytes(64))
+    audio_files = album.identify_audio_files()
+    assert [(t.name, p, i.extension) for t, p, i in audio_files] == [
+        (track.name, track.wav_path, ["wav"])
+    ]
+    assert os.path.isfile(catalog / ".wilder" / "cache" / "audio-info.json")
+
+
+def test_get_runtime_returns_total_duration_of_tracks_with_audio(
+    catalog, test_wav_file_path
+):
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    shutil.copy(test_wav_file_path, album.get_track(TEST_TRACKS[0]).wav_path)
+    assert album.get_runtime() == 0.1
+
+
+def test_get_track_waveform_saves_peaks_sidecar_in_track_dir(
+    catalog, test_wav_file_path
+):
+    wilder = get_wilder_sdk()
+    track = wilder.get_track(TEST_TRACKS[0], TEST_ALBUM)
+    shutil.copy(test_wav_file_path, track.wav_path)
+    waveform = wilder.get_track_waveform(TEST_TRACKS[0], TEST_ALBUM)
+    assert waveform.frames == 800
+    assert os.path.isfile(f"{track.wav_path}.peaks")
+
+
+def test_get_track_waveform_when_read_only_and_not_computed_raises_not_found_error(
+    catalog, test_wav_file_path
+):
+    track = get_wilder_sdk().get_track(TEST_TRACKS[0], TEST_ALBUM)
+    shutil.copy(test_wav_file_path, track.wav_path)
+    wilder = get_wilder_sdk(read_only=True)
+    with pytest.raises(WaveformNotFoundError):
+        wilder.get_track_waveform(TEST_TRACKS[0], TEST_ALBUM)
+    assert not os.path.exists(f"{track.wav_path}.peaks")
+    get_wilder_sdk().get_track_waveform(TEST_TRACKS[0], TEST_ALBUM)
+    assert wilder.get_track_waveform(TEST_TRACKS[0], TEST_ALBUM).frames == 800
+
+
+def test_get_track_waveform_when_only_mp3_raises_unsupported_audio_type_error(
+    catalog,
+):
+    wilder = get_wilder_sdk()
+    track = wilder.get_track(TEST_TRACKS[0], TEST_ALBUM)
+    with open(track.mp3_path, "wb") as mp3_file:
+        mp3_file.write(b"ID3")
+    with pytest.raises(UnsupportedAudioTypeError):
+        wilder.get_track_waveform(TEST_TRACKS[0], TEST_ALBUM)
+
+
+def test_available_audio_returns_audio_files_by_type(catalog):
+    track = get_wilder_sdk().get_track(TEST_TRACKS[0], TEST_ALBUM)
+    for path in (track.wav_path, track.mp3_path, track.dir_json_path + ".mp3"):
+        open(path, "w").close()
+    assert track.available_audio() == {"mp3": track.mp3_path, "wav": track.wav_path}
+    assert track.get_file() == track.mp3_path
+    assert track.get_file("WAV") == track.wav_path
+    with pytest.raises(AudioTypeNotFoundError):
+        track.get_file("flac")
+
+
+def test_available_audio_when_dir_unchanged_does_not_scan_it_again(catalog, mocker):
+    track = get_wilder_sdk().get_track(TEST_TRACKS[0], TEST_ALBUM)
+    os.utime(track.path, (0, 0))
+    scandir_spy = mocker.spy(os, "scandir")
+    assert not track.available_audio()
+    with pytest.raises(NoAudioFoundError):
+        track.get_file()
+    assert scandir_spy.call_count == 1
+    open(track.flac_path, "w").close()
+    assert track.get_file() == track.flac_path
+    assert scandir_spy.call_count == 2
+
+
+def test_iter_tracks_yields_tracks_of_every_album_in_order(catalog):
+    wilder = get_wilder_sdk()
+    wilder.create_album(str(catalog / "music"), album_name="Wild 2")
+    wilder.create_track("Yingthi", "Wild 2")
+    wilder.bulk_set_track_numbers({TEST_TRACKS[0]: 3}, TEST_ALBUM)
+    tracks = get_wilder_sdk().iter_tracks()
+    assert [(t.album, t.name) for t in tracks] == [
+        (TEST_ALBUM, TEST_TRACKS[1]),
+        (TEST_ALBUM, TEST_TRACKS[0]),
+        ("Wild 2", "Yingthi"),
+    ]
+
+
+def test_iter_tracks_reads_albums_only_when_reached(catalog, spy_loads):
+    wilder = get_wilder_sdk()
+    wilder.create_album(str(catalog / "music"), album_name="Wild 2")
+    wilder = get_wilder_sdk()
+    del spy_loads[:]
+    tracks = wilder.iter_tracks(filter=lambda t: t.track_number == 2)
+    assert next(tracks).name == TEST_TRACKS[1]
+    assert os.path.join(str(catalog), "music", "Wild 2") not in spy_loads
+    assert not list(tracks)
+    assert not wilder.get_discography()[0]._is_loaded
+
+
+def test_load_when_another_thread_is_loading_waits_for_all_fields(catalog, mocker):
+    album = get_wilder_sdk().get_album(TEST_ALBUM)
+    album.unload()
+    reading = threading.Event()
+    finish_reading = threading.Event()
+    load_album = JsonStorage.load_album
+
+    def slow_load_album(storage, *args, **kwargs):
+        reading.set()
+        finish_reading.wait(5)
+        return load_album(storage, *args, **kwargs)
+
+    mocker.patch.object(JsonStorage, "load_album", slow_load_album)
+    loader = threading.Thread(target=album._load)
+    loader.start()
+    reading.wait(5)
+    results = []
+    reader = threading.Thread(target=lambda: results.append(album.tracks))
+    reader.start()
+    finish_reading.set()
+    reader.join(5)
+    loader.join(5)
+    assert [t.name for t in results[0]] == TEST_TRACKS
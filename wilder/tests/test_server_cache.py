@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+from wilder.sdk import get_wilder_sdk
+from wilder.server import cache
+from wilder.server.cache import use_cached_wilder_sdk
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(cache, "_cached_sdks", {})
+    monkeypatch.setattr(cache, "_sdk_lock", cache._ReadWriteLock())
+
+
+def _use_in_thread(read_only, entered, leave):
+    def use():
+        with use_cached_wilder_sdk(read_only=read_only):
+            entered.set()
+            leave.wait(5)
+
+    thread = threading.Thread(target=use, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_use_cached_wilder_sdk_when_reading_lets_other_readers_in(
+    wild_home, settle_files
+):
+    get_wilder_sdk()
+    settle_files()
+    entered = threading.Event()
+    leave = threading.Event()
+    reader = _use_in_thread(True, entered, leave)
+    assert entered.wait(5)
+    other_entered = threading.Event()
+    other_reader = _use_in_thread(True, other_entered, leave)
+    assert other_entered.wait(5)
+    leave.set()
+    reader.join(5)
+    other_reader.join(5)
+
+
+def test_use_cached_wilder_sdk_when_writing_keeps_readers_out(wild_home):
+    entered = threading.Event()
+    leave = threading.Event()
+    writer = _use_in_thread(False, entered, leave)
+    assert entered.wait(5)
+    reader_entered = threading.Event()
+    reader = _use_in_thread(True, reader_entered, leave)
+    assert not reader_entered.wait(0.2)
+    leave.set()
+    assert reader_entered.wait(5)
+    writer.join(5)
+    reader.join(5)
@@ -0,0 +1,187 @@
+import os
+
+import pytest
+from wilder.lib.constants import Constants
+from wilder.lib.errors import ReadOnlyWilderError
+from wilder.lib.storage import get_storage
+from wilder.lib.storage.bridge import copy_catalog
+from wilder.lib.storage.jsonfiles import JsonStorage
+from wilder.lib.storage.snapshot import get_snapshot_path
+from wilder.lib.storage.snapshot import SnapshotStorage
+from wilder.lib.storage.sqlite import get_database_path
+from wilder.lib.storage.sqlite import SqliteStorage
+from wilder.sdk import get_wilder_sdk
+
+from tests.conftest import TEST_ALBUM
+from tests.conftest import TEST_TRACKS
+
+
+@pytest.fixture()
+def sqlite_storage(wild_home):
+    storage = SqliteStorage()
+    yield storage
+    storage.close()
+
+
+def test_get_storage_when_not_configured_returns_json_storage(wild_home):
+    assert isinstance(get_storage(), JsonStorage)
+
+
+def test_sqlite_storage_save_album_round_trips(sqlite_storage):
+    album_json = {Constants.NAME: TEST_ALBUM, Constants.TRACKS: TEST_TRACKS}
+    sqlite_storage.save_album("/music/album", album_json)
+    assert sqlite_storage.load_album("/music/album", TEST_ALBUM) == album_json
+
+
+def test_sqlite_storage_save_album_changes_signature(sqlite_storage):
+    sqlite_storage.save_album("/music/album", {Constants.NAME: TEST_ALBUM})
+    signature = sqlite_storage.get_album_signature("/music/album")
+    sqlite_storage.save_album("/music/album", {Constants.NAME: TEST_ALBUM})
+    assert sqlite_storage.get_album_signature("/music/album") != signature
+
+
+def test_sqlite_storage_load_album_when_missing_returns_default_json(sqlite_storage):
+    album_json = sqlite_storage.load_album("/music/album", TEST_ALBUM)
+    assert album_json[Constants.NAME] == TEST_ALBUM
+    assert sqlite_storage.get_album_signature("/music/album") is None
+
+
+def test_sqlite_storage_transaction_when_error_raised_rolls_back(sqlite_storage):
+    with pytest.raises(ValueError):
+        with sqlite_storage.transaction():
+            sqlite_storage.save_album("/music/album", {Constants.NAME: TEST_ALBUM})
+            raise ValueError()
+    assert sqlite_storage.get_album_signature("/music/album") is None
+
+
+def test_sqlite_storage_move_album_moves_its_tracks(sqlite_storage):
+    sqlite_storage.save_album("/music/album", {Constants.NAME: TEST_ALBUM})
+    sqlite_storage.save_track("/music/album/track", {Constants.NAME: "track"})
+    sqlite_storage.move_album("/music/album", "/music/renamed")
+    assert sqlite_storage.get_album_signature("/music/renamed")
+    assert sqlite_storage.get_track_signature("/music/renamed/track")
+    assert not sqlite_storage.get_track_signature("/music/album/track")
+
+
+def test_sqlite_storage_when_read_only_raises_on_save(wild_home):
+    storage = SqliteStorage(read_only=True)
+    with pytest.raises(ReadOnlyWilderError):
+        storage.save_album("/music/album", {Constants.NAME: TEST_ALBUM})
+
+
+def test_sqlite_storage_when_read_only_reads_saved_catalog(sqlite_storage):
+    sqlite_storage.save_album("/music/album", {Constants.NAME: TEST_ALBUM})
+    sqlite_storage.close()
+    storage = SqliteStorage(read_only=True)
+    assert storage.load_album("/music/album", "")[Constants.NAME] == TEST_ALBUM
+    storage.close()
+
+
+def test_sqlite_storage_when_read_only_and_missing_does_not_create_database(wild_home):
+    storage = SqliteStorage(read_only=True)
+    assert storage.load_mgmt()[Constants.ARTISTS] == []
+    storage.close()
+    assert not os.path.exists(get_database_path())
+
+
+def test_get_wilder_sdk_with_sqlite_storage_does_not_write_json_files(
+    wild_home, create_catalog, sqlite_storage
+):
+    create_catalog(sqlite_storage)
+    album = get_wilder_sdk(storage=sqlite_storage).get_album(TEST_ALBUM)
+    assert [t.name for t in album.get_tracks()] == TEST_TRACKS
+    assert not os.path.exists(album.dir_json_path)
+    assert not os.path.exists(os.path.join(str(wild_home), ".wilder", "mgmt.json"))
+
+
+def test_rename_album_with_sqlite_storage_keeps_track_data(
+    wild_home, create_catalog, sqlite_storage
+):
+    wilder = create_catalog(sqlite_storage)
+    wilder.update_track(TEST_TRACKS[0], TEST_ALBUM, description="Witchy")
+    wilder.rename_album("Wild 2", TEST_ALBUM)
+    track = get_wilder_sdk(storage=sqlite_storage).get_track(TEST_TRACKS[0], "Wild 2")
+    assert track.description == "Witchy"
+    assert track.path == os.path.join(str(wild_home), "music", "Wild 2", TEST_TRACKS[0])
+
+
+def test_copy_catalog_from_json_to_sqlite_and_back_keeps_catalog(
+    create_catalog, sqlite_storage
+):
+    wilder = create_catalog(JsonStorage())
+    wilder.update_track(TEST_TRACKS[1], TEST_ALBUM, description="Witchy")
+    copy_catalog(JsonStorage(read_only=True), sqlite_storage)
+    album = get_wilder_sdk(storage=sqlite_storage).get_album(TEST_ALBUM)
+    os.remove(album.dir_json_path)
+    copy_catalog(sqlite_storage, JsonStorage())
+    wilder = get_wilder_sdk(storage=JsonStorage())
+    assert [t.name for t in wilder.get_album(TEST_ALBUM).get_tracks()] == TEST_TRACKS
+    assert wilder.get_track(TEST_TRACKS[1], TEST_ALBUM).description == "Witchy"
+
+
+def _load_all(wilder):
+    return [(t.name, t.description) for t in wilder.get_album(TEST_ALBUM).get_tracks()]
+
+
+def test_snapshot_storage_when_nothing_changed_does_not_read_json(catalog, mocker):
+    wilder = get_wilder_sdk(use_snapshot=True)
+    expected = _load_all(wilder)
+    assert wilder.storage.save_snapshot()
+    load_album = mocker.spy(JsonStorage, "load_album")
+    load_track = mocker.spy(JsonStorage, "load_track")
+    assert _load_all(get_wilder_sdk(use_snapshot=True)) == expected
+    assert not load_album.call_count
+    assert not load_track.call_count
+
+
+def test_snapshot_storage_when_track_changed_reads_only_that_track(catalog, mocker):
+    wilder = get_wilder_sdk(use_snapshot=True)
+    _load_all(wilder)
+    wilder.storage.save_snapshot()
+    get_wilder_sdk().update_track(TEST_TRACKS[1], TEST_ALBUM, description="Witchy")
+    load_album = mocker.spy(JsonStorage, "load_album")
+    load_track = mocker.spy(JsonStorage, "load_track")
+    wilder = get_wilder_sdk(use_snapshot=True)
+    assert _load_all(wilder)[1] == (TEST_TRACKS[1], "Witchy")
+    assert not load_album.call_count
+    assert load_track.call_count == 1
+    assert wilder.storage.save_snapshot()
+
+
+def test_snapshot_storage_when_track_rewritten_within_one_tick_reads_it(catalog):
+    wilder = get_wilder_sdk(use_snapshot=True)
+    wilder.update_track(TEST_TRACKS[1], TEST_ALBUM, description="Witch")
+    assert _load_all(wilder)[1] == (TEST_TRACKS[1], "Witch")
+    wilder.storage.save_snapshot()
+    track_json_path = os.path.join(
+        wilder.get_track(TEST_TRACKS[1], TEST_ALBUM).path, "track.json"
+    )
+    modified_time = os.stat(track_json_path).st_mtime_ns
+    with open(track_json_path, "r+") as track_file:
+        track_json = track_file.read().replace("Witch", "Wytch")
+        track_file.seek(0)
+        track_file.write(track_json)
+    os.utime(track_json_path, ns=(modified_time, modified_time))
+    assert _load_all(get_wilder_sdk(use_snapshot=True))[1] == (TEST_TRACKS[1], "Wytch")
+
+
+def test_snapshot_storage_when_snapshot_is_corrupt_reads_json(catalog):
+    wilder = get_wilder_sdk(use_snapshot=True)
+    expected = _load_all(wilder)
+    wilder.storage.save_snapshot()
+    with open(get_snapshot_path(JsonStorage.name), "wb") as snapshot_file:
+        snapshot_file.write(b"not a snapshot")
+    assert _load_all(get_wilder_sdk(use_snapshot=True)) == expected
+
+
+def test_snapshot_storage_save_snapshot_when_nothing_changed_does_not_write(
+    wild_home, settle_files
+):
+    JsonStorage().load_mgmt()
+    settle_files()
+    storage = SnapshotStorage(JsonStorage())
+    storage.load_mgmt()
+    assert storage.save_snapshot()
+    storage = SnapshotStorage(JsonStorage())
+    storage.load_mgmt()
+    assert not storage.save_snapshot()
@@ -0,0 +1,103 @@
+import wave
+
+import pytest
+from wilder.lib.errors import UnsupportedAudioTypeError
+from wilder.lib.waveform import compute_waveform
+from wilder.lib.waveform import get_waveform
+from wilder.lib.waveform import load_waveform
+from wilder.lib.waveform import Waveform
+
+
+def _create_wav(path, frames, sample_width=2, channels=1):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(8000)
+        wav.writeframes(frames)
+    return str(path)
+
+
+def test_compute_waveform_returns_min_and_max_of_each_peak(tmp_path):
+    samples = [0, -1000, 2000, 5, 7, -30000, 30000, 1]
+    frames = b"".join(s.to_bytes(2, "little", signed=True) for s in samples)
+    path = _create_wav(tmp_path / "test.wav", frames)
+    waveform = compute_waveform(path, zoom_levels=(2, 4))
+    assert waveform.frames == 8
+    assert waveform.levels[2].tolist() == [-1000, 0, 5, 2000, -30000, 7, 1, 30000]
+    assert waveform.levels[4].tolist() == [-1000, 2000, -30000, 30000]
+
+
+def test_compute_waveform_when_stereo_covers_both_channels(tmp_path):
+    samples = [100, -200, 300, -400]
+    frames = b"".join(s.to_bytes(2, "little", signed=True) for s in samples)
+    path = _create_wav(tmp_path / "test.wav", frames, channels=2)
+    waveform = compute_waveform(path, zoom_levels=(2,))
+    assert waveform.frames == 2
+    assert waveform.levels[2].tolist() == [-400, 300]
+
+
+def test_compute_waveform_when_8_bit_converts_to_16_bit(tmp_path):
+    path = _create_wav(tmp_path / "test.wav", bytes([0, 128, 255, 128]), sample_width=1)
+    waveform = compute_waveform(path, zoom_levels=(4,))
+    assert waveform.levels[4].tolist() == [-32768, 127 * 256]
+
+
+def test_compute_waveform_when_24_bit_keeps_high_bytes(tmp_path):
+    samples = [-(2 ** 23), 2 ** 23 - 1]
+    frames = b"".join(s.to_bytes(3, "little", signed=True) for s in samples)
+    path = _create_wav(tmp_path / "test.wav", frames, sample_width=3)
+    waveform = compute_waveform(path, zoom_levels=(2,))
+    assert waveform.levels[2].tolist() == [-32768, 32767]
+
+
+def test_compute_waveform_when_mp3_raises_unsupported_audio_type_error(tmp_path):
+    path = tmp_path / "test.mp3"
+    path.write_bytes(b"ID3")
+    with pytest.raises(UnsupportedAudioTypeError):
+        compute_waveform(str(path))
+
+
+def test_waveform_when_converted_to_bytes_and_back_is_the_same(test_wav_file_path):
+    waveform = compute_waveform(test_wav_file_path)
+    result = Waveform.from_bytes(waveform.to_bytes())
+    assert result.source_signature == waveform.source_signature
+    assert (result.sample_rate, result.channels, result.frames) == (8000, 1, 800)
+    assert result.levels == waveform.levels
+    assert len(waveform.to_bytes()) < 100
+
+
+def test_from_bytes_when_level_header_cut_short_returns_none(test_wav_file_path):
+    data = compute_waveform(test_wav_file_path).to_bytes()
+    # The first level's header starts with its 256 frames per peak.
+    level_header_start = data.index((256).to_bytes(4, "little"))
+    assert Waveform.from_bytes(data[: level_header_start + 4]) is None
+
+
+def test_get_waveform_when_sidecar_is_fresh_does_not_read_audio(
+    tmp_path, test_wav_file_path, io_stats
+):
+    peaks_path = str(tmp_path / "test.wav.peaks")
+    get_waveform(test_wav_file_path, peaks_path)
+    io_stats.clear()
+    waveform = get_waveform(test_wav_file_path, peaks_path)
+    assert io_stats.count("wopen") == 1
+    assert waveform.frames == 800
+
+
+def test_get_waveform_when_audio_changes_computes_it_again(tmp_path):
+    path = _create_wav(tmp_path / "test.wav", b"\x00\x10" * 4)
+    peaks_path = str(tmp_path / "test.wav.peaks")
+    get_waveform(path, peaks_path)
+    _create_wav(tmp_path / "test.wav", b"\x00\x20" * 8)
+    assert get_waveform(path, peaks_path).frames == 8
+    assert load_waveform(peaks_path).frames == 8
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["test.wav", "test.wav.peaks"]
+
+
+def test_to_json_when_given_frames_per_peak_uses_closest_coarser_level(
+    test_wav_file_path,
+):
+    waveform = compute_waveform(test_wav_file_path, zoom_levels=(256, 1024))
+    _json = waveform.to_json(frames_per_peak=512)
+    assert _json["framesPerPeak"] == 1024
+    assert len(_json["peaks"]) == 2
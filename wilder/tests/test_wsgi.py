@@ -0,0 +1,87 @@
+import pytest
+from click.testing import CliRunner
+from wilder.cli import main
+from wilder.cli.main import cli
+from wilder.server import cache
+from wilder.server import wsgi
+from wilder.server.wsgi import DEFAULT_THREADS
+from wilder.server.wsgi import get_gunicorn_options
+from wilder.server.wsgi import serve
+
+
+@pytest.fixture()
+def started_servers(monkeypatch):
+    started_servers = []
+    monkeypatch.setattr(main, "is_gunicorn_available", lambda: False)
+    monkeypatch.setattr(
+        main, "_start_server", lambda *args: started_servers.append(args)
+    )
+    return started_servers
+
+
+def test_get_gunicorn_options_when_threads_uses_threaded_workers():
+    options = get_gunicorn_options("127.0.0.1", 6660, 4, 8, 30)
+    assert options["bind"] == "127.0.0.1:6660"
+    assert options["workers"] == 4
+    assert options["threads"] == 8
+    assert options["worker_class"] == "gthread"
+    assert options["timeout"] == 30
+
+
+def test_get_gunicorn_options_when_one_thread_uses_sync_workers():
+    options = get_gunicorn_options("127.0.0.1", 6660, 2, 1, 30)
+    assert options["worker_class"] == "sync"
+
+
+def test_get_gunicorn_options_when_default_threads_uses_threaded_workers():
+    options = get_gunicorn_options("127.0.0.1", 6660, 1, DEFAULT_THREADS, 30)
+    assert options["worker_class"] == "gthread"
+
+
+def test_serve_without_gunicorn_when_default_threads_is_threaded(monkeypatch):
+    run_calls = []
+    monkeypatch.setattr(wsgi, "is_gunicorn_available", lambda: False)
+    monkeypatch.setattr(
+        "werkzeug.serving.run_simple",
+        lambda *args, **kwargs: run_calls.append(kwargs),
+    )
+    serve(object(), "127.0.0.1", 6660)
+    assert run_calls[0]["threaded"]
+
+
+def test_post_fork_when_lock_is_held_clears_cached_sdks(monkeypatch):
+    monkeypatch.setattr(cache, "_cached_sdks", {True: object()})
+    held_lock = cache._ReadWriteLock()
+    monkeypatch.setattr(cache, "_sdk_lock", held_lock)
+    with held_lock.writing():
+        options = get_gunicorn_options("127.0.0.1", 6660, 2, 1, 30)
+        options["post_fork"](None, None)
+    assert cache._cached_sdks == {}
+    assert cache._sdk_lock is not held_lock
+
+
+def test_start_server_help_shows_worker_and_thread_options():
+    result = CliRunner().invoke(cli, ["start-server", "--help"])
+    assert "--workers" in result.output
+    assert "--threads" in result.output
+    assert "--timeout" in result.output
+
+
+def test_start_server_when_no_options_uses_threads(started_servers):
+    result = CliRunner().invoke(cli, ["start-server"])
+    assert result.exit_code == 0, result.output
+    assert started_servers == [(1, DEFAULT_THREADS, 30)]
+
+
+def test_start_server_when_workers_without_gunicorn_fails(started_servers):
+    result = CliRunner().invoke(cli, ["start-server", "--workers", "2"])
+    assert result.exit_code != 0
+    assert "Install gunicorn" in result.output
+    assert not started_servers
+
+
+def test_start_server_when_timeout_without_gunicorn_warns(started_servers):
+    result = CliRunner().invoke(cli, ["start-server", "--timeout", "5"])
+    assert result.exit_code == 0, result.output
+    assert "--timeout only limits" in result.output
+    assert started_servers == [(1, DEFAULT_THREADS, 5)]